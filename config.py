@@ -3,6 +3,8 @@ from datetime import datetime
 class Config(BaseSettings):
     bind_host: str = "0.0.0.0"
     bind_port: int = 8000
+    debug: bool = True  # FastAPI 调试模式
+    query_stats_headers: bool = False  # 响应头中返回每个请求的数据库查询统计 (X-DB-*), 只含次数和耗时, 不含语句
 
     backend_host: str = "http://127.0.0.1"
 
@@ -40,6 +42,30 @@ class Config(BaseSettings):
     schedule_start_time: datetime = datetime(1970, 1, 1, 0, 0, 0)
     schedule_end_time: datetime = datetime(2099, 12, 31, 23, 59, 59)
 
-    schedule_address: str = "localhost:50051"
+    catalog_cache_size: int = 4096  # 课程目录缓存的最大条目数
+    catalog_version_interval: float = 1.0  # 校验课程目录版本号的间隔(秒), 其他进程中的变更在该时间内可见
+    count_cache_ttl: int = 10  # 分页总数的缓存时间(秒), 本进程内的写入立即失效
+    orm_lazy_load: str = "select"  # 多对一关系的加载方式, 测试时设为 raise_on_sql, 遗漏的延迟加载 (N+1 查询) 直接报错
+    seat_stream_interval: float = 1.0  # 班级人数推送的合并周期(秒), 每个班级每个周期最多推送一次
+    seat_stream_resync: float = 15  # 推送连接从数据库重新读取班级人数的间隔(秒), 用于获取其他进程中的变化
+    batch_lookup_max: int = 100  # 批量查询班级、课程计划、教师时单次请求的最大ID数
+
+    schedule_address: str = "localhost:50051"  # 多个排课服务端用逗号分隔
+    schedule_timeout: float = 30  # 单次求解请求的截止时间(秒)
+    schedule_breaker_failures: int = 3  # 连续失败多少次后熔断该服务端
+    schedule_breaker_reset: float = 30  # 熔断多少秒后重新探测
+    schedule_local_fallback: bool = True  # 所有服务端不可用时在本地求解
+    schedule_shm: bool = False  # 通过共享内存向同一主机上的排课服务端传递占用矩阵
+    schedule_worker_num: int = 4
+    schedule_job_timeout: int = 120  # Running 任务的心跳超过该时间(秒)未更新时视为执行进程已退出, 重新排队
+    schedule_job_heartbeat: int = 30  # 执行进程更新任务心跳的间隔(秒), 须小于 schedule_job_timeout
+    schedule_reserve_retry: int = 3  # 教室时间段被并发占用时重新求解的次数
+    schedule_heatmap_ttl: int = 60
+    schedule_candidate_rooms: int = 5  # 每次排课传给求解器的候选教室数, 0 为不限
+    schedule_solver: str = ""  # cbc / highs / cpsat / numpy, 为空时使用排课服务的默认求解器
+    schedule_solver_threads: int = 0
+    schedule_solver_time_limit: float = 0
+    schedule_horizon_window: int = 0  # 天数超过该值时排课服务按滚动时域分解求解, 0 为使用排课服务的默认值
+    schedule_horizon_overlap: int = 0
     
 config = Config()
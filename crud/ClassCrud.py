@@ -1,10 +1,15 @@
-from sqlalchemy.orm import Session
+from typing import Union
+from sqlalchemy.orm import Session, joinedload
 from model.ClassModel import Class
 from model.TeacherModel import Teacher
 from model.SCModel import StudentCourse
 from model.ClassScheduleModel import ClassSchedule
+from model.ClassroomModel import Classroom
 from .Crud import AbstractCrud
 from sqlalchemy.sql import exists
+from utils.cursor import decode_cursor, keyset_page
+from utils.count_cache import count_cache
+from utils.catalog_cache import catalog_cache
 
 class ClassCrud(AbstractCrud[Class]):
     @staticmethod
@@ -19,39 +24,175 @@ class ClassCrud(AbstractCrud[Class]):
         return new_class
     
     @staticmethod
-    def get_by_id(db: Session, record_id: int):
-        class_record = db.query(Class).filter(Class.id == record_id).one_or_none()
-        if not class_record:
-            return None
-        teacher_record = db.query(Teacher).filter(Teacher.id == class_record.teacher_id).one_or_none()
-        schedule_records = db.query(ClassSchedule).filter(ClassSchedule.class_id == record_id).all()
-
-        data = {
-                "class_id": class_record.id,
-                "class_num": class_record.num,
-                "max_num": class_record.max_num,
-                "teacher_name": teacher_record.name if teacher_record else None,
+    def get_num(db: Session, record_id: int) -> Union[int, None]:
+        """
+        课程班级的实时人数, 班级不存在时返回 None
+        """
+        return db.query(Class.num).filter(Class.id == record_id).scalar()
+
+    @staticmethod
+    def get_seats(db: Session, class_plan_id: int) -> dict:
+        """
+        课程计划下各班级的 班级ID -> (人数, 最大人数)
+        """
+        return {
+            class_id: (num, max_num)
+            for class_id, num, max_num in db.query(Class.id, Class.num, Class.max_num).filter(Class.class_plan_id == class_plan_id).all()
+        }
+
+    @staticmethod
+    def get_by_id(db: Session, record_id: int, num: int = None):
+        """
+        课程班级详情, 除班级人数外从课程目录缓存读取; 班级人数 num 未传入时从数据库读取
+        """
+        def build():
+            class_record = (
+                db.query(Class.id, Class.max_num, Teacher.name)
+                .outerjoin(Teacher, Teacher.id == Class.teacher_id)
+                .filter(Class.id == record_id)
+                .one_or_none()
+            )
+            if not class_record:
+                return None
+            schedule_records = (
+                db.query(ClassSchedule.start_time, ClassSchedule.end_time, Classroom.name, Classroom.type, Classroom.location)
+                .join(Classroom, Classroom.id == ClassSchedule.classroom_id)
+                .filter(ClassSchedule.class_id == record_id)
+                .order_by(ClassSchedule.id)
+                .all()
+            )
+            class_id, max_num, teacher_name = class_record
+            return {
+                "class_id": class_id,
+                "max_num": max_num,
+                "teacher_name": teacher_name,
                 "schedules": [
                     {
-                        "start_time": schedule.start_time,
-                        "end_time": schedule.end_time,
-                        "classroom": schedule.classroom.name,
-                        "classtype": schedule.classroom.type,
-                        "location": schedule.classroom.location
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "classroom": name,
+                        "classtype": type,
+                        "location": location
                     }
-                    for schedule in schedule_records
+                    for start_time, end_time, name, type, location in schedule_records
                 ]
             }
-        return data
 
-    
+        data = catalog_cache.get_or_set(db, ("class", record_id), build)
+        if data is None:
+            return None
+        if num is None:
+            num = ClassCrud.get_num(db, record_id)
+        if num is None:
+            return None
+
+        return {
+            "class_id": data["class_id"],
+            "class_num": num,
+            "max_num": data["max_num"],
+            "teacher_name": data["teacher_name"],
+            "schedules": data["schedules"]
+        }
+
     @staticmethod
-    def get_by_id_paginated(db: Session, user_id: int, id: int, page: int, page_size: int = 10):
+    def get_by_ids(db: Session, record_ids: list) -> dict:
+        """
+        批量查询课程班级详情, 返回 班级ID -> 详情 (格式同 get_by_id), 不存在的班级不在结果中
+        未命中课程目录缓存的班级、课程安排和教室各用一次 IN 查询读取, 班级人数用一次 IN 查询读取
+        """
+        def build(keys):
+            class_ids = [class_id for _, class_id in keys]
+            class_records = (
+                db.query(Class.id, Class.max_num, Teacher.name)
+                .outerjoin(Teacher, Teacher.id == Class.teacher_id)
+                .filter(Class.id.in_(class_ids))
+                .all()
+            )
+            data = {
+                ("class", class_id): {"class_id": class_id, "max_num": max_num, "teacher_name": teacher_name, "schedules": []}
+                for class_id, max_num, teacher_name in class_records
+            }
+            schedule_records = (
+                db.query(ClassSchedule.class_id, ClassSchedule.start_time, ClassSchedule.end_time,
+                         Classroom.name, Classroom.type, Classroom.location)
+                .join(Classroom, Classroom.id == ClassSchedule.classroom_id)
+                .filter(ClassSchedule.class_id.in_(class_ids))
+                .order_by(ClassSchedule.id)
+                .all()
+            )
+            for class_id, start_time, end_time, name, type, location in schedule_records:
+                if ("class", class_id) in data:
+                    data[("class", class_id)]["schedules"].append({
+                        "start_time": start_time,
+                        "end_time": end_time,
+                        "classroom": name,
+                        "classtype": type,
+                        "location": location
+                    })
+            return data
+
+        if not record_ids:
+            return {}
+        cached = catalog_cache.get_many(db, [("class", record_id) for record_id in record_ids], build)
+        nums = dict(db.query(Class.id, Class.num).filter(Class.id.in_(record_ids)).all())
+
+        return {
+            class_id: {
+                "class_id": class_id,
+                "class_num": nums[class_id],
+                "max_num": data["max_num"],
+                "teacher_name": data["teacher_name"],
+                "schedules": data["schedules"]
+            }
+            for (_, class_id), data in cached.items() if class_id in nums
+        }
+
+
+    @staticmethod
+    def get_by_id_paginated(db: Session, user_id: int, id: int, page: int, page_size: int = 10, cursor: str = None, estimate: bool = False):
         """
         分页查询按 class_plan_id 筛选的记录，同时返回用户是否选了该课程和老师的姓名
+        cursor 不为 None 时按班级ID游标分页 (空字符串为第一页), 不统计总数, 返回下一页的游标
+        总数按课程计划缓存; estimate 为 True 时缓存未命中则返回估算的总数
         """
+        query = (
+            db.query(
+                Class,
+                exists().where(
+                    (StudentCourse.student_id == user_id) & 
+                    (StudentCourse.class_id == Class.id)
+                ).label("is_enrolled")
+            )
+            .filter(Class.class_plan_id == id)
+            .options(joinedload(Class.teacher))
+        )
+
+        def format_class(row):
+            classer, is_enrolled = row
+            return {
+                "id": classer.id,
+                "num": classer.num,
+                "max_num": classer.max_num,
+                "teacher": classer.teacher.name,
+                "is_enrolled": is_enrolled
+            }
+
+        if cursor is not None:
+            after = decode_cursor(cursor, 1)
+            if after is not None:
+                query = query.filter(Class.id > after[0])
+            rows = query.order_by(Class.id).limit(page_size + 1).all()
+            return keyset_page(rows, page_size, lambda row: (row[0].id,), format_class)
+
         offset = (page - 1) * page_size
-        total_records = db.query(Class).filter(Class.class_plan_id == id).count()
+        total_records, estimated = count_cache.count(
+            db,
+            "class",
+            {"class_plan_id": id},
+            ("class",),
+            db.query(Class).filter(Class.class_plan_id == id),
+            estimate
+        )
         total_pages = (total_records + page_size - 1) // page_size
 
         if page > total_pages:
@@ -60,38 +201,19 @@ class ClassCrud(AbstractCrud[Class]):
                 "page_size": page_size,
                 "total_records": total_records,
                 "total_pages": total_pages,
+                "total_estimated": estimated,
                 "data": []
             }
 
-        data = (
-            db.query(
-                Class,
-                exists().where(
-                    (StudentCourse.student_id == user_id) & 
-                    (StudentCourse.class_id == Class.id)
-                ).label("is_enrolled")
-            )
-            .filter(Class.class_plan_id == id)
-            .offset(offset)
-            .limit(page_size)
-            .all()
-        )
+        data = query.offset(offset).limit(page_size).all()
 
         result = {
             "page": page,
             "page_size": page_size,
             "total_records": total_records,
             "total_pages": total_pages,
-            "data": [
-                {
-                    "id": classer.id,
-                    "num": classer.num,
-                    "max_num": classer.max_num,
-                    "teacher": classer.teacher.name,
-                    "is_enrolled": is_enrolled
-                }
-                for classer, is_enrolled in data
-            ]
+            "total_estimated": estimated,
+            "data": [format_class(row) for row in data]
         }
 
         return result
@@ -1,8 +1,11 @@
+import bisect
 from sqlalchemy.orm import Session
-from sqlalchemy import case
 from model.ClassPlanModel import ClassPlan
 from model.SCModel import StudentCourse
 from model.ClassModel import Class
+from utils.plan_index import PlanIndex
+from utils.catalog_cache import catalog_cache
+from utils.cursor import decode_cursor, keyset_page
 from .Crud import AbstractCrud
 
 class ClassPlanCrud(AbstractCrud[ClassPlan]):
@@ -23,7 +26,68 @@ class ClassPlanCrud(AbstractCrud[ClassPlan]):
         db.commit()
         db.refresh(new_plan)
         return new_plan
-    
+
+    @staticmethod
+    def get_index(db: Session) -> PlanIndex:
+        """
+        课程计划的检索索引, 缓存在课程目录缓存中, 课程计划变更后重建
+        """
+        return catalog_cache.get_or_set(db, ("plan_index",), lambda: PlanIndex(db.query(ClassPlan).all()))
+
+    @staticmethod
+    def get_detail(db: Session, plan_id: int) -> dict:
+        """
+        课程计划详情, 不存在时返回 None
+        """
+        return ClassPlanCrud.get_index(db).rows.get(plan_id)
+
+    @staticmethod
+    def get_details(db: Session, plan_ids: list) -> dict:
+        """
+        批量查询课程计划详情, 返回 课程计划ID -> 详情, 不存在的课程计划不在结果中
+        """
+        rows = ClassPlanCrud.get_index(db).rows
+        return {plan_id: rows[plan_id] for plan_id in plan_ids if plan_id in rows}
+
+    @staticmethod
+    def get_selected_plan_ids(db: Session, student_id: int) -> set:
+        """
+        指定学生已选课程班级所属的课程计划ID
+        """
+        return {
+            plan_id for plan_id, in db.query(Class.class_plan_id)
+                .join(StudentCourse, (StudentCourse.class_id == Class.id) & (StudentCourse.student_id == student_id))
+                .distinct()
+                .all()
+        }
+
+    @staticmethod
+    def get_facets(
+        db: Session,
+        student_id: int,
+        name: str = None,
+        credit: int = None,
+        profession: str = None,
+        type: str = None,
+        college: str = None,
+        is_selected: int = None
+    ) -> dict:
+        """
+        在与 get_by_filters 相同的筛选条件下统计学院、专业、类型、学分各取值的课程计划数量
+        不按是否已选筛选时结果按筛选条件缓存在课程目录缓存中
+        """
+        index = ClassPlanCrud.get_index(db)
+        filters = {"name": name, "credit": credit, "profession": profession, "type": type, "college": college}
+
+        if is_selected == -1:
+            return catalog_cache.get_or_set(
+                db, ("plan_facets",) + tuple(filters.values()), lambda: index.facets(**filters)
+            )
+
+        selected = ClassPlanCrud.get_selected_plan_ids(db, student_id)
+        restrict = selected if is_selected else set(index.rows.keys()) - selected
+        return index.facets(**filters, restrict=restrict)
+
     @staticmethod
     def get_by_filters(
         db: Session, 
@@ -35,57 +99,35 @@ class ClassPlanCrud(AbstractCrud[ClassPlan]):
         profession: str = None, 
         type: str = None,
         college: str = None,
-        is_selected: int = None
+        is_selected: int = None,
+        cursor: str = None
     ):
         """
-        根据 credit, profession, college 等筛选条件查询记录，先过滤再分页查询。
+        根据 name, credit, profession, college 等筛选条件查询记录，先过滤再分页查询。
+        筛选在缓存的 n-gram 倒排索引上进行 (见 utils.plan_index), 有名称查询时按匹配程度排序。
         同时判断指定学生是否选择了该课程计划。
+        cursor 不为 None 时按排序键游标分页 (空字符串为第一页), 不统计总数, 返回下一页的游标
         """
+        index = ClassPlanCrud.get_index(db)
+        ids = index.search(name=name, credit=credit, profession=profession, type=type, college=college)
 
-        selected_subquery = (
-            db.query(ClassPlan.id)
-                .join(Class, ClassPlan.id == Class.class_plan_id)
-                .join(StudentCourse, 
-                    (StudentCourse.class_id == Class.id) & (StudentCourse.student_id == student_id))
-                .distinct()
-        ).subquery()
-
-        selected_subquery_select = db.query(selected_subquery).subquery()
-
-        query = db.query(ClassPlan.id,
-                        ClassPlan.name,
-                        ClassPlan.introduction,
-                        ClassPlan.profession,
-                        ClassPlan.college,
-                        ClassPlan.credit,
-                        ClassPlan.type,
-                        case(
-                            (ClassPlan.id.in_(db.query(selected_subquery_select)), 1), else_=0
-                        ).label("is_selected"))
-        
-
-
-        filters = []
-
-        if name != "":
-            filters.append(ClassPlan.name.like(f"%{name}%"))
-        if credit and credit != -1:
-            filters.append(ClassPlan.credit == credit)
-        if profession != "":
-            filters.append(ClassPlan.profession.like(f"%{profession}%"))
-        if college != "":
-            filters.append(ClassPlan.college.like(f"%{college}%"))
-        if type != "":
-            filters.append(ClassPlan.type == type)
+        selected = ClassPlanCrud.get_selected_plan_ids(db, student_id)
         if is_selected != -1:
-            if is_selected:
-                filters.append(ClassPlan.id.in_(selected_subquery))
-            else:
-                filters.append(~ClassPlan.id.in_(selected_subquery))
+            ids = [plan_id for plan_id in ids if (plan_id in selected) == bool(is_selected)]
+
+        def format_plan(plan_id):
+            return dict(index.rows[plan_id], is_selected=int(plan_id in selected))
 
-        query = query.filter(*filters)
+        if cursor is not None:
+            key = index.rank_key(name)
+            after = decode_cursor(cursor)
+            if after is not None and ids:
+                if len(after) != len(key(ids[0])):
+                    raise ValueError("Invalid cursor")
+                ids = ids[bisect.bisect_right(ids, after, key=key):]
+            return keyset_page(ids[:page_size + 1], page_size, key, format_plan)
 
-        total_records = query.count()
+        total_records = len(ids)
         total_pages = (total_records + page_size - 1) // page_size
 
         offset = (page - 1) * page_size
@@ -98,27 +140,10 @@ class ClassPlanCrud(AbstractCrud[ClassPlan]):
                 "data": []
             }
 
-        data = query.offset(offset).limit(page_size).all()
-
         return {
             "page": page,
             "page_size": page_size,
             "total_records": total_records,
             "total_pages": total_pages,
-            "data": [
-                {
-                    "id": i.id,
-                    "name": i.name,
-                    "introduction": i.introduction,
-                    "profession": i.profession, 
-                    "college": i.college,
-                    "credit": i.credit,
-                    "type": i.type,
-                    "is_selected": i.is_selected
-                }
-                for i in data
-            ]
+            "data": [format_plan(plan_id) for plan_id in ids[offset:offset + page_size]]
         }
-
-
-   
\ No newline at end of file
@@ -5,9 +5,9 @@ from .Crud import AbstractCrud
 class ClassScheduleCrud(AbstractCrud[ClassSchedule]):
 
     @staticmethod
-    def create(db: Session, start_time, end_time, classroom: str = None, class_id: int = None) -> ClassSchedule:
+    def create(db: Session, start_time, end_time, classroom: str = None, class_id: int = None, commit: bool = True) -> ClassSchedule:
         """
-        创建一个新的课程安排记录
+        创建一个新的课程安排记录, commit 为 False 时只 flush, 由调用方统一提交
         """
         new_schedule = ClassSchedule(
             start_time=start_time,
@@ -16,6 +16,9 @@ class ClassScheduleCrud(AbstractCrud[ClassSchedule]):
             class_id=class_id
         )
         db.add(new_schedule)
+        if not commit:
+            db.flush()
+            return new_schedule
         db.commit()
         db.refresh(new_schedule)
         return new_schedule
@@ -1,9 +1,19 @@
+from datetime import datetime
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from model.ClassroomModel import Classroom
+from model.ClassroomReservationModel import ClassroomReservation
+from model.ClassModel import Class
+from model.ClassPlanModel import ClassPlan
+from utils.catalog_cache import catalog_cache
 from .Crud import AbstractCrud
 
+# 课程类型 -> 教室类型, 实践课优先使用实验室, 其他课程优先使用普通教室
+ROOM_TYPES = {'S': 'S'}
+DEFAULT_ROOM_TYPE = 'C'
+
 class ClassroomCrud(AbstractCrud[Classroom]):
-    
+
     @staticmethod
     def get_all_S(db:Session, num:int) -> list[Classroom]:
         results = (
@@ -13,3 +23,60 @@ class ClassroomCrud(AbstractCrud[Classroom]):
             .all()
         )
         return results
+
+    @staticmethod
+    def get_S_list(db: Session, num: int) -> list[dict]:
+        """
+        容量不小于 num 的实验室, 所有实验室的列表缓存在课程目录缓存中, 按容量在内存中筛选
+        """
+        def build():
+            return [
+                {
+                    "classroom_id": classroom.id,
+                    "name": classroom.name,
+                    "location": classroom.location,
+                    "capacity": classroom.capacity
+                }
+                for classroom in db.query(Classroom).filter(Classroom.type == 'S').order_by(Classroom.id).all()
+            ]
+
+        return [classroom for classroom in catalog_cache.get_or_set(db, ("classrooms", 'S'), build) if classroom["capacity"] >= num]
+
+    @staticmethod
+    def select_candidates(db: Session, classer: Class, start_date: str, end_date: str, limit: int, classroom_ids: list = None) -> list[int]:
+        """
+        选择排课的候选教室ID: 容量不小于班级人数且在时间范围内有空闲时间段,
+        按 (类型是否与课程类型匹配, 空闲时间段数, 容量余量) 排序取前 limit 个, limit 为 0 时不限
+        空闲时间段数由 classroom_reservation 按教室分组统计; classroom_ids 不为空时只在其中选择
+        """
+        start_day = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S").date()
+        end_day = datetime.strptime(end_date, "%Y-%m-%d %H:%M:%S").date()
+        slot_num = max((end_day - start_day).days, 0) * 5
+
+        query = db.query(Classroom).filter(Classroom.capacity >= classer.num)
+        if classroom_ids:
+            query = query.filter(Classroom.id.in_(classroom_ids))
+        classrooms = query.all()
+        if not classrooms:
+            return []
+
+        reserved = dict(
+            db.query(ClassroomReservation.classroom_id, func.count())
+            .filter(ClassroomReservation.classroom_id.in_([classroom.id for classroom in classrooms]))
+            .filter(ClassroomReservation.reserve_date >= start_day, ClassroomReservation.reserve_date < end_day)
+            .group_by(ClassroomReservation.classroom_id)
+            .all()
+        )
+
+        plan_type = db.query(ClassPlan.type).filter(ClassPlan.id == classer.class_plan_id).scalar()
+        room_type = ROOM_TYPES.get(plan_type, DEFAULT_ROOM_TYPE)
+        ranked = sorted(
+            (
+                (classroom.type != room_type, -(slot_num - reserved.get(classroom.id, 0)), classroom.capacity - classer.num, classroom.id)
+                for classroom in classrooms
+                if slot_num - reserved.get(classroom.id, 0) > 0
+            )
+        )
+        if limit > 0:
+            ranked = ranked[:limit]
+        return [classroom_id for _, _, _, classroom_id in ranked]
@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from model.ClassroomReservationModel import ClassroomReservation
+from .Crud import AbstractCrud
+from .ScheduleCrud import SLOT_INDEX
+
+class ClassroomReservationCrud(AbstractCrud[ClassroomReservation]):
+
+    @staticmethod
+    def reserve(db: Session, classroom_id: int, start_time: datetime) -> ClassroomReservation:
+        """
+        预约教室在 start_time 所在的时间段, 只 flush 不提交, 与课程安排在同一事务中提交
+        该时间段已被预约时抛出 IntegrityError
+        """
+        reservation = ClassroomReservation(
+            classroom_id=classroom_id,
+            reserve_date=start_time.date(),
+            slot=int(SLOT_INDEX[start_time.hour]),
+            created_time=datetime.now()
+        )
+        db.add(reservation)
+        db.flush()
+        return reservation
+
+    @staticmethod
+    def delete_by_class_schedule(db: Session, class_schedule_id: int) -> int:
+        """
+        删除课程安排对应的教室预约
+        """
+        count = (
+            db.query(ClassroomReservation)
+            .filter(ClassroomReservation.class_schedule_id == class_schedule_id)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return count
@@ -2,6 +2,7 @@ from model.ClassScheduleModel import ClassSchedule
 from model.SCModel import StudentCourse
 from model.ClassModel import Class
 from model.EnrollmentHistoryModel import EnrollmentHistory
+from .TeacherScheduleCrud import TeacherScheduleCrud
 from sqlalchemy.orm import Session
 from datetime import datetime
 from sqlalchemy.sql import select
@@ -59,6 +60,7 @@ class EnrollCrud:
         db.add(history)
 
         course.num += 1
+        TeacherScheduleCrud.update_conflicts(db, student_id, class_id, enrolled=True)
         db.commit()
         return True
 
@@ -78,5 +80,6 @@ class EnrollCrud:
 
         course = db.query(Class).with_for_update().filter_by(id=class_id).first()
         course.num -= 1
+        TeacherScheduleCrud.update_conflicts(db, student_id, class_id, enrolled=False)
         db.commit()
         return True
\ No newline at end of file
@@ -3,6 +3,8 @@ from typing import List
 from model.EnrollmentHistoryModel import EnrollmentHistory
 from model.ClassModel import Class
 from model.ClassPlanModel import ClassPlan
+from utils.cursor import decode_cursor, keyset_page
+from utils.count_cache import count_cache
 from .Crud import AbstractCrud
 
 class EnrollmentHistoryCrud(AbstractCrud[EnrollmentHistory]):
@@ -29,11 +31,25 @@ class EnrollmentHistoryCrud(AbstractCrud[EnrollmentHistory]):
         page_size: int = 10, 
         student_id: int = None, 
         class_id: int = None, 
-        action_type: str = None
+        action_type: str = None,
+        cursor: str = None,
+        estimate: bool = False
     ):
         """
         根据 ID, 类型 查询记录，并支持分页。
+        cursor 不为 None 时按 ID 游标分页 (空字符串为第一页), 不统计总数, 返回下一页的游标
+        总数按筛选条件缓存; estimate 为 True 时缓存未命中则返回估算的总数
         """
+        def format_record(record):
+            return {
+                "id": record.id,
+                "student_id": record.student_id,
+                "class_id": record.class_id,
+                "action_type": record.action_type,
+                "action_date": record.action_date,
+                "class_plan_name": record.class_plan_name
+            }
+
         query = (
             db.query(
                 EnrollmentHistory.id,
@@ -55,7 +71,21 @@ class EnrollmentHistoryCrud(AbstractCrud[EnrollmentHistory]):
         if action_type != "":
             query = query.filter(EnrollmentHistory.action_type == action_type)
 
-        total_records = query.count()
+        if cursor is not None:
+            after = decode_cursor(cursor, 1)
+            if after is not None:
+                query = query.filter(EnrollmentHistory.id > after[0])
+            rows = query.order_by(EnrollmentHistory.id).limit(page_size + 1).all()
+            return keyset_page(rows, page_size, lambda record: (record.id,), format_record)
+
+        total_records, estimated = count_cache.count(
+            db,
+            "enrollment_history",
+            {"student_id": student_id, "class_id": class_id, "action_type": action_type},
+            ("enrollment_history", "class", "class_plan"),
+            query,
+            estimate
+        )
 
         offset = (page - 1) * page_size
         total_pages = (total_records + page_size - 1) // page_size
@@ -66,6 +96,7 @@ class EnrollmentHistoryCrud(AbstractCrud[EnrollmentHistory]):
                 "page_size": page_size,
                 "total_records": total_records,
                 "total_pages": total_pages,
+                "total_estimated": estimated,
                 "data": []
             }
 
@@ -76,17 +107,8 @@ class EnrollmentHistoryCrud(AbstractCrud[EnrollmentHistory]):
             "page_size": page_size,
             "total_records": total_records,
             "total_pages": total_pages,
-            "data": [
-                {
-                    "id": record.id,
-                    "student_id": record.student_id,
-                    "class_id": record.class_id,
-                    "action_type": record.action_type,
-                    "action_date": record.action_date,
-                    "class_plan_name": record.class_plan_name
-                }
-                for record in data
-            ]
+            "total_estimated": estimated,
+            "data": [format_record(record) for record in data]
         }
 
     @staticmethod
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import extract
 from datetime import datetime
 from typing import List, Union
@@ -7,6 +7,8 @@ from model.ClassModel import Class
 from model.ClassScheduleModel import ClassSchedule
 from model.ClassPlanModel import ClassPlan
 from model.StudentModel import Student
+from utils.cursor import decode_cursor, keyset_page
+from utils.count_cache import count_cache
 
 class StudentCourseCrud:
     @staticmethod
@@ -132,6 +134,8 @@ class StudentCourseCrud:
      ).filter(
         StudentCourse.student_id == student_id,
         func.date(ClassSchedule.start_time) == specific_date.date()
+     ).options(
+        joinedload(ClassSchedule.classroom)
      ).all()
 
      return [{
@@ -145,13 +149,13 @@ class StudentCourseCrud:
 
     @staticmethod
     def get_student_grade_page(
-        db: Session, student_id: int, page: int = 1, page_size: int = 10
+        db: Session, student_id: int, page: int = 1, page_size: int = 10, cursor: str = None, estimate: bool = False
     ) -> dict:
         """
         获取学生所有课程的详细信息，包括课程号、课程名称、专业、学院、类型、学分、教师、分数
-        支持分页
+        支持分页; cursor 不为 None 时按课程班级ID游标分页 (空字符串为第一页), 不统计总数, 返回下一页的游标
+        总数按学生缓存; estimate 为 True 时缓存未命中则返回估算的总数
         """
-        offset = (page - 1) * page_size
         query = db.query(
             Class,
             ClassPlan,
@@ -162,30 +166,52 @@ class StudentCourseCrud:
             ClassPlan, ClassPlan.id == Class.class_plan_id
         ).filter(
             StudentCourse.student_id == student_id
-        ).offset(offset).limit(page_size)
-        
-        records = query.all()
+        ).options(
+            joinedload(Class.teacher)
+        )
+
+        def format_course(row):
+            classer, class_plan, grade = row
+            return {
+                'course_id': classer.id,
+                'course_name': class_plan.name,
+                'profession': class_plan.profession,
+                'college': class_plan.college,
+                'type': class_plan.type,
+                'credits': class_plan.credit,
+                'teacher': classer.teacher.name,
+                'grade': grade
+            }
+
+        if cursor is not None:
+            after = decode_cursor(cursor, 1)
+            if after is not None:
+                query = query.filter(StudentCourse.class_id > after[0])
+            rows = query.order_by(StudentCourse.class_id).limit(page_size + 1).all()
+            return keyset_page(rows, page_size, lambda row: (row[0].id,), format_course)
+
+        offset = (page - 1) * page_size
+        records = query.offset(offset).limit(page_size).all()
         
-        total_records = db.query(StudentCourse).filter(StudentCourse.student_id == student_id).count()
+        total_records, estimated = count_cache.count(
+            db,
+            "student_course",
+            {"student_id": student_id},
+            ("student_course",),
+            db.query(StudentCourse).filter(StudentCourse.student_id == student_id),
+            estimate
+        )
         total_pages = (total_records + page_size - 1) // page_size
         
-        course_details = [{
-            'course_id': classer.id,
-            'course_name': class_plan.name,
-            'profession': class_plan.profession,
-            'college': class_plan.college,
-            'type': class_plan.type,
-            'credits': class_plan.credit,
-            'teacher': classer.teacher.name,
-            'grade': grade
-        } for classer, class_plan, grade in records]
+        course_details = [format_course(row) for row in records]
         
         return {
             "data": course_details,
             "page": page,
             "page_size": page_size,
             "total_records": total_records,
-            "total_pages": total_pages
+            "total_pages": total_pages,
+            "total_estimated": estimated
         }
     
     @staticmethod
@@ -4,10 +4,63 @@ from model.StudentModel import Student
 from model.ClassScheduleModel import ClassSchedule
 from model.ClassModel import Class
 from model.SCModel import StudentCourse
+from utils.cache import TTLCache
+from config import config
 import pandas as pd
 
+TIME_SLOTS = {
+    8: 0,   # 8:00-10:00
+    10: 1,  # 10:00-12:00
+    14: 2,  # 14:00-16:00
+    16: 3,  # 16:00-18:00
+    19: 4,  # 19:00-21:00
+}
+
+# 开始小时 -> 时间段下标, 非上课时间为 -1
+SLOT_INDEX = np.full(24, -1, dtype=int)
+SLOT_INDEX[list(TIME_SLOTS.keys())] = list(TIME_SLOTS.values())
+
+heatmap_cache = TTLCache(ttl=config.schedule_heatmap_ttl)
+
 class ScheduleCrud:
 
+    @staticmethod
+    def fill_schedule_matrix(schedule_matrix: np.ndarray, row_idx: np.ndarray, start_times: list, start_date: str):
+        """
+        将 (行, 开始时间) 批量映射为 (行, 天, 时间段) 并置 1
+        """
+        if len(start_times) == 0:
+            return schedule_matrix
+
+        times = pd.DatetimeIndex(start_times)
+        day_idx = np.asarray((times.normalize() - pd.Timestamp(start_date).normalize()).days)
+        slot_idx = SLOT_INDEX[np.asarray(times.hour)]
+
+        valid = (row_idx >= 0) & (slot_idx >= 0) & (day_idx >= 0) & (day_idx < schedule_matrix.shape[1])
+        schedule_matrix[row_idx[valid], day_idx[valid], slot_idx[valid]] = 1
+        return schedule_matrix
+
+    @staticmethod
+    def fold_week(schedule_matrix: np.ndarray, start_date: str, holidays: list = None, weekdays: int = 7, reduce: str = "sum"):
+        """
+        将 (行, 天, 时间段) 按星期折叠为 (行, weekdays, 时间段), weekdays 为 5 时只保留周一到周五, 节假日不计入
+        reduce 为 sum 时统计各周的占用次数, 为 max 时任一周被占用即为 1
+        返回折叠后的矩阵, 以及每个星期对应的日期下标
+        """
+        num_days = schedule_matrix.shape[1]
+        dates = pd.date_range(start=pd.Timestamp(start_date).normalize(), periods=num_days)
+        weekday = np.asarray(dates.weekday)
+        keep = (weekday < weekdays) & ~np.asarray(dates.isin(pd.to_datetime(holidays or []).normalize()))
+
+        fold = np.zeros((num_days, weekdays), dtype=int)
+        fold[np.nonzero(keep)[0], weekday[keep]] = 1
+        folded = np.einsum("idk,dw->iwk", schedule_matrix, fold)
+        if reduce == "max":
+            folded = (folded > 0).astype(int)
+
+        day_index = [np.nonzero(fold[:, w])[0].tolist() for w in range(weekdays)]
+        return folded, day_index
+
     @staticmethod
     def get_student_schedule_matrix(db: Session, course_id: int, start_date: str, end_date: str):
 
@@ -17,22 +70,11 @@ class ScheduleCrud:
                        .all()]
 
         date_range = pd.date_range(start=start_date, end=end_date).strftime('%Y-%m-%d').tolist()
-        date_to_idx = {date: idx for idx, date in enumerate(date_range)}
-
-        time_slots = {
-            8: 0,  # 8:00-10:00
-            10: 1,  # 10:00-12:00
-            14: 2,  # 14:00-16:00
-            16: 3,  # 16:00-18:00
-            19: 4,  # 19:00-21:00
-        }
 
         num_days = len(date_range) - 1
         num_students = len(student_ids)
         schedule_matrix = np.zeros((num_students, num_days, 5), dtype=int)
 
-        student_id_to_index = {student_id: idx for idx, student_id in enumerate(student_ids)}
-
         query = db.query(
             Student.id.label('student_id'),
             ClassSchedule.start_time
@@ -43,40 +85,21 @@ class ScheduleCrud:
          .filter(ClassSchedule.start_time.between(start_date, end_date)) \
          .order_by(Student.id, ClassSchedule.start_time).all()
 
-        for row in query:
-            student_id = row.student_id
-            start_time = row.start_time
-
-            student_idx = student_id_to_index[student_id]
-
-            day_idx = date_to_idx.get(str(start_time.date()))
+        student_id_to_index = {student_id: idx for idx, student_id in enumerate(student_ids)}
+        student_idx = np.array([student_id_to_index.get(row.student_id, -1) for row in query], dtype=int)
+        ScheduleCrud.fill_schedule_matrix(schedule_matrix, student_idx, [row.start_time for row in query], start_date)
 
-            for start_hour, timeslot in time_slots.items():
-                if start_hour == start_time.hour:
-                    schedule_matrix[student_idx, day_idx, timeslot] = 1
-            
         return schedule_matrix, student_ids
-    
+
     @staticmethod
     def get_classroom_schedule_matrix(db: Session, classroom_ids: list, start_date: str, end_date: str):
-        
-        date_range = pd.date_range(start=start_date, end=end_date).strftime('%Y-%m-%d').tolist()
-        date_to_idx = {date: idx for idx, date in enumerate(date_range)}
 
-        time_slots = {
-            8: 0,   # 8:00-10:00
-            10: 1,  # 10:00-12:00
-            14: 2,  # 14:00-16:00
-            16: 3,  # 16:00-18:00
-            19: 4,  # 19:00-21:00
-        }
+        date_range = pd.date_range(start=start_date, end=end_date).strftime('%Y-%m-%d').tolist()
 
         num_classrooms = len(classroom_ids)
         num_days = len(date_range) - 1
-        
-        schedule_matrix = np.zeros((num_classrooms, num_days, 5), dtype=int)
 
-        classroom_id_to_index = {classroom_id: idx for idx, classroom_id in enumerate(classroom_ids)}
+        schedule_matrix = np.zeros((num_classrooms, num_days, 5), dtype=int)
 
         query = db.query(
             ClassSchedule.classroom_id,
@@ -86,17 +109,31 @@ class ScheduleCrud:
             ClassSchedule.start_time.between(start_date, end_date)
         ).order_by(ClassSchedule.classroom_id, ClassSchedule.start_time).all()
 
-        for row in query:
-            classroom_id = row.classroom_id
-            start_time = row.start_time
-
-            classroom_idx = classroom_id_to_index[classroom_id]
-
-            day_idx = date_to_idx.get(str(start_time.date()))
-
-            for start_hour, timeslot in time_slots.items():
-                if start_hour == start_time.hour:
-                    schedule_matrix[classroom_idx, day_idx, timeslot] = 1
+        classroom_id_to_index = {classroom_id: idx for idx, classroom_id in enumerate(classroom_ids)}
+        classroom_idx = np.array([classroom_id_to_index.get(row.classroom_id, -1) for row in query], dtype=int)
+        ScheduleCrud.fill_schedule_matrix(schedule_matrix, classroom_idx, [row.start_time for row in query], start_date)
 
         return schedule_matrix
 
+    @staticmethod
+    def get_conflict_heatmap(db: Session, course_id: int, classroom_ids: list, start_date: str, end_date: str) -> dict:
+        """
+        统计 (天 x 时间段) 上有冲突的学生数和空闲教室数, 按课程班级和日期范围缓存
+        """
+        def build():
+            student_schedule_matrix, student_ids = ScheduleCrud.get_student_schedule_matrix(db, course_id, start_date, end_date)
+            classroom_schedule_matrix = ScheduleCrud.get_classroom_schedule_matrix(db, classroom_ids, start_date, end_date)
+
+            num_days = student_schedule_matrix.shape[1]
+            dates = pd.date_range(start=start_date, periods=num_days).strftime('%Y-%m-%d').tolist()
+
+            return {
+                "dates": dates,
+                "slots": [f"{hour}:00" for hour in TIME_SLOTS],
+                "student_num": len(student_ids),
+                "classroom_num": len(classroom_ids),
+                "conflict": student_schedule_matrix.sum(axis=0).tolist(),
+                "free_classroom": (len(classroom_ids) - classroom_schedule_matrix.sum(axis=0)).tolist()
+            }
+
+        return heatmap_cache.get_or_set((course_id, tuple(classroom_ids), start_date, end_date), build)
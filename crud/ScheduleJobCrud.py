@@ -0,0 +1,189 @@
+import json
+from datetime import datetime, timedelta
+from typing import List, Union
+from sqlalchemy import func, literal_column, or_, and_
+from sqlalchemy.orm import Session
+from model.ScheduleJobModel import ScheduleJob
+from .Crud import AbstractCrud
+
+class ScheduleJobCrud(AbstractCrud[ScheduleJob]):
+
+    @staticmethod
+    def create(db: Session, teacher_id: int, class_id: int, params: dict) -> ScheduleJob:
+        """
+        创建一个新的排课任务, 状态为 Pending
+        """
+        new_job = ScheduleJob(
+            teacher_id=teacher_id,
+            class_id=class_id,
+            params=json.dumps(params),
+            created_time=datetime.now()
+        )
+        db.add(new_job)
+        db.commit()
+        db.refresh(new_job)
+        return new_job
+
+    @staticmethod
+    def get_by_teacher(db: Session, job_id: int, teacher_id: int) -> Union[ScheduleJob, None]:
+        """
+        获取某教师的排课任务
+        """
+        return db.query(ScheduleJob).filter(ScheduleJob.id == job_id, ScheduleJob.teacher_id == teacher_id).first()
+
+    @staticmethod
+    def claim(db: Session, job_id: int, worker_id: str) -> bool:
+        """
+        将 Pending 任务原子地置为 Running, 保证同一任务只被一个 worker 执行, 记录执行进程并开始心跳
+        """
+        now = datetime.now()
+        count = (
+            db.query(ScheduleJob)
+            .filter(ScheduleJob.id == job_id, ScheduleJob.status == "Pending")
+            .update({"status": "Running", "start_time": now, "worker_id": worker_id, "heartbeat_time": now}, synchronize_session=False)
+        )
+        db.commit()
+        return count == 1
+
+    @staticmethod
+    def heartbeat(db: Session, worker_id: str):
+        """
+        更新该进程正在执行的任务的心跳时间
+        """
+        db.query(ScheduleJob).filter(ScheduleJob.status == "Running", ScheduleJob.worker_id == worker_id).update(
+            {"heartbeat_time": datetime.now()}, synchronize_session=False
+        )
+        db.commit()
+
+    @staticmethod
+    def reclaim_stale(db: Session, timeout: int) -> List[int]:
+        """
+        将心跳超过 timeout 秒未更新 (执行进程已退出) 的 Running 任务放回 Pending, 返回这些任务的ID
+        仍在执行的任务心跳持续更新, 不会被重复执行; 多个进程同时回收时每个任务只被一个进程回收
+        """
+        deadline = datetime.now() - timedelta(seconds=timeout)
+        stale = or_(
+            ScheduleJob.heartbeat_time < deadline,
+            and_(ScheduleJob.heartbeat_time.is_(None), ScheduleJob.start_time < deadline)
+        )
+        job_ids = [job_id for job_id, in db.query(ScheduleJob.id).filter(ScheduleJob.status == "Running", stale).all()]
+
+        reclaimed = []
+        for job_id in job_ids:
+            count = db.query(ScheduleJob).filter(ScheduleJob.id == job_id, ScheduleJob.status == "Running", stale).update(
+                {"status": "Pending", "start_time": None, "worker_id": None, "heartbeat_time": None}, synchronize_session=False
+            )
+            if count == 1:
+                reclaimed.append(job_id)
+        db.commit()
+        return reclaimed
+
+    @staticmethod
+    def requeue(db: Session, job_id: int):
+        """
+        将 Running 任务放回 Pending, 由 worker 重新执行
+        """
+        db.query(ScheduleJob).filter(ScheduleJob.id == job_id, ScheduleJob.status == "Running").update(
+            {"status": "Pending", "start_time": None, "worker_id": None, "heartbeat_time": None}, synchronize_session=False
+        )
+        db.commit()
+
+    @staticmethod
+    def finish(db: Session, job_id: int, status: str, result: dict = None, message: str = None, teacher_schedule_id: int = None):
+        """
+        记录任务结束状态和结果
+        """
+        db.query(ScheduleJob).filter(ScheduleJob.id == job_id).update({
+            "status": status,
+            "result": json.dumps(result, default=str) if result is not None else None,
+            "message": message[:255] if message else None,
+            "teacher_schedule_id": teacher_schedule_id,
+            "end_time": datetime.now()
+        }, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def lock_uncommitted(db: Session, job_id: int) -> Union[ScheduleJob, None]:
+        """
+        锁定 (SELECT ... FOR UPDATE) 已完成且还没有提交候选的任务, 不满足条件时返回 None
+        并发提交同一任务时后到的请求等待前一个事务结束, 前一个提交成功后返回 None
+        """
+        return (
+            db.query(ScheduleJob)
+            .filter(ScheduleJob.id == job_id, ScheduleJob.status == "Success", ScheduleJob.teacher_schedule_id.is_(None))
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
+
+    @staticmethod
+    def set_teacher_schedule(db: Session, job_id: int, teacher_schedule_id: int):
+        """
+        记录教师从候选中提交后生成的 TeacherSchedule, 不提交, 与课程安排在同一事务中提交
+        """
+        db.query(ScheduleJob).filter(ScheduleJob.id == job_id).update(
+            {"teacher_schedule_id": teacher_schedule_id}, synchronize_session=False
+        )
+
+    @staticmethod
+    def get_unfinished_ids(db: Session, running_timeout: int) -> List[int]:
+        """
+        获取需要重新执行的任务: 所有 Pending 任务, 以及心跳超时 (执行进程已退出) 的 Running 任务
+        """
+        ScheduleJobCrud.reclaim_stale(db, running_timeout)
+        return [job_id for job_id, in db.query(ScheduleJob.id).filter(ScheduleJob.status == "Pending").order_by(ScheduleJob.id).all()]
+
+    @staticmethod
+    def get_queue_position(db: Session, job: ScheduleJob) -> int:
+        """
+        任务前面还有多少个等待中的任务
+        """
+        if job.status != "Pending":
+            return 0
+        return db.query(ScheduleJob).filter(ScheduleJob.status == "Pending", ScheduleJob.id < job.id).count()
+
+    @staticmethod
+    def get_stats(db: Session) -> dict:
+        """
+        统计各状态任务数量、队列深度以及已完成任务的平均耗时
+        """
+        counts = dict(db.query(ScheduleJob.status, func.count(ScheduleJob.id)).group_by(ScheduleJob.status).all())
+        avg_duration, avg_wait = (
+            db.query(
+                func.avg(func.timestampdiff(literal_column("SECOND"), ScheduleJob.start_time, ScheduleJob.end_time)),
+                func.avg(func.timestampdiff(literal_column("SECOND"), ScheduleJob.created_time, ScheduleJob.start_time))
+            )
+            .filter(ScheduleJob.status.in_(["Success", "Failed"]))
+            .first()
+        )
+        return {
+            "queue_depth": counts.get("Pending", 0),
+            "running": counts.get("Running", 0),
+            "success": counts.get("Success", 0),
+            "failed": counts.get("Failed", 0),
+            "avg_duration": float(avg_duration) if avg_duration is not None else None,
+            "avg_wait": float(avg_wait) if avg_wait is not None else None
+        }
+
+    @staticmethod
+    def to_dict(job: ScheduleJob, queue_position: int = 0) -> dict:
+        """
+        任务详情, 时间格式化为字符串, 耗时单位为秒
+        """
+        duration = None
+        if job.start_time is not None:
+            duration = ((job.end_time or datetime.now()) - job.start_time).total_seconds()
+
+        return {
+            "job_id": job.id,
+            "class_id": job.class_id,
+            "status": job.status,
+            "message": job.message,
+            "queue_position": queue_position,
+            "created_time": job.created_time.strftime("%Y-%m-%d %H:%M:%S"),
+            "start_time": job.start_time.strftime("%Y-%m-%d %H:%M:%S") if job.start_time else None,
+            "end_time": job.end_time.strftime("%Y-%m-%d %H:%M:%S") if job.end_time else None,
+            "duration": duration,
+            "teacher_schedule_id": job.teacher_schedule_id,
+            "result": json.loads(job.result) if job.result else None
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import extract, func
 from model.TeacherModel import Teacher
 from model.ClassPlanModel import ClassPlan
@@ -44,6 +44,27 @@ class TeacherCrud(AbstractCrud[Teacher]):
         """
         return db.query(Teacher).filter(Teacher.email == email).first()
 
+    @staticmethod
+    def get_infos(db: Session, teacher_ids: list) -> dict:
+        """
+        批量查询教师的公开信息, 返回 教师ID -> 信息, 不存在的教师不在结果中
+        """
+        records = db.query(
+            Teacher.id, Teacher.name, Teacher.sex, Teacher.introduction, Teacher.profession, Teacher.college, Teacher.email
+        ).filter(Teacher.id.in_(teacher_ids)).all()
+
+        return {
+            teacher_id: {
+                "name": name,
+                "sex": sex,
+                "introduction": introduction,
+                "profession": profession,
+                "college": college,
+                "email": email
+            }
+            for teacher_id, name, sex, introduction, profession, college, email in records
+        }
+
     @staticmethod
     def get_courses_by_month(db: Session, teacher_id: int, month: int, year: int) -> List[dict]:
         """
@@ -82,6 +103,8 @@ class TeacherCrud(AbstractCrud[Teacher]):
         ).filter(
             Class.teacher_id == teacher_id,
             func.date(ClassSchedule.start_time) == specific_date.date()
+        ).options(
+            joinedload(ClassSchedule.classroom)
         ).all()
 
         return [
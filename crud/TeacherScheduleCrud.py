@@ -1,9 +1,13 @@
-from sqlalchemy.orm import Session
+from typing import Union
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 from model.TeacherScheduleModel import TeacherSchedule
+from model.TeacherScheduleConflictModel import TeacherScheduleConflict
 from model.ClassScheduleModel import ClassSchedule
+from model.ClassModel import Class
+from model.SCModel import StudentCourse
 from model.StudentModel import Student
 from .Crud import AbstractCrud
-import json
 
 class TeacherScheduleCrud(AbstractCrud[TeacherSchedule]):
 
@@ -14,24 +18,92 @@ class TeacherScheduleCrud(AbstractCrud[TeacherSchedule]):
         class_schedule_id: int,
         conflict_rate: float,
         preference_satisfaction: float,
-        conflict_student_ids: list
+        conflict_student_ids: list,
+        commit: bool = True
     ) -> TeacherSchedule:
         """
-        创建一个新的记录
+        创建一个新的记录, 冲突学生批量写入 teacher_schedule_conflict
+        commit 为 False 时只 flush, 由调用方统一提交
         """
-        conflict_student_ids_str = json.dumps(conflict_student_ids)
         new_model = TeacherSchedule(
             teacher_id=teacher_id,
             class_schedule_id=class_schedule_id,
             conflict_rate=conflict_rate,
             preference_satisfaction=preference_satisfaction,
-            conflict_student_ids=conflict_student_ids_str,
+            conflict_student_ids=conflict_student_ids,
         )
         db.add(new_model)
+        if not commit:
+            db.flush()
+            return new_model
         db.commit()
         db.refresh(new_model)
         return new_model
 
+    @staticmethod
+    def update_conflicts(db: Session, student_id: int, class_id: int, enrolled: bool):
+        """
+        选课/退课后增量更新受影响的教师排课的冲突学生和冲突率, 只检查该学生自己的上课时间, 不提交
+        受影响的有: 本班级的教师排课 (人数变化), 该学生其他班级中与本班级上课时间重叠的教师排课
+        """
+        def overlaps(schedule, schedules):
+            return any(schedule.start_time < s.end_time and s.start_time < schedule.end_time for s in schedules)
+
+        class_schedules = db.query(ClassSchedule).filter(ClassSchedule.class_id == class_id).all()
+        other_schedules = (
+            db.query(ClassSchedule)
+            .join(StudentCourse, StudentCourse.class_id == ClassSchedule.class_id)
+            .filter(StudentCourse.student_id == student_id, ClassSchedule.class_id != class_id)
+            .all()
+        )
+
+        class_ids = {class_id} | {schedule.class_id for schedule in other_schedules}
+        results = (
+            db.query(TeacherSchedule, ClassSchedule, Class)
+            .join(ClassSchedule, TeacherSchedule.class_schedule_id == ClassSchedule.id)
+            .join(Class, ClassSchedule.class_id == Class.id)
+            .filter(ClassSchedule.class_id.in_(class_ids))
+            .with_for_update(of=TeacherSchedule)
+            .all()
+        )
+
+        teacher_schedule_ids = [teacher_schedule.id for teacher_schedule, _, _ in results]
+        conflict_num = dict(
+            db.query(TeacherScheduleConflict.teacher_schedule_id, func.count())
+            .filter(TeacherScheduleConflict.teacher_schedule_id.in_(teacher_schedule_ids))
+            .group_by(TeacherScheduleConflict.teacher_schedule_id)
+            .all()
+        )
+        conflicted = {
+            teacher_schedule_id for teacher_schedule_id, in
+            db.query(TeacherScheduleConflict.teacher_schedule_id)
+            .filter(TeacherScheduleConflict.teacher_schedule_id.in_(teacher_schedule_ids), TeacherScheduleConflict.student_id == student_id)
+            .all()
+        }
+
+        for teacher_schedule, schedule, classer in results:
+            if schedule.class_id == class_id:
+                conflict = enrolled and overlaps(schedule, other_schedules)
+            elif overlaps(schedule, class_schedules):
+                conflict = enrolled or overlaps(schedule, [s for s in other_schedules if s.class_id != schedule.class_id])
+            else:
+                continue
+
+            num = conflict_num.get(teacher_schedule.id, 0)
+            if conflict and teacher_schedule.id not in conflicted:
+                db.add(TeacherScheduleConflict(student_id, teacher_schedule.id))
+                num += 1
+            elif not conflict and teacher_schedule.id in conflicted:
+                db.query(TeacherScheduleConflict).filter(
+                    TeacherScheduleConflict.teacher_schedule_id == teacher_schedule.id,
+                    TeacherScheduleConflict.student_id == student_id
+                ).delete(synchronize_session=False)
+                num -= 1
+            elif schedule.class_id != class_id:
+                continue
+
+            teacher_schedule.conflict_rate = num / classer.num if classer.num > 0 else 0.0
+
     @staticmethod
     def get_class_schedules(db: Session, class_id: int):
 
@@ -46,6 +118,7 @@ class TeacherScheduleCrud(AbstractCrud[TeacherSchedule]):
                 .scalar_subquery()
             )
             .filter(ClassSchedule.class_id == class_id)
+            .options(joinedload(ClassSchedule.classroom))
             .all()
         )
 
@@ -61,26 +134,30 @@ class TeacherScheduleCrud(AbstractCrud[TeacherSchedule]):
         ]
     
     @staticmethod
-    def get_by_id_list(db: Session, teacher_schedule_id: int) -> list:
+    def get_by_id_list(db: Session, teacher_schedule_id: int) -> Union[dict, None]:
         """
-        根据TeacherSchedule的ID查询
+        根据TeacherSchedule的ID查询, 冲突学生姓名通过一次连接查询获取
         """
 
-        teacher_schedule = db.query(TeacherSchedule).filter(TeacherSchedule.id == teacher_schedule_id).first()
-
-        conflict_student_ids = json.loads(teacher_schedule.conflict_student_ids)
+        results = (
+            db.query(TeacherSchedule, ClassSchedule, Student.name)
+            .join(ClassSchedule, TeacherSchedule.class_schedule_id == ClassSchedule.id)
+            .outerjoin(TeacherScheduleConflict, TeacherScheduleConflict.teacher_schedule_id == TeacherSchedule.id)
+            .outerjoin(Student, Student.id == TeacherScheduleConflict.student_id)
+            .filter(TeacherSchedule.id == teacher_schedule_id)
+            .order_by(TeacherScheduleConflict.student_id)
+            .all()
+        )
 
-        conflict_student_names = []
+        if not results:
+            return None
 
-        for student_id in conflict_student_ids:
-            student = db.query(Student).filter(Student.id == student_id).first()
-            if student:
-                conflict_student_names.append(student.name)
+        teacher_schedule, class_schedule, _ = results[0]
 
         return {
-            "start_time": teacher_schedule.class_schedule.start_time,
-            "end_time": teacher_schedule.class_schedule.end_time,
+            "start_time": class_schedule.start_time,
+            "end_time": class_schedule.end_time,
             "conflict_rate": teacher_schedule.conflict_rate,
             "prefer_rate": 1 - teacher_schedule.preference_satisfaction,
-            "conflict_student": conflict_student_names
-        }
\ No newline at end of file
+            "conflict_student": [name for _, _, name in results if name is not None]
+        }
@@ -3,10 +3,12 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from config import config
+from utils.query_stats import install
 
 SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{config.database_user}:{config.database_password}@{config.database_host}:{config.database_port}/{config.database_name}"
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+install(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
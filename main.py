@@ -12,10 +12,13 @@ from service.teacher import teacher_router
 from service.student import student_router
 from service.course import course_router
 from service.admin import admin_router
+from utils.schedule_job import schedule_worker
+from utils.query_stats import QueryStatsMiddleware
 
 Base.metadata.create_all(bind=engine)
+schedule_worker.recover()
 
-app = FastAPI(title='DATABASE', debug=True)
+app = FastAPI(title='DATABASE', debug=config.debug)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,7 +26,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified", "X-DB-Queries", "X-DB-Time", "X-DB-Slowest"],
 )
+app.add_middleware(QueryStatsMiddleware, headers=config.query_stats_headers)
 
 @app.get("/openapi_v2")
 async def openapi_v2():
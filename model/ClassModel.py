@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, ForeignKey
 from database import Base
 from sqlalchemy.orm import relationship
+from config import config
 class Class(Base):
     __tablename__ = "class"
 
@@ -10,8 +11,8 @@ class Class(Base):
     class_plan_id = Column(Integer, ForeignKey("class_plan.id"), nullable=False)  # 课程计划ID，外键，非空
     teacher_id = Column(Integer, ForeignKey("teacher.id"), nullable=False)  # 教师ID，外键，非空
 
-    teacher = relationship("Teacher", backref="Class")
-    class_plan = relationship("ClassPlan", backref="Class")
+    teacher = relationship("Teacher", backref="Class", lazy=config.orm_lazy_load)
+    class_plan = relationship("ClassPlan", backref="Class", lazy=config.orm_lazy_load)
 
     def __init__(self, num=0, max_num=30, class_plan_id=None, teacher_id=None):
         self.num = num
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from database import Base
+from config import config
 
 class ClassSchedule(Base):
     __tablename__ = "class_schedule"
@@ -11,8 +12,8 @@ class ClassSchedule(Base):
     classroom_id = Column(Integer, ForeignKey("classroom.id"), nullable=False)  # 教室ID，外键，非空
     class_id = Column(Integer, ForeignKey("class.id"), nullable=False)  # 班级ID，外键，非空
 
-    classroom = relationship("Classroom", backref="ClassSchedule")
-    classer = relationship("Class", backref="ClassSchedule")
+    classroom = relationship("Classroom", backref="ClassSchedule", lazy=config.orm_lazy_load)
+    classer = relationship("Class", backref="ClassSchedule", lazy=config.orm_lazy_load)
     
     def __init__(self, start_time, end_time, classroom_id, class_id):
         self.start_time = start_time
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint
+from database import Base
+
+class ClassroomReservation(Base):
+    __tablename__ = "classroom_reservation"
+    __table_args__ = (
+        UniqueConstraint("classroom_id", "reserve_date", "slot", name="uq_classroom_reservation"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 预约ID，主键，自增
+    classroom_id = Column(Integer, ForeignKey("classroom.id"), nullable=False)  # 教室ID，外键，非空
+    reserve_date = Column(Date, nullable=False)  # 预约日期，非空
+    slot = Column(Integer, nullable=False)  # 时间段下标 0-4，非空
+    class_schedule_id = Column(Integer, ForeignKey("class_schedule.id", ondelete="CASCADE"), nullable=True)  # 对应的课程安排ID
+    created_time = Column(DateTime, nullable=False)  # 创建时间，非空
+
+    def __init__(self, classroom_id, reserve_date, slot, created_time, class_schedule_id=None):
+        self.classroom_id = classroom_id
+        self.reserve_date = reserve_date
+        self.slot = slot
+        self.created_time = created_time
+        self.class_schedule_id = class_schedule_id
+
+    def __repr__(self):
+        return (
+            f"<ClassroomReservation(id={self.id}, classroom_id={self.classroom_id}, "
+            f"reserve_date={self.reserve_date}, slot={self.slot}, class_schedule_id={self.class_schedule_id})>"
+        )
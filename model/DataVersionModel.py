@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from database import Base
+
+class DataVersion(Base):
+    __tablename__ = 'data_version'
+
+    name = Column(String(50), primary_key=True)  # 数据集名称, 如 catalog:<表名>, enrollment:<学生ID>
+    version = Column(Integer, nullable=False, default=0)  # 版本号, 数据集中的表每次提交写入后加一
+    updated_time = Column(DateTime, nullable=True)  # 最近一次更新版本号的时间
+
+    def __init__(self, name, version=0):
+        self.name = name
+        self.version = version
+
+    def __repr__(self):
+        return f"<DataVersion(name={self.name}, version={self.version})>"
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime
 from database import Base
 from sqlalchemy.orm import relationship
+from config import config
 
 class StudentCourse(Base):
     __tablename__ = "student_course"
@@ -10,8 +11,8 @@ class StudentCourse(Base):
     grade = Column(Float, nullable=True)  # 成绩，可为空
     enrolled_date = Column(DateTime, nullable=False)  # 选课日期，非空
 
-    student = relationship("Student", backref="StudentCourse")
-    classer = relationship("Class", backref="StudentCourse")
+    student = relationship("Student", backref="StudentCourse", lazy=config.orm_lazy_load)
+    classer = relationship("Class", backref="StudentCourse", lazy=config.orm_lazy_load)
 
     def __init__(self, student_id, class_id, enrolled_date, grade=None):
         self.student_id = student_id
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, ForeignKey
+from database import Base
+
+class ScheduleJob(Base):
+    __tablename__ = "schedule_job"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # 排课任务ID，主键，自增
+    teacher_id = Column(Integer, ForeignKey("teacher.id"), nullable=False)  # 教师ID，外键，非空
+    class_id = Column(Integer, ForeignKey("class.id"), nullable=False)  # 课程班级ID，外键，非空
+    status = Column(Enum("Pending", "Running", "Success", "Failed", name="schedule_job_status_enum"), nullable=False, default="Pending", index=True)  # 任务状态，枚举
+    params = Column(Text, nullable=False)  # 排课参数，JSON 格式存储
+    result = Column(Text, nullable=True)  # 排课结果，JSON 格式存储
+    message = Column(String(255), nullable=True)  # 失败原因
+    teacher_schedule_id = Column(Integer, nullable=True)  # 排课成功后生成的教师排课ID, 教师删除排课后保留
+    created_time = Column(DateTime, nullable=False)  # 创建时间，非空
+    start_time = Column(DateTime, nullable=True)  # 开始执行时间
+    end_time = Column(DateTime, nullable=True)  # 结束时间
+    worker_id = Column(String(64), nullable=True)  # 执行该任务的进程
+    heartbeat_time = Column(DateTime, nullable=True)  # 执行进程最近一次心跳的时间, 超时未更新时任务重新排队
+
+    def __init__(self, teacher_id, class_id, params, created_time, status="Pending"):
+        self.teacher_id = teacher_id
+        self.class_id = class_id
+        self.params = params
+        self.created_time = created_time
+        self.status = status
+
+    def __repr__(self):
+        return (
+            f"<ScheduleJob(id={self.id}, teacher_id={self.teacher_id}, class_id={self.class_id}, "
+            f"status={self.status}, created_time={self.created_time})>"
+        )
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from database import Base
+
+class TeacherScheduleConflict(Base):
+    __tablename__ = 'teacher_schedule_conflict'
+
+    teacher_schedule_id = Column(Integer, ForeignKey('teacher_schedule.id', ondelete='CASCADE'), primary_key=True)  # 教师排课ID，外键
+    student_id = Column(Integer, ForeignKey('student.id'), primary_key=True, index=True)  # 冲突学生ID，外键
+
+    def __init__(self, student_id, teacher_schedule_id=None):
+        self.student_id = student_id
+        self.teacher_schedule_id = teacher_schedule_id
+
+    def __repr__(self):
+        return (
+            f"<TeacherScheduleConflict("
+            f"teacher_schedule_id={self.teacher_schedule_id}, "
+            f"student_id={self.student_id})>"
+        )
@@ -0,0 +1,118 @@
+"""
+求解器对比: 随机生成不同规模的排课问题, 统计各求解器的耗时和目标值
+
+    python benchmark.py [--repeat 3] [--threads 0] [--time-limit 0] [--formulation bigm] [--window 14] [--overlap 0]
+
+另外统计经过 PuLP 调用 HiGHS 的耗时, 与直接用 highspy 建模的 highs 对比
+天数超过 --window 的规模再用滚动时域分解求解, 统计耗时和相对完整求解的最优性损失
+"""
+import argparse
+import time
+import numpy as np
+import pulp
+from solvers import Problem, PulpSolver, HighsSolver, RollingHorizonSolver, SOLVERS, FORMULATION, FORMULATIONS
+
+# (天数 M, 学生数 I, 教室数 J, 排课次数, 使用教室数)
+SIZES = [
+    (7, 30, 3, 1, 1),
+    (14, 60, 5, 1, 1),
+    (30, 120, 8, 2, 1),
+    (60, 200, 10, 4, 1),
+    (120, 300, 12, 8, 2),
+]
+# 只用于滚动时域对比的规模: 网页排课每次只排一节课 (排课次数为 1), 少于窗口数
+HORIZON_SIZES = [
+    (30, 120, 8, 1, 1),
+    (60, 200, 10, 1, 1),
+    (120, 300, 12, 1, 2),
+]
+
+
+class PulpHighsSolver(PulpSolver):
+    """
+    经过 PuLP 调用 HiGHS, 只用于对比
+    """
+    name = "highs (pulp)"
+
+    @staticmethod
+    def available() -> bool:
+        return pulp.HiGHS(msg=False).available()
+
+    def command(self, threads: int, time_limit: float):
+        return pulp.HiGHS(msg=False, threads=threads or None, timeLimit=time_limit or None)
+
+
+def random_problem(M, I, J, class_num, classroom_num, seed=0):
+    rng = np.random.default_rng(seed)
+    N = 5
+    student_w = (rng.random((I, M, N)) < 0.15).astype(int)
+    classroom_w = (rng.random((J, M, N)) < 0.3).astype(int)
+    pref_matrix = np.outer(np.ones(M), rng.integers(0, 2, N))
+    return Problem(student_w, classroom_w, pref_matrix, class_num, classroom_num)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=0)
+    parser.add_argument("--formulation", choices=FORMULATIONS, default=FORMULATION)
+    parser.add_argument("--window", type=int, default=14)
+    parser.add_argument("--overlap", type=int, default=0)
+    args = parser.parse_args()
+
+    solvers = []
+    for solver_cls in list(SOLVERS.values()) + [PulpHighsSolver]:
+        if not solver_cls.available():
+            continue
+        if issubclass(solver_cls, (PulpSolver, HighsSolver)):
+            solvers.append((solver_cls.name, solver_cls(args.formulation)))
+        else:
+            solvers.append((solver_cls.name, solver_cls()))
+    print(f"{'size (M, I, J, class, room)':<30}" + "".join(f"{label:>22}" for label, _ in solvers))
+
+    for size in SIZES:
+        problems = [random_problem(*size, seed=seed) for seed in range(args.repeat)]
+        row = f"{str(size):<30}"
+        for _, solver in solvers:
+            if not solver.supports(problems[0]):
+                row += f"{'-':>22}"
+                continue
+            times = []
+            for problem in problems:
+                start = time.perf_counter()
+                solution = solver.solve(problem, args.threads, args.time_limit)
+                times.append(time.perf_counter() - start)
+            objective = f"{solution.objective:.4f}" if solution.success else "fail"
+            row += f"{np.median(times) * 1000:>12.1f}ms {objective:>8}"
+        print(row)
+
+    print()
+    print(f"rolling horizon: window {args.window}, overlap {args.overlap}, loss = (rolling - full) / full")
+    print(f"{'size (M, I, J, class, room)':<30}" + "".join(f"{label:>34}" for label, _ in solvers))
+    for size in SIZES + HORIZON_SIZES:
+        if size[0] <= args.window:
+            continue
+        problems = [random_problem(*size, seed=seed) for seed in range(args.repeat)]
+        row = f"{str(size):<30}"
+        for _, solver in solvers:
+            if not solver.supports(problems[0]):
+                row += f"{'-':>34}"
+                continue
+            rolling = RollingHorizonSolver(solver, args.window, args.overlap)
+            times = []
+            losses = []
+            for problem in problems:
+                full = solver.solve(problem, args.threads, args.time_limit)
+                start = time.perf_counter()
+                solution = rolling.solve(problem, args.threads, args.time_limit)
+                times.append(time.perf_counter() - start)
+                if full.success and solution.success:
+                    losses.append((solution.objective - full.objective) / max(abs(full.objective), 1e-9))
+            loss = f"{np.mean(losses) * 100:.2f}%" if len(losses) == len(problems) else "fail"
+            row += f"{np.median(times) * 1000:>12.1f}ms {loss:>20}"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
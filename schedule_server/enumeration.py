@@ -0,0 +1,87 @@
+"""
+按教室组合直接枚举求解, 只依赖 NumPy
+排课服务的 NumpySolver 和 web 服务的本地回退 (utils/opt_client/local.py) 共用, 保证两者的解和候选一致
+"""
+import itertools
+import numpy as np
+
+# rank 返回的候选字段顺序, 与 opt.proto 中的 Candidate 一致
+CANDIDATE_FIELDS = ("day", "slot", "classroom", "value", "conflict_rate", "pref")
+
+
+class Problem:
+    """
+    排课问题数据
+    student_w: (I, M, N) 学生占用, classroom_w: (J, M, N) 教室占用, pref_matrix: (M, N) 偏好
+    class_num: 排课次数, classroom_num: 使用教室数
+    """
+
+    def __init__(self, student_w, classroom_w, pref_matrix, class_num, classroom_num):
+        self.student_w = student_w
+        self.classroom_w = classroom_w
+        self.pref_matrix = pref_matrix
+        self.class_num = class_num
+        self.classroom_num = classroom_num
+
+        self.I, self.M, self.N = student_w.shape
+        self.J = classroom_w.shape[0]
+
+    def pref(self):
+        return self.pref_matrix / (self.M * self.N)
+
+    def conflict(self):
+        return self.student_w.sum(axis=0) / self.I if self.I else np.zeros((self.M, self.N))
+
+    def cost(self):
+        """
+        每个 (day, slot) 的目标系数: 偏好项 / (M * N) + 学生冲突数 / I
+        """
+        return self.pref() + self.conflict()
+
+
+def search(problem: Problem, max_combinations: int = 0):
+    """
+    选定教室后目标按 (day, slot) 可分, 取所选教室都空闲的格子中代价最小的 class_num 个
+    教室按空闲格子数从多到少组合, 目标值相同时取先枚举到的组合, 同一组合内代价相同时取下标小的格子
+    max_combinations 大于 0 时只枚举前 max_combinations 个组合, 不保证最优
+    返回 (目标值, 所选教室, 所选格子在 M * N 中的下标), 无解时返回 None
+    """
+    M, N, J = problem.M, problem.N, problem.J
+    cost = problem.cost().flatten()
+    free = (problem.classroom_w == 0).reshape(J, M * N)
+
+    rooms_order = np.argsort(-free.sum(axis=1), kind="stable")
+    combinations = itertools.combinations(rooms_order.tolist(), problem.classroom_num)
+    if max_combinations > 0:
+        combinations = itertools.islice(combinations, max_combinations)
+
+    best = None
+    for rooms in combinations:
+        cells = np.nonzero(free[list(rooms)].all(axis=0))[0]
+        if len(cells) < problem.class_num:
+            continue
+        chosen = cells[np.argsort(cost[cells], kind="stable")[:problem.class_num]]
+        value = cost[chosen].sum()
+        if best is None or value < best[0]:
+            best = (value, rooms, chosen)
+    return best
+
+
+def rank(problem: Problem, top_k: int) -> list:
+    """
+    单次课、单教室时返回目标值最小的 top_k 个 (day, slot, classroom, value, conflict_rate, pref)
+    目标值相同时按 day、slot、classroom 从小到大
+    """
+    conflict = problem.conflict()
+    pref = problem.pref()
+    value = pref + conflict
+
+    j_idx, d_idx, s_idx = np.nonzero(problem.classroom_w == 0)
+    values = value[d_idx, s_idx]
+    order = np.lexsort((j_idx, s_idx, d_idx, values))[:top_k]
+
+    return [
+        (int(d_idx[o]), int(s_idx[o]), int(j_idx[o]), float(values[o]),
+         float(conflict[d_idx[o], s_idx[o]]), float(pref[d_idx[o], s_idx[o]]))
+        for o in order
+    ]
@@ -1,13 +1,223 @@
+import os
+import queue
+import signal
+import threading
+import time
+import traceback
 import grpc
 from concurrent import futures
+from multiprocessing import resource_tracker, shared_memory
 import numpy as np
-import pulp
+import health_pb2
+import health_pb2_grpc
+import metrics
 import opt_pb2
 import opt_pb2_grpc
+from solvers import Problem, NumpySolver, RollingHorizonSolver, get_solver, FORMULATION, HORIZON_WINDOW, HORIZON_OVERLAP, \
+    HORIZON_FALLBACK
+
+# 默认求解器及参数, 请求中未指定时使用
+SOLVER = os.environ.get("SCHEDULE_SOLVER", "cbc")
+SOLVER_THREADS = int(os.environ.get("SCHEDULE_SOLVER_THREADS", 0))
+SOLVER_TIME_LIMIT = float(os.environ.get("SCHEDULE_SOLVER_TIME_LIMIT", 0))
+# 批量流式请求的并发求解数, 默认为 CPU 核数
+STREAM_WORKERS = int(os.environ.get("SCHEDULE_STREAM_WORKERS", os.cpu_count() or 4))
+
+# 同时监听的 Unix 域套接字路径, 与 web 服务在同一主机时使用, 为空时只监听 TCP 端口
+UDS_PATH = os.environ.get("SCHEDULE_UDS", "")
+# 共享内存中的矩阵类型, 与客户端一致
+SHM_DTYPE = np.int32
+# Prometheus 指标端口, 0 为不启动
+METRICS_PORT = int(os.environ.get("SCHEDULE_METRICS_PORT", 9100))
+# gRPC 服务线程数; 健康检查 Watch 流各占用一个线程, 另外预留 HEALTH_WATCH_MAX 个, 超出时拒绝新的 Watch
+RPC_WORKERS = int(os.environ.get("SCHEDULE_RPC_WORKERS", 10))
+HEALTH_WATCH_MAX = int(os.environ.get("SCHEDULE_HEALTH_WATCH_MAX", 2))
+# 收到 SIGTERM 后等待进行中的请求完成的秒数
+SHUTDOWN_GRACE = float(os.environ.get("SCHEDULE_SHUTDOWN_GRACE", 30))
+
+# 批量流式请求等待结果时检查客户端是否已取消的间隔(秒)
+STREAM_POLL_INTERVAL = float(os.environ.get("SCHEDULE_STREAM_POLL_INTERVAL", 1))
+
+stream_executor = futures.ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix="schedule-stream")
+
+
+def attach_shm(name: str) -> shared_memory.SharedMemory:
+    """
+    打开客户端创建的共享内存段; 段由客户端删除, 不登记到本进程的 resource_tracker, 以免退出时被清理
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class HealthService(health_pb2_grpc.HealthServicer):
+    """
+    gRPC 标准健康检查 (grpc.health.v1), 服务名为空或 ScheduleOptimization 时返回排课服务的状态
+    启动后为 SERVING, 收到 SIGTERM 后为 NOT_SERVING, 负载均衡器据此摘除该实例
+    Watch 流在整个连接期间占用一个服务线程, 同时最多 watch_max 个, 超出时返回 RESOURCE_EXHAUSTED, 不占用求解的线程
+    """
+    SERVICES = ("", "ScheduleOptimization")
+
+    def __init__(self, watch_max: int = HEALTH_WATCH_MAX):
+        self.status = health_pb2.HealthCheckResponse.NOT_SERVING
+        self.condition = threading.Condition()
+        self.watchers = threading.BoundedSemaphore(watch_max) if watch_max > 0 else None
+
+    def set(self, status):
+        with self.condition:
+            self.status = status
+            self.condition.notify_all()
+
+    def Check(self, request, context):
+        if request.service not in self.SERVICES:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown service {request.service}")
+        return health_pb2.HealthCheckResponse(status=self.status)
+
+    def Watch(self, request, context):
+        if request.service not in self.SERVICES:
+            yield health_pb2.HealthCheckResponse(status=health_pb2.HealthCheckResponse.SERVICE_UNKNOWN)
+            return
+        if self.watchers is None or not self.watchers.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many health watchers, use Check instead")
+
+        try:
+            last = None
+            while context.is_active():
+                with self.condition:
+                    if self.status == last:
+                        self.condition.wait(timeout=1)
+                    status = self.status
+                if status != last:
+                    last = status
+                    yield health_pb2.HealthCheckResponse(status=status)
+        finally:
+            self.watchers.release()
+
 
 class ScheduleOptimizationService(opt_pb2_grpc.ScheduleOptimizationServicer):
 
+    def schedule_top_k(self, request, problem):
+        M = request.day_num
+        N = 5
+        J = request.classroom_num
+
+        start = time.perf_counter()
+        candidates = [
+            opt_pb2.Candidate(day=day, slot=slot, classroom=classroom, value=value, conflict_rate=conflict_rate, pref=pref)
+            for day, slot, classroom, value, conflict_rate, pref in NumpySolver.rank(problem, request.top_k)
+        ]
+        metrics.SOLVE_TIME.observe(time.perf_counter() - start, solver=NumpySolver.name)
+        metrics.STATUS.inc(solver=NumpySolver.name, status="Optimal" if candidates else "Infeasible")
+
+        x_result = np.zeros((M, N))
+        y_result = np.zeros(J)
+        if candidates:
+            best = candidates[0]
+            x_result[best.day, best.slot] = 1
+            y_result[best.classroom] = 1
+
+        return opt_pb2.OptimizationResponse(
+            obj_value=candidates[0].value if candidates else 0,
+            obj_pref=candidates[0].pref if candidates else 0,
+            obj_w=candidates[0].conflict_rate if candidates else 0,
+            x=x_result.flatten().tolist(),
+            y=y_result.tolist(),
+            success=len(candidates) > 0,
+            candidates=candidates,
+            solver=NumpySolver.name
+        )
+
     def schedule_opt(self, request, context):
+        metrics.REQUESTS.inc(method="schedule_opt")
+        try:
+            return self.solve(request)
+        except FileNotFoundError:
+            # 共享内存段不存在, 客户端不在同一主机, 由客户端改为在请求中传递矩阵
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, f"Shared memory {request.shm_name} not found")
+
+    def schedule_stream(self, request_iterator, context):
+        """
+        批量求解: 读取请求流的同时提交到 stream_executor 并发求解, 按完成顺序返回, 用 request_id 对应
+        客户端取消或断开后停止返回结果, 尚未开始的求解直接跳过
+        """
+        results = queue.Queue()
+
+        def solve(item, submitted):
+            metrics.QUEUE_WAIT.observe(time.perf_counter() - submitted)
+            if not context.is_active():
+                return
+            try:
+                results.put(opt_pb2.BatchResponse(request_id=item.request_id, response=self.solve(item.request)))
+            except Exception as e:
+                traceback.print_exc()
+                results.put(opt_pb2.BatchResponse(request_id=item.request_id, error=f"{e}"))
+
+        def read():
+            count = 0
+            try:
+                for item in request_iterator:
+                    metrics.REQUESTS.inc(method="schedule_stream")
+                    stream_executor.submit(solve, item, time.perf_counter())
+                    count += 1
+            finally:
+                # 请求流结束后放入总数, 返回完所有结果后结束响应流
+                results.put(count)
+
+        threading.Thread(target=read, daemon=True).start()
+
+        total = None
+        done = 0
+        while total is None or done < total:
+            try:
+                item = results.get(timeout=STREAM_POLL_INTERVAL)
+            except queue.Empty:
+                if not context.is_active():
+                    return
+                continue
+            if isinstance(item, int):
+                total = item
+                continue
+            done += 1
+            yield item
+
+    def solve(self, request):
+        """
+        占用矩阵在请求中或在 shm_name 指定的共享内存段中, 共享内存直接映射为 NumPy 数组, 不复制
+        """
+        metrics.IN_FLIGHT.inc()
+        try:
+            if not request.shm_name:
+                return self.solve_matrices(request, np.array(request.student_w), np.array(request.classroom_w))
+
+            shm = attach_shm(request.shm_name)
+            try:
+                return self.solve_matrices(request, *self.shm_matrices(request, shm))
+            finally:
+                try:
+                    shm.close()
+                except BufferError:
+                    # 求解异常时 traceback 仍引用共享内存上的数组, 由垃圾回收关闭
+                    pass
+        except Exception:
+            metrics.ERRORS.inc()
+            raise
+        finally:
+            metrics.IN_FLIGHT.dec()
+
+    @staticmethod
+    def shm_matrices(request, shm: shared_memory.SharedMemory):
+        student_size = request.student_num * request.day_num * 5
+        classroom_size = request.classroom_num * request.day_num * 5
+        if shm.size < (student_size + classroom_size) * np.dtype(SHM_DTYPE).itemsize:
+            raise ValueError(f"Shared memory {request.shm_name} is smaller than the request")
+
+        matrices = np.ndarray((student_size + classroom_size,), dtype=SHM_DTYPE, buffer=shm.buf)
+        return matrices[:student_size], matrices[student_size:]
+
+    def solve_matrices(self, request, student_w: np.ndarray, classroom_w: np.ndarray):
 
         M = request.day_num
         N = 5
@@ -16,12 +226,8 @@ class ScheduleOptimizationService(opt_pb2_grpc.ScheduleOptimizationServicer):
 
         classroom_num = request.schedule_classroom_num
         class_num = request.schedule_class_num
-        student_w = np.array(request.student_w).reshape(I, M, N)
-        classroom_w = np.array(request.classroom_w).reshape(J, M, N)
-
-        w_i = [student_w[_] for _ in range(I)]
-
-        ww_j = [classroom_w[_]  for _ in range(J)]
+        student_w = student_w.reshape(I, M, N)
+        classroom_w = classroom_w.reshape(J, M, N)
 
         pref_day = np.array(request.day_w)
         pref_5 = np.array(request.day_5)
@@ -29,65 +235,80 @@ class ScheduleOptimizationService(opt_pb2_grpc.ScheduleOptimizationServicer):
         pref_5 = pref_5.reshape(1, N)
         pref_matrix = np.dot(pref_day, pref_5)
 
-        problem = pulp.LpProblem("Minimize_Sum", pulp.LpMinimize)
-
-        x = pulp.LpVariable.dicts("x", ((i, j) for i in range(M) for j in range(N)), cat="Binary")
-        y = pulp.LpVariable.dicts("y", (j for j in range(J)), cat="Binary")
-
-        z = pulp.LpVariable.dicts("z", (j for j in range(J)), lowBound=0, cat="Continuous")
+        problem = Problem(student_w, classroom_w, pref_matrix, class_num, classroom_num)
+        metrics.PROBLEM_DAYS.observe(M)
+        metrics.PROBLEM_STUDENTS.observe(I)
+        metrics.PROBLEM_CLASSROOMS.observe(J)
 
-        objective_pref = (
-            pulp.lpSum(
-                pref_matrix[i, j] * x[i, j] for i in range(M) for j in range(N)
-            ) / (M * N)
-        )
-
-        objective_w_i = (
-            pulp.lpSum(
-                w_i[k][i, j] * x[i, j] for k in range(I) for i in range(M) for j in range(N)
-            ) / I
-        )
+        if request.top_k > 0 and class_num == 1 and classroom_num == 1:
+            return self.schedule_top_k(request, problem)
 
-        objective = objective_pref + objective_w_i
-        problem += objective
+        solver = get_solver(request.solver, problem, SOLVER)
+        threads = request.threads or SOLVER_THREADS
+        time_limit = request.time_limit or SOLVER_TIME_LIMIT
 
-        for j in range(J):
-            ww_sum = pulp.lpSum(ww_j[j][i, k] * x[i, k] for i in range(M) for k in range(N))
-            problem += z[j] <= ww_sum
-            problem += z[j] <= y[j] * 1e6
-            problem += z[j] >= ww_sum - (1 - y[j]) * 1e6
+        # 天数超过窗口时按滚动时域分解求解, 分解无解时返回失败;
+        # 开启 HORIZON_FALLBACK 时在剩余的时间限制内求解完整问题, 返回的求解器名称标记为回退
+        window = request.horizon_window or HORIZON_WINDOW
+        name = solver.name
+        if 0 < window < M:
+            overlap = request.horizon_overlap or HORIZON_OVERLAP
+            rolling = RollingHorizonSolver(solver, window, min(overlap, window - 1))
+            started = time.perf_counter()
+            solution = rolling.solve(problem, threads, time_limit)
+            name = rolling.name
+            remaining = time_limit - (time.perf_counter() - started) if time_limit > 0 else 0
+            if not solution.success and HORIZON_FALLBACK and (time_limit <= 0 or remaining > 0):
+                metrics.STATUS.inc(solver=rolling.name, status=solution.status)
+                fallback = solver.solve(problem, threads, remaining)
+                fallback.build_time += solution.build_time
+                fallback.solve_time += solution.solve_time
+                solution = fallback
+                name = f"{rolling.name}>fallback"
+        else:
+            solution = solver.solve(problem, threads, time_limit)
 
-        problem += pulp.lpSum(z[j] for j in range(J)) <= 0
+        metrics.BUILD_TIME.observe(solution.build_time, solver=name)
+        metrics.SOLVE_TIME.observe(solution.solve_time, solver=name)
+        metrics.STATUS.inc(solver=name, status=solution.status)
 
-        problem += pulp.lpSum(x[i, j] for i in range(M) for j in range(N)) == class_num
-
-        problem += pulp.lpSum(y[j] for j in range(J)) == classroom_num
-
-        problem.solve()
-
-        x_result = np.array([[pulp.value(x[i, j]) for j in range(N)] for i in range(M)])
-        y_result = np.array([pulp.value(y[j]) for j in range(J)])
+        x_result = solution.x
+        y_result = solution.y
 
         objective_pref_value = (x_result * pref_matrix).sum() / M / N
 
-        objective_w_i_value = (x_result * w_i).sum() / I
+        objective_w_i_value = (x_result * student_w).sum() / I if I else 0
 
         return opt_pb2.OptimizationResponse(
-            obj_value=pulp.value(problem.objective),
+            obj_value=objective_pref_value + objective_w_i_value,
             obj_pref=objective_pref_value,
             obj_w=objective_w_i_value,
             x=x_result.flatten().tolist(),
-            y=y_result,
-            success=problem.status == pulp.LpStatusOptimal
+            y=y_result.tolist(),
+            success=solution.success,
+            solver=name
         )
 
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=RPC_WORKERS + HEALTH_WATCH_MAX))
+    health = HealthService()
     opt_pb2_grpc.add_ScheduleOptimizationServicer_to_server(ScheduleOptimizationService(), server)
+    health_pb2_grpc.add_HealthServicer_to_server(health, server)
     server.add_insecure_port("[::]:50051")
-    print("Server is running on port 50051...")
+    if UDS_PATH:
+        server.add_insecure_port(f"unix:{UDS_PATH}")
+    if METRICS_PORT:
+        metrics.serve(METRICS_PORT)
+    print(f"Server is running on port 50051, solver: {SOLVER}, formulation: {FORMULATION}, metrics port: {METRICS_PORT or '-'}...")
     server.start()
+    health.set(health_pb2.HealthCheckResponse.SERVING)
+
+    def stop(signum, frame):
+        health.set(health_pb2.HealthCheckResponse.NOT_SERVING)
+        server.stop(SHUTDOWN_GRACE)
+
+    signal.signal(signal.SIGTERM, stop)
     server.wait_for_termination()
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+"""
+排课服务的运行指标, 以 Prometheus 文本格式在单独的 HTTP 端口 /metrics 上输出
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 耗时直方图的分桶 (秒)
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 问题规模直方图的分桶
+SIZE_BUCKETS = (1, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def label_value(value) -> str:
+    return str(value).strip().lower().replace(" ", "_").replace("\\", "\\\\").replace('"', '\\"')
+
+
+def format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.append(self)
+
+    @staticmethod
+    def key(labels: dict) -> tuple:
+        return tuple(sorted((key, label_value(value)) for key, value in labels.items()))
+
+    def samples(self) -> list:
+        with self.lock:
+            return [f"{self.name}{format_labels(key)} {value}" for key, value in self.values.items()]
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    """
+    累计分桶直方图, values 中每组标签保存 [各桶计数, 总和, 总数]
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple = TIME_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total, count = self.values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def samples(self) -> list:
+        lines = []
+        with self.lock:
+            for key, (counts, total, count) in self.values.items():
+                for bound, bucket in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{format_labels(key, (('le', bound),))} {bucket}")
+                lines.append(f"{self.name}_bucket{format_labels(key, (('le', '+Inf'),))} {count}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{format_labels(key)} {count}")
+        return lines
+
+
+registry = []
+
+REQUESTS = Counter("schedule_requests_total", "Solve requests received, by RPC method")
+IN_FLIGHT = Gauge("schedule_in_flight", "Solve requests currently being solved")
+QUEUE_WAIT = Histogram("schedule_queue_wait_seconds", "Time a streamed request waits for a solver thread")
+BUILD_TIME = Histogram("schedule_model_build_seconds", "Time spent building the model, by solver")
+SOLVE_TIME = Histogram("schedule_solve_seconds", "Time spent in the solver, by solver")
+STATUS = Counter("schedule_solve_status_total", "Solve results, by solver and solver status")
+ERRORS = Counter("schedule_errors_total", "Solve requests that raised an error")
+PROBLEM_DAYS = Histogram("schedule_problem_days", "Days in the scheduling horizon", SIZE_BUCKETS)
+PROBLEM_STUDENTS = Histogram("schedule_problem_students", "Students in the scheduled class", SIZE_BUCKETS)
+PROBLEM_CLASSROOMS = Histogram("schedule_problem_classrooms", "Candidate classrooms", SIZE_BUCKETS)
+
+
+def render() -> str:
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int) -> ThreadingHTTPServer:
+    """
+    在后台线程中启动 /metrics HTTP 服务
+    """
+    server = ThreadingHTTPServer(("", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    return server
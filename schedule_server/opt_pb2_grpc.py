@@ -39,6 +39,11 @@ class ScheduleOptimizationStub(object):
                 request_serializer=opt__pb2.OptimizationRequest.SerializeToString,
                 response_deserializer=opt__pb2.OptimizationResponse.FromString,
                 _registered_method=True)
+        self.schedule_stream = channel.stream_stream(
+                '/ScheduleOptimization/schedule_stream',
+                request_serializer=opt__pb2.BatchRequest.SerializeToString,
+                response_deserializer=opt__pb2.BatchResponse.FromString,
+                _registered_method=True)
 
 
 class ScheduleOptimizationServicer(object):
@@ -50,6 +55,12 @@ class ScheduleOptimizationServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def schedule_stream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ScheduleOptimizationServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +69,11 @@ def add_ScheduleOptimizationServicer_to_server(servicer, server):
                     request_deserializer=opt__pb2.OptimizationRequest.FromString,
                     response_serializer=opt__pb2.OptimizationResponse.SerializeToString,
             ),
+            'schedule_stream': grpc.stream_stream_rpc_method_handler(
+                    servicer.schedule_stream,
+                    request_deserializer=opt__pb2.BatchRequest.FromString,
+                    response_serializer=opt__pb2.BatchResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'ScheduleOptimization', rpc_method_handlers)
@@ -95,3 +111,30 @@ class ScheduleOptimization(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def schedule_stream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/ScheduleOptimization/schedule_stream',
+            opt__pb2.BatchRequest.SerializeToString,
+            opt__pb2.BatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
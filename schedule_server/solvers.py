@@ -0,0 +1,470 @@
+import os
+from abc import ABC, abstractmethod
+import time
+from concurrent import futures
+from math import comb
+import numpy as np
+import pulp
+import enumeration
+from enumeration import Problem
+
+# 教室约束的建模方式
+FORMULATIONS = ("bigm", "pairwise")
+FORMULATION = os.environ.get("SCHEDULE_FORMULATION", "bigm")
+# 滚动时域分解: 窗口天数 (0 为不分解), 相邻窗口重叠天数, 窗口互相独立时的并行求解数
+HORIZON_WINDOW = int(os.environ.get("SCHEDULE_HORIZON_WINDOW", 0))
+HORIZON_OVERLAP = int(os.environ.get("SCHEDULE_HORIZON_OVERLAP", 0))
+HORIZON_WORKERS = int(os.environ.get("SCHEDULE_HORIZON_WORKERS", os.cpu_count() or 4))
+# 分解无解时是否在剩余的时间限制内求解完整问题, 默认不回退, 直接返回失败
+HORIZON_FALLBACK = bool(int(os.environ.get("SCHEDULE_HORIZON_FALLBACK", 0)))
+
+
+class Solution:
+    """
+    status 为求解器返回的状态 (如 Optimal, Time limit reached), build_time / solve_time 为建模和求解耗时 (秒)
+    """
+
+    def __init__(self, x, y, success, objective=None, status=None):
+        self.x = np.rint(x).astype(int)
+        self.y = np.rint(y).astype(int)
+        self.success = success
+        self.objective = objective
+        self.status = status or ("Optimal" if success else "Failed")
+        self.build_time = 0.0
+        self.solve_time = 0.0
+
+
+class Solver(ABC):
+    name = ""
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def supports(self, problem: Problem) -> bool:
+        return True
+
+    @abstractmethod
+    def solve(self, problem: Problem, threads: int = 0, time_limit: float = 0) -> Solution:
+        pass
+
+
+class PulpSolver(Solver):
+    """
+    PuLP 建模, 每次求解重新创建模型
+    bigm: z[j] 为教室 j 在所选时间的占用数
+    pairwise: x[d, s] + y[j] <= 1 (教室 j 在 (d, s) 被占用时)
+    """
+
+    def __init__(self, formulation: str = FORMULATION):
+        if formulation not in FORMULATIONS:
+            raise ValueError(f"Unknown formulation: {formulation}")
+        self.formulation = formulation
+
+    @abstractmethod
+    def command(self, threads: int, time_limit: float):
+        """
+        PuLP 求解器命令
+        """
+        pass
+
+    def build(self, problem: Problem):
+        M, N, J = problem.M, problem.N, problem.J
+        cost = problem.cost()
+
+        model = pulp.LpProblem("Minimize_Sum", pulp.LpMinimize)
+
+        x = pulp.LpVariable.dicts("x", ((i, k) for i in range(M) for k in range(N)), cat="Binary")
+        y = pulp.LpVariable.dicts("y", (j for j in range(J)), cat="Binary")
+
+        model += pulp.LpAffineExpression((x[i, k], cost[i, k]) for i in range(M) for k in range(N))
+
+        if self.formulation == "bigm":
+            z = pulp.LpVariable.dicts("z", (j for j in range(J)), lowBound=0, cat="Continuous")
+            for j in range(J):
+                ww_sum = pulp.LpAffineExpression(
+                    (x[i, k], problem.classroom_w[j, i, k]) for i in range(M) for k in range(N) if problem.classroom_w[j, i, k]
+                )
+                model += z[j] <= ww_sum
+                model += z[j] <= y[j] * 1e6
+                model += z[j] >= ww_sum - (1 - y[j]) * 1e6
+            model += pulp.lpSum(z[j] for j in range(J)) <= 0
+        else:
+            for j, i, k in zip(*np.nonzero(problem.classroom_w)):
+                model += x[i, k] + y[j] <= 1
+
+        model += pulp.lpSum(x[i, k] for i in range(M) for k in range(N)) == problem.class_num
+        model += pulp.lpSum(y[j] for j in range(J)) == problem.classroom_num
+
+        return model, x, y
+
+    def solve(self, problem: Problem, threads: int = 0, time_limit: float = 0) -> Solution:
+        start = time.perf_counter()
+        model, x, y = self.build(problem)
+        built = time.perf_counter()
+        model.solve(self.command(threads, time_limit))
+
+        x_result = np.array([[x[i, k].varValue or 0 for k in range(problem.N)] for i in range(problem.M)])
+        y_result = np.array([y[j].varValue or 0 for j in range(problem.J)])
+
+        solution = Solution(x_result, y_result, model.status == pulp.LpStatusOptimal, pulp.value(model.objective),
+                            pulp.LpStatus[model.status])
+        solution.build_time = built - start
+        solution.solve_time = time.perf_counter() - built
+        return solution
+
+
+class CbcSolver(PulpSolver):
+    """
+    PuLP 默认的 CBC, 每次求解启动子进程并写临时文件
+    """
+    name = "cbc"
+
+    def command(self, threads: int, time_limit: float):
+        return pulp.PULP_CBC_CMD(msg=False, threads=threads or None, timeLimit=time_limit or None)
+
+
+class HighsSolver(Solver):
+    """
+    通过 highspy 在进程内调用 HiGHS, 直接按列和行的数组建模, 不经过 PuLP 的表达式和模型转换
+    列: x (M * N), y (J), bigm 时还有 z (J)
+    """
+    name = "highs"
+
+    def __init__(self, formulation: str = FORMULATION):
+        if formulation not in FORMULATIONS:
+            raise ValueError(f"Unknown formulation: {formulation}")
+        self.formulation = formulation
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import highspy
+        except ImportError:
+            return False
+        return True
+
+    def build(self, problem: Problem):
+        import highspy
+
+        inf = highspy.kHighsInf
+        MN, J = problem.M * problem.N, problem.J
+        x_col = np.arange(MN)
+        y_col = MN + np.arange(J)
+        z_col = MN + J + np.arange(J)
+        occupied = problem.classroom_w.reshape(J, MN)
+
+        highs = highspy.Highs()
+        highs.setOptionValue("output_flag", False)
+
+        col_num = MN + J + (J if self.formulation == "bigm" else 0)
+        cost = np.zeros(col_num)
+        cost[:MN] = problem.cost().flatten()
+        upper = np.ones(col_num)
+        upper[MN + J:] = inf
+        highs.addCols(col_num, cost, np.zeros(col_num), upper, 0, np.array([], dtype=np.int32), np.array([], dtype=np.int32), np.array([]))
+        highs.changeColsIntegrality(MN + J, np.arange(MN + J, dtype=np.int32), np.array([highspy.HighsVarType.kInteger] * (MN + J)))
+
+        # 每行为 (下界, 上界, 列, 系数)
+        rows = []
+        if self.formulation == "bigm":
+            # 每个教室 3 行: z - w x <= 0, z - 1e6 y <= 0, z - w x - 1e6 y >= -1e6
+            for j in range(J):
+                c = np.nonzero(occupied[j])[0]
+                w = -occupied[j, c].astype(float)
+                rows.append((-inf, 0, np.append(z_col[j], x_col[c]), np.append(1.0, w)))
+                rows.append((-inf, 0, [z_col[j], y_col[j]], [1, -1e6]))
+                rows.append((-1e6, inf, np.concatenate(([z_col[j], y_col[j]], x_col[c])), np.concatenate(([1.0, -1e6], w))))
+            rows.append((-inf, 0, z_col, np.ones(J)))
+        else:
+            for j, c in zip(*np.nonzero(occupied)):
+                rows.append((-inf, 1, [x_col[c], y_col[j]], [1, 1]))
+        rows.append((problem.class_num, problem.class_num, x_col, np.ones(MN)))
+        rows.append((problem.classroom_num, problem.classroom_num, y_col, np.ones(J)))
+
+        starts = np.cumsum([0] + [len(index) for _, _, index, _ in rows[:-1]])
+        highs.addRows(
+            len(rows),
+            np.array([row[0] for row in rows], dtype=float),
+            np.array([row[1] for row in rows], dtype=float),
+            int(sum(len(index) for _, _, index, _ in rows)),
+            starts.astype(np.int32),
+            np.concatenate([np.asarray(index) for _, _, index, _ in rows]).astype(np.int32),
+            np.concatenate([np.asarray(value, dtype=float) for _, _, _, value in rows]),
+        )
+        return highs
+
+    def solve(self, problem: Problem, threads: int = 0, time_limit: float = 0) -> Solution:
+        import highspy
+
+        start = time.perf_counter()
+        highs = self.build(problem)
+        if threads:
+            highs.setOptionValue("threads", threads)
+        if time_limit:
+            highs.setOptionValue("time_limit", time_limit)
+        built = time.perf_counter()
+        highs.run()
+
+        MN = problem.M * problem.N
+        status = highs.getModelStatus()
+        col_value = np.array(highs.getSolution().col_value)
+        status_name = highs.modelStatusToString(status)
+        if len(col_value) < MN + problem.J:
+            solution = Solution(np.zeros((problem.M, problem.N)), np.zeros(problem.J), False, status=status_name)
+        else:
+            solution = Solution(
+                col_value[:MN].reshape(problem.M, problem.N),
+                col_value[MN:MN + problem.J],
+                status == highspy.HighsModelStatus.kOptimal,
+                highs.getInfo().objective_function_value,
+                status_name
+            )
+
+        solution.build_time = built - start
+        solution.solve_time = time.perf_counter() - built
+        return solution
+
+
+class CpSatSolver(Solver):
+    """
+    OR-Tools CP-SAT, 教室约束写成 x[d, s] + y[j] <= 1 (教室 j 在 (d, s) 被占用时), 目标系数放大后取整
+    """
+    name = "cpsat"
+    scale = 1e6
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            from ortools.sat.python import cp_model
+        except ImportError:
+            return False
+        return True
+
+    def solve(self, problem: Problem, threads: int = 0, time_limit: float = 0) -> Solution:
+        from ortools.sat.python import cp_model
+
+        start = time.perf_counter()
+        M, N, J = problem.M, problem.N, problem.J
+        cost = np.rint(problem.cost() * self.scale).astype(int)
+
+        model = cp_model.CpModel()
+        x = [[model.NewBoolVar(f"x_{i}_{j}") for j in range(N)] for i in range(M)]
+        y = [model.NewBoolVar(f"y_{j}") for j in range(J)]
+
+        model.Add(sum(x[i][j] for i in range(M) for j in range(N)) == problem.class_num)
+        model.Add(sum(y) == problem.classroom_num)
+
+        for j, i, k in zip(*np.nonzero(problem.classroom_w)):
+            model.AddBoolOr([x[i][k].Not(), y[j].Not()])
+
+        model.Minimize(sum(int(cost[i, j]) * x[i][j] for i in range(M) for j in range(N)))
+
+        solver = cp_model.CpSolver()
+        if threads:
+            solver.parameters.num_workers = threads
+        if time_limit:
+            solver.parameters.max_time_in_seconds = time_limit
+
+        built = time.perf_counter()
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            solution = Solution(np.zeros((M, N)), np.zeros(J), False, status=solver.StatusName(status))
+        else:
+            x_result = np.array([[solver.Value(x[i][j]) for j in range(N)] for i in range(M)])
+            y_result = np.array([solver.Value(y[j]) for j in range(J)])
+            solution = Solution(x_result, y_result, status == cp_model.OPTIMAL, solver.ObjectiveValue() / self.scale, solver.StatusName(status))
+
+        solution.build_time = built - start
+        solution.solve_time = time.perf_counter() - built
+        return solution
+
+
+class NumpySolver(Solver):
+    """
+    直接枚举: 选定教室后目标函数按 (day, slot) 可分, 取所选教室都空闲的格子中代价最小的 class_num 个
+    教室组合数不超过 max_combinations 时为精确解; 枚举和排序在 enumeration 中, 与 web 服务的本地回退共用
+    """
+    name = "numpy"
+    max_combinations = 1000
+
+    def supports(self, problem: Problem) -> bool:
+        return comb(problem.J, problem.classroom_num) <= self.max_combinations
+
+    def solve(self, problem: Problem, threads: int = 0, time_limit: float = 0) -> Solution:
+        start = time.perf_counter()
+        solution = self.search(problem)
+        solution.solve_time = time.perf_counter() - start
+        return solution
+
+    @staticmethod
+    def search(problem: Problem) -> Solution:
+        M, N, J = problem.M, problem.N, problem.J
+        best = enumeration.search(problem)
+
+        x_result = np.zeros(M * N)
+        y_result = np.zeros(J)
+        if best is None:
+            return Solution(x_result.reshape(M, N), y_result, False, status="Infeasible")
+
+        value, rooms, chosen = best
+        x_result[chosen] = 1
+        y_result[list(rooms)] = 1
+        return Solution(x_result.reshape(M, N), y_result, True, value)
+
+    @staticmethod
+    def rank(problem: Problem, top_k: int):
+        """
+        单次课、单教室时返回目标值最小的 top_k 个 (day, slot, classroom, value, conflict_rate, pref)
+        """
+        return enumeration.rank(problem, top_k)
+
+
+class RollingHorizonSolver(Solver):
+    """
+    滚动时域分解: 将 M 天按 window 天切成窗口, 相邻窗口重叠 overlap 天, 依次用 solver 求解, 之前窗口的决策固定
+    排课次数按天数比例累计分配到窗口末尾 (四舍五入), 每个窗口排满到该窗口末尾为止的份额, 只保留不与下一个窗口重叠的部分,
+    重叠部分的课由下一个窗口重新决定; 第一个有课的窗口确定所用教室, 之后的窗口只在这些教室中排课
+    overlap 为 0 时教室确定后各窗口的份额固定、互相独立, 用 workers 个线程并行求解
+    排课次数为 1 时只有一个窗口分到份额, 改为每个窗口独立求解这一次课, 取目标值最小的窗口, 即完整问题的最优解
+    不保证最优, 任一窗口无解时返回失败
+    """
+    name = "rolling"
+
+    def __init__(self, solver: Solver, window: int, overlap: int = 0, workers: int = HORIZON_WORKERS):
+        if window <= overlap or overlap < 0:
+            raise ValueError(f"Invalid horizon window {window} with overlap {overlap}")
+        self.solver = solver
+        self.window = window
+        self.overlap = overlap
+        self.workers = workers
+        self.name = f"{RollingHorizonSolver.name}:{solver.name}"
+
+    def supports(self, problem: Problem) -> bool:
+        return self.solver.supports(problem)
+
+    def windows(self, M: int) -> list:
+        """
+        [(起始天, 结束天, 保留到的天)], 最后一个窗口保留全部
+        """
+        step = self.window - self.overlap
+        windows = []
+        start = 0
+        while True:
+            end = min(start + self.window, M)
+            windows.append((start, end, M if end == M else start + step))
+            if end == M:
+                return windows
+            start += step
+
+    @staticmethod
+    def window_problem(problem: Problem, start: int, end: int, rooms, class_num: int) -> Problem:
+        """
+        窗口 [start, end) 的子问题, rooms 不为 None 时只保留这些教室
+        偏好按窗口天数缩放, 使目标系数与完整问题一致
+        """
+        classroom_w = problem.classroom_w[:, start:end] if rooms is None else problem.classroom_w[rooms, start:end]
+        pref_matrix = problem.pref_matrix[start:end] * (end - start) / problem.M
+        return Problem(problem.student_w[:, start:end], classroom_w, pref_matrix, class_num, problem.classroom_num)
+
+    def solve(self, problem: Problem, threads: int = 0, time_limit: float = 0) -> Solution:
+        M, N, J = problem.M, problem.N, problem.J
+        solutions = []
+
+        def result(success: bool, x_result, y_result, objective=None, status=None) -> Solution:
+            solution = Solution(x_result, y_result, success, objective, status)
+            solution.build_time = sum(window.build_time for window in solutions)
+            solution.solve_time = sum(window.solve_time for window in solutions)
+            return solution
+
+        windows = self.windows(M)
+        if problem.class_num == 1 and len(windows) > 1:
+            return self.solve_best_window(problem, windows, threads, time_limit)
+
+        x_result = np.zeros((M, N))
+        rooms = np.arange(J) if J == problem.classroom_num else None
+        placed = 0
+        independent = []
+        for start, end, keep in windows:
+            class_num = (2 * problem.class_num * end + M) // (2 * M) - placed
+            if class_num <= 0:
+                continue
+            if rooms is not None and self.overlap == 0 and self.workers > 1:
+                independent.append((start, end, class_num))
+                placed += class_num
+                continue
+
+            solution = self.solver.solve(self.window_problem(problem, start, end, rooms, class_num), threads, time_limit)
+            solutions.append(solution)
+            if not solution.success:
+                return result(False, np.zeros((M, N)), np.zeros(J), status=solution.status)
+            if rooms is None:
+                rooms = np.nonzero(solution.y)[0]
+            x_result[start:keep] = solution.x[:keep - start]
+            placed += int(solution.x[:keep - start].sum())
+
+        if independent:
+            def solve_window(window):
+                start, end, class_num = window
+                return self.solver.solve(self.window_problem(problem, start, end, rooms, class_num), threads, time_limit)
+
+            with futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rolling-horizon") as executor:
+                window_solutions = list(executor.map(solve_window, independent))
+            solutions.extend(window_solutions)
+            for (start, end, _), solution in zip(independent, window_solutions):
+                if not solution.success:
+                    return result(False, np.zeros((M, N)), np.zeros(J), status=solution.status)
+                x_result[start:end] = solution.x
+
+        y_result = np.zeros(J)
+        if rooms is not None:
+            y_result[rooms] = 1
+        # 各窗口最优不代表整体最优
+        return result(True, x_result, y_result, float((x_result * problem.cost()).sum()), "Feasible")
+
+    def solve_best_window(self, problem: Problem, windows: list, threads: int, time_limit: float) -> Solution:
+        """
+        排课次数为 1 时每个窗口独立求解, 返回目标值最小的窗口的解; 窗口的目标系数与完整问题一致, 目标值可以直接比较
+        """
+        M, N, J = problem.M, problem.N, problem.J
+
+        def solve_window(window):
+            start, end, _ = window
+            return self.solver.solve(self.window_problem(problem, start, end, None, problem.class_num), threads, time_limit)
+
+        with futures.ThreadPoolExecutor(max_workers=max(self.workers, 1), thread_name_prefix="rolling-horizon") as executor:
+            solutions = list(executor.map(solve_window, windows))
+
+        best = None
+        for (start, end, _), solution in zip(windows, solutions):
+            if solution.success and (best is None or solution.objective < best[1].objective):
+                best = (start, solution)
+
+        if best is None:
+            solution = Solution(np.zeros((M, N)), np.zeros(J), False, status=solutions[-1].status)
+        else:
+            start, window_solution = best
+            x_result = np.zeros((M, N))
+            x_result[start:start + window_solution.x.shape[0]] = window_solution.x
+            solution = Solution(x_result, window_solution.y, True, float((x_result * problem.cost()).sum()),
+                                "Optimal" if window_solution.status == "Optimal" else "Feasible")
+        solution.build_time = sum(window.build_time for window in solutions)
+        solution.solve_time = sum(window.solve_time for window in solutions)
+        return solution
+
+
+SOLVERS = {solver.name: solver for solver in (CbcSolver, HighsSolver, CpSatSolver, NumpySolver)}
+
+
+def get_solver(name: str, problem: Problem, default: str = "cbc") -> Solver:
+    """
+    按名称选择求解器, 不可用或不支持该问题时回退到 default, 再回退到 CBC
+    """
+    for candidate in (name, default, CbcSolver.name):
+        solver_cls = SOLVERS.get(candidate)
+        if solver_cls is None or not solver_cls.available():
+            continue
+        solver = solver_cls()
+        if solver.supports(problem):
+            return solver
+    return CbcSolver()
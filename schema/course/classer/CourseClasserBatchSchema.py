@@ -0,0 +1,4 @@
+from pydantic import BaseModel
+
+class CourseClasserBatchSchema(BaseModel):
+    ids: list[int]
\ No newline at end of file
@@ -0,0 +1,4 @@
+from pydantic import BaseModel
+
+class CourseSeatStreamSchema(BaseModel):
+    id: int  # 课程计划ID
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+class CoursePlanFacetSchema(BaseModel):
+    name: str = ""
+    college: str = ""
+    profession: str = ""
+    credit: int = -1
+    is_selected: int = -1
+    type: str = ""
@@ -8,5 +8,6 @@ class CoursePlanSearchSchema(BaseModel):
     credit: int
     is_selected: int
     type: str
-    page: int
+    page: int = 1
     pagesize: int
+    cursor: Optional[str] = None  # 传入时按游标分页, 空字符串为第一页, 返回 next_cursor
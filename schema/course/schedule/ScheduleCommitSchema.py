@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+class ScheduleCommitSchema(BaseModel):
+    job_id: int
+    candidate: int
\ No newline at end of file
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+class ScheduleHeatmapSchema(BaseModel):
+    class_id: int
+    start_date: str
+    end_date: str
\ No newline at end of file
@@ -0,0 +1,4 @@
+from pydantic import BaseModel
+
+class ScheduleJobSchema(BaseModel):
+    job_id: int
\ No newline at end of file
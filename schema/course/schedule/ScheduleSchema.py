@@ -4,5 +4,10 @@ class ScheduleSchema(BaseModel):
     course_id: int
     start_date: str
     end_date: str
-    classroom: list[int]
-    prefer: list[int]
\ No newline at end of file
+    classroom: list[int] = []  # 为空时按班级人数、课程类型和空闲情况选择候选教室
+    prefer: list[int]
+    top_k: int = 1
+    solver: str = ""
+    mode: str = "once"  # once: 在日期范围内排一次课; weekly: 按周模板排课, 每周重复
+    holidays: list[str] = []  # weekly 模式下跳过的日期
+    weekdays: int = 7  # weekly 模式下每周可选的天数, 5 为只排周一到周五
\ No newline at end of file
@@ -1,7 +1,10 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class CourseHistorySchema(BaseModel):
-    page: int
+    page: int = 1
     pagesize: int
     class_id: int
-    action_type: str
\ No newline at end of file
+    action_type: str
+    cursor: Optional[str] = None  # 传入时按游标分页, 空字符串为第一页, 返回 next_cursor
+    estimate: bool = False  # 为 True 时总数可以是由表统计信息估算的值, 返回 total_estimated
@@ -0,0 +1,4 @@
+from pydantic import BaseModel
+
+class TeacherBatchInfoSchema(BaseModel):
+    ids: list[int]
\ No newline at end of file
@@ -1,5 +1,11 @@
 from fastapi import APIRouter
 from .time import time_router
+from .schedule import admin_schedule_router
+from .cache import admin_cache_router
+from .db import admin_db_router
 
 admin_router = APIRouter()
 admin_router.include_router(time_router, prefix='/time')
+admin_router.include_router(admin_schedule_router, prefix='/schedule')
+admin_router.include_router(admin_cache_router, prefix='/cache')
+admin_router.include_router(admin_db_router, prefix='/db')
@@ -0,0 +1,5 @@
+from fastapi import APIRouter
+from .stats import stats_router
+
+admin_cache_router = APIRouter()
+admin_cache_router.include_router(stats_router)
@@ -0,0 +1,30 @@
+import traceback
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from crud.ScheduleCrud import heatmap_cache
+from utils.auth_token import validate_admin_token
+from utils.catalog_cache import catalog_cache
+from utils.count_cache import count_cache
+
+stats_router = APIRouter()
+
+@stats_router.get("/stats")
+async def _(token_payload: dict = Depends(validate_admin_token)):
+    """
+    本进程内各缓存的命中率和占用, 多个 worker 时为处理该请求的 worker 的数据
+    """
+    try:
+        data = {
+            "catalog": catalog_cache.stats(),
+            "count": count_cache.stats(),
+            "heatmap": heatmap_cache.stats()
+        }
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"{e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": data
+    }
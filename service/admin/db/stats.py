@@ -0,0 +1,24 @@
+import traceback
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from utils.auth_token import validate_admin_token
+from utils.query_stats import route_stats
+
+stats_router = APIRouter()
+
+@stats_router.get("/stats")
+async def _(token_payload: dict = Depends(validate_admin_token)):
+    """
+    本进程内各路由的数据库查询统计 (请求数、查询数、数据库耗时、最慢语句), 按数据库总耗时降序
+    """
+    try:
+        data = route_stats.snapshot()
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"{e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": data
+    }
@@ -0,0 +1,5 @@
+from fastapi import APIRouter
+from .batch import batch_router
+
+admin_schedule_router = APIRouter()
+admin_schedule_router.include_router(batch_router)
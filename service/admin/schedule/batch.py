@@ -0,0 +1,82 @@
+import traceback
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from config import config
+from crud.ClassroomCrud import ClassroomCrud
+from crud.ScheduleJobCrud import ScheduleJobCrud
+from model.ClassModel import Class
+from model.ScheduleJobModel import ScheduleJob
+from schema.admin.schedule.ScheduleBatchSchema import ScheduleBatchSchema
+from schema.course.schedule.ScheduleJobSchema import ScheduleJobSchema
+from utils.auth_token import validate_admin_token
+from utils.get_db import get_db
+from utils.schedule_job import schedule_worker
+
+batch_router = APIRouter()
+
+@batch_router.post("/batch")
+async def _(body: ScheduleBatchSchema, token_payload: dict = Depends(validate_admin_token), db: Session = Depends(get_db)):
+    try:
+        classes = {classer.id: classer for classer in db.query(Class).filter(Class.id.in_(body.class_ids)).all()}
+        missing = [class_id for class_id in body.class_ids if class_id not in classes]
+
+        jobs = []
+        no_classroom = []
+        for class_id in body.class_ids:
+            classer = classes.get(class_id)
+            if classer is None:
+                continue
+            classroom = ClassroomCrud.select_candidates(db, classer, body.start_date, body.end_date,
+                                                        config.schedule_candidate_rooms, body.classroom)
+            if not classroom:
+                no_classroom.append(class_id)
+                continue
+            params = {
+                "start_date": body.start_date,
+                "end_date": body.end_date,
+                "classroom": classroom,
+                "prefer": body.prefer,
+                "top_k": body.top_k,
+                "solver": body.solver,
+                "mode": body.mode,
+                "holidays": body.holidays,
+                "weekdays": body.weekdays
+            }
+            job = ScheduleJobCrud.create(db, classer.teacher_id, class_id, params)
+            jobs.append({"class_id": class_id, "job_id": job.id})
+
+        if jobs:
+            schedule_worker.submit_batch([job["job_id"] for job in jobs])
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": {
+            "jobs": jobs,
+            "missing": missing,
+            "no_classroom": no_classroom
+        }
+    }
+
+
+@batch_router.get("/job")
+async def _(body: ScheduleJobSchema = Depends(), token_payload: dict = Depends(validate_admin_token), db: Session = Depends(get_db)):
+    try:
+        job = ScheduleJobCrud.get_by_id(db, ScheduleJob, body.job_id)
+        if job is None:
+            return JSONResponse(status_code=404, content={"status": 1, "message": "Job Not Found"})
+        queue_position = ScheduleJobCrud.get_queue_position(db, job)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": ScheduleJobCrud.to_dict(job, queue_position)
+    }
@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 from .detail import detail_router 
 from .list import list_router
+from .seat_stream import seat_stream_router
+from .batch import batch_router
 
 classer_router = APIRouter()
 classer_router.include_router(detail_router)
-classer_router.include_router(list_router)
\ No newline at end of file
+classer_router.include_router(list_router)
+classer_router.include_router(seat_stream_router)
+classer_router.include_router(batch_router)
\ No newline at end of file
@@ -0,0 +1,33 @@
+import traceback
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from config import config
+from schema.course.classer.CourseClasserBatchSchema import CourseClasserBatchSchema
+from crud.ClassCrud import ClassCrud
+from utils.auth_token import validate_student_token
+from utils.get_db import get_db
+batch_router = APIRouter()
+
+@batch_router.post("/batch")
+async def _(body: CourseClasserBatchSchema, token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
+    # 去重并保持请求中的顺序
+    ids = list(dict.fromkeys(body.ids))
+    if len(ids) > config.batch_lookup_max:
+        return JSONResponse(status_code=400, content={"status": 1, "message": f"Too many ids, at most {config.batch_lookup_max}"})
+
+    try:
+        classes = ClassCrud.get_by_ids(db, ids)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": {
+            "items": [classes[class_id] for class_id in ids if class_id in classes],
+            "missing": [class_id for class_id in ids if class_id not in classes]
+        }
+    }
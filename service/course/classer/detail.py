@@ -1,21 +1,31 @@
 import traceback
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from schema.course.classer.CourseClasserDetailSchema import CourseClasserDetailSchema
 from crud.ClassCrud import ClassCrud
 from utils.auth_token import validate_student_token
 from utils.get_db import get_db
+from utils.conditional import version_stamps, check_not_modified
+from utils.catalog_cache import CLASS_TABLES
 detail_router = APIRouter()
 
 @detail_router.get("/detail")
-async def _(body:CourseClasserDetailSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
+async def _(request: Request, response: Response, body:CourseClasserDetailSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
     user_id = token_payload.get("user_id")
     id = body.id
 
     try:
-        data = ClassCrud.get_by_id(db, id)
+        num = ClassCrud.get_num(db, id)
+        if num is not None:
+            # 班级人数随选课实时变化, 不提供 Last-Modified
+            stamps, _ = version_stamps(db, CLASS_TABLES)
+            not_modified = check_not_modified(request, response, stamps + (("class_num", num),))
+            if not_modified is not None:
+                return not_modified
+
+        data = ClassCrud.get_by_id(db, id, num) if num is not None else None
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
@@ -23,7 +23,11 @@ async def _(body:CourseClasserListSchema = Depends(), token_payload: dict = Depe
                                              user_id=user_id, 
                                              id=id, 
                                              page=page, 
-                                             page_size=pagesize)
+                                             page_size=pagesize,
+                                             cursor=body.cursor,
+                                             estimate=body.estimate)
+    except ValueError as ve:
+        return JSONResponse(status_code=400, content={"status": 1, "message": f"{ve}"})
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import time
+import traceback
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sse_starlette.sse import EventSourceResponse
+from config import config
+from crud.ClassCrud import ClassCrud
+from database import SessionLocal
+from schema.course.classer.CourseSeatStreamSchema import CourseSeatStreamSchema
+from utils.auth_token import validate_student_token
+from utils.seat_broadcaster import seat_broadcaster
+
+seat_stream_router = APIRouter()
+
+
+def seats_data(seats: dict) -> str:
+    return json.dumps([{"id": class_id, "num": num, "max_num": max_num} for class_id, (num, max_num) in sorted(seats.items())])
+
+
+def load_seats(plan_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        return ClassCrud.get_seats(db, plan_id)
+    finally:
+        db.close()
+
+
+@seat_stream_router.get("/seatStream")
+async def _(body: CourseSeatStreamSchema = Depends(), token_payload: dict = Depends(validate_student_token)):
+    """
+    推送课程计划下各班级的人数: 连接后先发送全部班级, 之后只发送有变化的班级 (事件 seats)
+    """
+    plan_id = body.id
+
+    try:
+        seats = load_seats(plan_id)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    if not seats:
+        return JSONResponse(status_code=404, content={"status": 1, "message": "Class Not Found"})
+
+    async def event_generator():
+        subscriber = seat_broadcaster.subscribe(seats.keys())
+        last = dict(seats)
+        try:
+            yield {"event": "seats", "data": seats_data(last)}
+            resync_at = time.monotonic() + config.seat_stream_resync
+            while True:
+                try:
+                    await asyncio.wait_for(subscriber.ready.wait(), max(resync_at - time.monotonic(), 0))
+                    changes = subscriber.take()
+                except asyncio.TimeoutError:
+                    # 定期重新读取, 获取其他进程中的变化和新开设的班级
+                    current = await asyncio.to_thread(load_seats, plan_id)
+                    subscriber.class_ids = set(current.keys())
+                    changes = current
+                    resync_at = time.monotonic() + config.seat_stream_resync
+
+                changes = {class_id: value for class_id, value in changes.items() if last.get(class_id) != value}
+                if changes:
+                    last.update(changes)
+                    yield {"event": "seats", "data": seats_data(changes)}
+        finally:
+            seat_broadcaster.unsubscribe(subscriber)
+
+    return EventSourceResponse(event_generator())
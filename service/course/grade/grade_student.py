@@ -20,7 +20,11 @@ async def _(body: CourseGradeSchema = Depends(), token_payload: dict = Depends(v
         data = StudentCourseCrud.get_student_grade_page(db, 
                                                         student_id=user_id,
                                                         page=page,
-                                                        page_size=pagesize)
+                                                        page_size=pagesize,
+                                                        cursor=body.cursor,
+                                                        estimate=body.estimate)
+    except ValueError as ve:
+        return JSONResponse(status_code=400, content={"status": 1, "message": f"{ve}"})
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
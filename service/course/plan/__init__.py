@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 from .list import list_router
 from .detail import detail_router
+from .facets import facets_router
+from .batch import batch_router
 
 plan_router = APIRouter()
 plan_router.include_router(list_router)
-plan_router.include_router(detail_router)
\ No newline at end of file
+plan_router.include_router(detail_router)
+plan_router.include_router(facets_router)
+plan_router.include_router(batch_router)
\ No newline at end of file
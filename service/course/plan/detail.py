@@ -1,22 +1,28 @@
 import traceback
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from schema.course.plan.CoursePlanDetailSchema import CoursePlanDetailSchema
 from crud.ClassPlanCrud import ClassPlanCrud
 from utils.auth_token import validate_student_token
 from utils.get_db import get_db
-from model.ClassPlanModel import ClassPlan
+from utils.conditional import version_stamps, check_not_modified
+from utils.catalog_cache import PLAN_TABLES
 detail_router = APIRouter()
 
 @detail_router.get("/detail")
-async def _(body:CoursePlanDetailSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
+async def _(request: Request, response: Response, body:CoursePlanDetailSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
     user_id = token_payload.get("user_id")
     id = body.id
 
     try:
-        plan = ClassPlanCrud.get_by_id(db, ClassPlan, id)
+        stamps, last_modified = version_stamps(db, PLAN_TABLES)
+        not_modified = check_not_modified(request, response, stamps, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        plan = ClassPlanCrud.get_detail(db, id)
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
@@ -27,13 +33,5 @@ async def _(body:CoursePlanDetailSchema = Depends(), token_payload: dict = Depen
     return {
         "status": 0,
         "message": "OK",
-        "data": {
-            "id": plan.id,
-            "name": plan.name,
-            "introduction": plan.introduction,
-            "profession": plan.profession,
-            "college": plan.college,
-            "credit": plan.credit,
-            "type": plan.type
-        }
+        "data": plan
     }
\ No newline at end of file
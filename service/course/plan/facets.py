@@ -0,0 +1,41 @@
+import traceback
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from schema.course.plan.CoursePlanFacetSchema import CoursePlanFacetSchema
+from crud.ClassPlanCrud import ClassPlanCrud
+from utils.auth_token import validate_student_token
+from utils.get_db import get_db
+from utils.conditional import version_stamps, check_not_modified
+from utils.catalog_cache import PLAN_SELECTION_TABLES
+
+facets_router = APIRouter()
+
+@facets_router.get("/facets")
+async def _(request: Request, response: Response, body: CoursePlanFacetSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
+    user_id = token_payload.get("user_id")
+
+    try:
+        stamps, last_modified = version_stamps(db, PLAN_SELECTION_TABLES, student_id=user_id)
+        not_modified = check_not_modified(request, response, stamps, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        data = ClassPlanCrud.get_facets(db,
+                                        student_id=user_id,
+                                        name=body.name,
+                                        credit=body.credit,
+                                        profession=body.profession,
+                                        type=body.type,
+                                        college=body.college,
+                                        is_selected=body.is_selected)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": data
+    }
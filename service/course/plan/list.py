@@ -1,17 +1,19 @@
 import traceback
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from schema.course.plan.CoursePlanSearchSchema import CoursePlanSearchSchema
 from crud.ClassPlanCrud import ClassPlanCrud
 from utils.auth_token import validate_student_token
 from utils.get_db import get_db
+from utils.conditional import version_stamps, check_not_modified
+from utils.catalog_cache import PLAN_SELECTION_TABLES
 
 list_router = APIRouter()
 
 @list_router.get("/list")
-async def _(body: CoursePlanSearchSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
+async def _(request: Request, response: Response, body: CoursePlanSearchSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
     user_id = token_payload.get("user_id")
     name = body.name
     profession = body.profession
@@ -23,6 +25,11 @@ async def _(body: CoursePlanSearchSchema = Depends(), token_payload: dict = Depe
     is_selected = body.is_selected
 
     try:
+        stamps, last_modified = version_stamps(db, PLAN_SELECTION_TABLES, student_id=user_id)
+        not_modified = check_not_modified(request, response, stamps, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         data = ClassPlanCrud.get_by_filters(db, 
                                             student_id=user_id, 
                                             page=page, 
@@ -32,7 +39,10 @@ async def _(body: CoursePlanSearchSchema = Depends(), token_payload: dict = Depe
                                             profession=profession, 
                                             type=type, 
                                             college=college, 
-                                            is_selected=is_selected)
+                                            is_selected=is_selected,
+                                            cursor=body.cursor)
+    except ValueError as ve:
+        return JSONResponse(status_code=400, content={"status": 1, "message": f"{ve}"})
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
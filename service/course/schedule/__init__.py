@@ -5,6 +5,9 @@ from .schedule_list import schedule_list_router
 from .schedule import schedules_router
 from .teacher_schedule_delete import teacher_schedule_delete_router
 from .teacher_schedule_list import teacher_schedule_list_router
+from .schedule_job import schedule_job_router
+from .schedule_commit import schedule_commit_router
+from .heatmap import heatmap_router
 
 schedule_router = APIRouter()
 schedule_router.include_router(class_list_router)
@@ -12,4 +15,7 @@ schedule_router.include_router(classroom_list_router)
 schedule_router.include_router(schedule_list_router)
 schedule_router.include_router(schedules_router)
 schedule_router.include_router(teacher_schedule_delete_router)
-schedule_router.include_router(teacher_schedule_list_router)
\ No newline at end of file
+schedule_router.include_router(teacher_schedule_list_router)
+schedule_router.include_router(schedule_job_router)
+schedule_router.include_router(schedule_commit_router)
+schedule_router.include_router(heatmap_router)
\ No newline at end of file
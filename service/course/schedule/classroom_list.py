@@ -15,7 +15,7 @@ async def _(body: ClassroomListScheduleSchema = Depends(), token_payload: dict =
     user_id = token_payload.get("user_id")
     num = body.class_num
     try:
-        classroom = ClassroomCrud.get_all_S(db, num)
+        classroom = ClassroomCrud.get_S_list(db, num)
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
@@ -23,10 +23,5 @@ async def _(body: ClassroomListScheduleSchema = Depends(), token_payload: dict =
     return {
         "status": 0,
         "message": "OK",
-        "data": [{
-            "classroom_id": _.id,
-            "name": _.name,
-            "location": _.location,
-            "capacity": _.capacity
-        } for _ in classroom]
+        "data": classroom
     }
\ No newline at end of file
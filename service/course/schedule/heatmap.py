@@ -0,0 +1,38 @@
+import traceback
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from crud.Crud import AbstractCrud
+from crud.ClassroomCrud import ClassroomCrud
+from crud.ScheduleCrud import ScheduleCrud
+from model.ClassModel import Class
+from schema.course.schedule.ScheduleHeatmapSchema import ScheduleHeatmapSchema
+from utils.auth_token import validate_teacher_token
+from utils.get_db import get_db
+
+heatmap_router = APIRouter()
+
+@heatmap_router.get("/heatmap")
+async def _(body: ScheduleHeatmapSchema = Depends(), token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
+    user_id = token_payload.get("user_id")
+    class_id = body.class_id
+    start_date = body.start_date
+    end_date = body.end_date
+
+    try:
+        classer = AbstractCrud.get_by_id(db, Class, class_id)
+        if classer is None:
+            return JSONResponse(status_code=404, content={"status": 1, "message": "Class Not Found"})
+
+        classroom_ids = [classroom.id for classroom in ClassroomCrud.get_all_S(db, classer.num)]
+        data = ScheduleCrud.get_conflict_heatmap(db, class_id, classroom_ids, start_date, end_date)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": data
+    }
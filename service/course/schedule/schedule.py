@@ -3,18 +3,16 @@ import traceback
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from crud.ScheduleCrud import ScheduleCrud
-from crud.ClassScheduleCrud import ClassScheduleCrud
-from crud.TeacherScheduleCrud import TeacherScheduleCrud 
+from config import config
+from crud.Crud import AbstractCrud
+from crud.ClassroomCrud import ClassroomCrud
+from crud.ScheduleJobCrud import ScheduleJobCrud
+from model.ClassModel import Class
 
-from model.ClassScheduleModel import ClassSchedule
 from schema.course.schedule.ScheduleSchema import ScheduleSchema
 from utils.auth_token import validate_teacher_token
 from utils.get_db import get_db
-from utils.opt_client.opt import run_opt_client
-import numpy as np
-from datetime import datetime, timedelta
-from config import config
+from utils.schedule_job import schedule_worker
 
 schedules_router = APIRouter()
 
@@ -22,86 +20,41 @@ schedules_router = APIRouter()
 async def _(body: ScheduleSchema, token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
     user_id = token_payload.get("user_id")
     course_id = body.course_id
-    start_date = body.start_date
-    end_date = body.end_date
-    classroom = body.classroom
-    prefer = body.prefer
+    params = {
+        "start_date": body.start_date,
+        "end_date": body.end_date,
+        "classroom": body.classroom,
+        "prefer": body.prefer,
+        "top_k": body.top_k,
+        "solver": body.solver,
+        "mode": body.mode,
+        "holidays": body.holidays,
+        "weekdays": body.weekdays
+    }
 
     try:
-        student_schedule_matrix, student_id = ScheduleCrud.get_student_schedule_matrix(db, course_id, start_date, end_date)
-        classroom_schedule_matrix = ScheduleCrud.get_classroom_schedule_matrix(db, classroom, start_date, end_date)
-        
-        student_num, day_num, _ = student_schedule_matrix.shape
-        classroom_num, _, _ = classroom_schedule_matrix.shape
-
-        day_w = np.ones(day_num).tolist()
-        day_5 = np.array(prefer).tolist()
-
-        print(student_schedule_matrix)
-        print(classroom_schedule_matrix)
-        print(student_schedule_matrix.shape)
-        print(classroom_schedule_matrix.shape)
-
-        result = run_opt_client(config.schedule_address, day_num, 
-                                student_num, classroom_num, 1, 
-                                1, student_schedule_matrix.astype(int).flatten().tolist(), 
-                                classroom_schedule_matrix.astype(int).flatten().tolist(), day_w, day_5)
-
-        print(result)
-        print(day_w)
-        print(day_5)
-        if result['state']:
-            if result['w'] < 0.5:
-                x = np.array(result['X'])
-                indices = np.where(x == 1)
-                start_time = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S").replace(hour=0, minute=0, second=0, microsecond=0)
-
-                time_mapping = [timedelta(hours=8), timedelta(hours=10), timedelta(hours=14), timedelta(hours=16), timedelta(hours=19)]
-
-                print(indices)
-                start_time = start_time + timedelta(days=int(indices[0][0])) + time_mapping[int(indices[1][0])]
-                print(start_time)
-                end_time = start_time + timedelta(hours=2)
-                print(end_time)
-                y = np.array(result['Y'])
-                indices = np.where(y == 1)
-                classroom_id = classroom[int(indices[0][0])]
-
-                res = student_id * np.sum(student_schedule_matrix * x.reshape(-1, 5), axis=(1, 2))
-                c_student_id =  res[res != 0]
-
-                classScheduler:ClassSchedule = ClassScheduleCrud.create(db, 
-                                        start_time=start_time,
-                                        end_time=end_time,
-                                        classroom=classroom_id,
-                                        class_id=course_id)
-                
-                TeacherScheduleCrud.create(db, user_id, classScheduler.id, result['w'], result['pref'], c_student_id.tolist())
-                
-                schedule_data = {
-                    "perf": result['pref'],
-                    "w": result['w'],
-                    "schedule": {
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "classroom_id": classroom_id
-                    },
-                    "conflict_students": []
-                }
-                
-                return {
-                        "status": 0,
-                        "message": "OK",
-                        "data": schedule_data
-                    }
-            else: 
-                return JSONResponse(status_code=500, content={"status": 1, "message": f"Error: 学生冲突率{result['w'] * 100}%过高, 排课失败"})
-
-        else:
-            return JSONResponse(status_code=500, content={"status": 1, "message": f"Error: 教室冲突，排课失败"})
-
+        classer = AbstractCrud.get_by_id(db, Class, course_id)
+        if classer is None:
+            return JSONResponse(status_code=404, content={"status": 1, "message": "Class Not Found"})
+
+        params["classroom"] = ClassroomCrud.select_candidates(db, classer, body.start_date, body.end_date,
+                                                              config.schedule_candidate_rooms, body.classroom)
+        if not params["classroom"]:
+            return JSONResponse(status_code=400, content={"status": 1, "message": "没有容量足够且有空闲时间段的教室"})
+
+        job = ScheduleJobCrud.create(db, user_id, course_id, params)
+        schedule_worker.submit(job.id)
+        queue_position = ScheduleJobCrud.get_queue_position(db, job)
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Error: {e}"})
 
-
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": {
+            "job_id": job.id,
+            "status": job.status,
+            "queue_position": queue_position
+        }
+    }
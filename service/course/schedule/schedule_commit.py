@@ -0,0 +1,44 @@
+import traceback
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from crud.ScheduleJobCrud import ScheduleJobCrud
+from schema.course.schedule.ScheduleCommitSchema import ScheduleCommitSchema
+from utils.auth_token import validate_teacher_token
+from utils.get_db import get_db
+from utils.schedule_job import commit_candidate
+
+schedule_commit_router = APIRouter()
+
+@schedule_commit_router.post("/commit")
+async def _(body: ScheduleCommitSchema, token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
+    user_id = token_payload.get("user_id")
+    job_id = body.job_id
+    candidate = body.candidate
+
+    try:
+        job = ScheduleJobCrud.get_by_teacher(db, job_id, user_id)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    if job is None:
+        return JSONResponse(status_code=404, content={"status": 1, "message": "Job Not Found"})
+
+    if job.status != "Success" or job.teacher_schedule_id is not None:
+        return JSONResponse(status_code=400, content={"status": 1, "message": "该排课任务没有可提交的候选"})
+
+    try:
+        data = commit_candidate(db, job, candidate)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": 1, "message": f"{e}"})
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": data
+    }
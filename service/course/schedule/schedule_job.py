@@ -0,0 +1,80 @@
+import asyncio
+import json
+import traceback
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from sse_starlette.sse import EventSourceResponse
+from crud.ScheduleJobCrud import ScheduleJobCrud
+from database import SessionLocal
+from schema.course.schedule.ScheduleJobSchema import ScheduleJobSchema
+from utils.auth_token import validate_teacher_token
+from utils.get_db import get_db
+
+schedule_job_router = APIRouter()
+
+@schedule_job_router.get("/job")
+async def _(body: ScheduleJobSchema = Depends(), token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
+    user_id = token_payload.get("user_id")
+    job_id = body.job_id
+
+    try:
+        job = ScheduleJobCrud.get_by_teacher(db, job_id, user_id)
+        if job is None:
+            return JSONResponse(status_code=404, content={"status": 1, "message": "Job Not Found"})
+        queue_position = ScheduleJobCrud.get_queue_position(db, job)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": ScheduleJobCrud.to_dict(job, queue_position)
+    }
+
+
+@schedule_job_router.get("/jobStream")
+async def _(body: ScheduleJobSchema = Depends(), token_payload: dict = Depends(validate_teacher_token)):
+    user_id = token_payload.get("user_id")
+    job_id = body.job_id
+
+    async def event_generator():
+        last_status = None
+        while True:
+            db = SessionLocal()
+            try:
+                job = ScheduleJobCrud.get_by_teacher(db, job_id, user_id)
+                if job is None:
+                    yield {"event": "error", "data": json.dumps({"message": "Job Not Found"})}
+                    return
+                data = ScheduleJobCrud.to_dict(job, ScheduleJobCrud.get_queue_position(db, job))
+            finally:
+                db.close()
+
+            if data["status"] != last_status:
+                last_status = data["status"]
+                yield {"event": "status", "data": json.dumps(data, default=str)}
+
+            if data["status"] in ("Success", "Failed"):
+                return
+
+            await asyncio.sleep(1)
+
+    return EventSourceResponse(event_generator())
+
+
+@schedule_job_router.get("/jobStats")
+async def _(token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
+    try:
+        data = ScheduleJobCrud.get_stats(db)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": data
+    }
@@ -7,6 +7,7 @@ from crud.TeacherScheduleCrud import TeacherScheduleCrud
 from model.TeacherScheduleModel import TeacherSchedule
 from model.ClassScheduleModel import ClassSchedule
 from crud.ClassScheduleCrud import ClassScheduleCrud
+from crud.ClassroomReservationCrud import ClassroomReservationCrud
 from schema.course.schedule.TeacherScheduleDeleteSchema import TeacherScheduleDeleteSchema
 
 from utils.auth_token import validate_teacher_token
@@ -21,6 +22,7 @@ async def _(body: TeacherScheduleDeleteSchema, token_payload: dict = Depends(val
 
     try:
         data = TeacherScheduleCrud.delete_by_id(db, TeacherSchedule, id)
+        ClassroomReservationCrud.delete_by_class_schedule(db, data.class_schedule_id)
         ClassScheduleCrud.delete_by_id(db, ClassSchedule, data.class_schedule_id)
 
     except Exception as e:
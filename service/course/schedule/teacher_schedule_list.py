@@ -22,6 +22,9 @@ async def _(body: TeacherScheduleListSchema = Depends(), token_payload: dict = D
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
 
+    if data is None:
+        return JSONResponse(status_code=404, content={"status": 1, "message": "Schedule Not Found"})
+
     return {
         "status": 0,
         "message": "OK",
@@ -19,7 +19,9 @@ async def _(body: CourseHistorySchema = Depends(), token_payload: dict = Depends
     page_size = body.pagesize
 
     try:
-        data = EnrollmentHistoryCrud.get_by_filters(db, page, page_size, user_id, class_id, action_type)
+        data = EnrollmentHistoryCrud.get_by_filters(db, page, page_size, user_id, class_id, action_type, body.cursor, body.estimate)
+    except ValueError as ve:
+        return JSONResponse(status_code=400, content={"status": 1, "message": f"{ve}"})
     except Exception as e:
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
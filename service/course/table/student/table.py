@@ -1,17 +1,19 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from crud.SCCrud import StudentCourseCrud
 from schema.course.table.CourseTableSchema import CourseTableSchema
 from utils.auth_token import validate_student_token
 from utils.get_db import get_db
+from utils.conditional import version_stamps, check_not_modified
+from utils.catalog_cache import TIMETABLE_TABLES
 import traceback
 
 table_router = APIRouter()
 
 @table_router.get("/table")
-async def _(body: CourseTableSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
+async def _(request: Request, response: Response, body: CourseTableSchema = Depends(), token_payload: dict = Depends(validate_student_token), db: Session = Depends(get_db)):
     user_id = token_payload.get("user_id")
     time_str = body.time  
 
@@ -23,6 +25,11 @@ async def _(body: CourseTableSchema = Depends(), token_payload: dict = Depends(v
         return JSONResponse(status_code=400, content={"status": 1, "message": "Invalid time format, expected YYYY-MM"})
 
     try:
+        stamps, last_modified = version_stamps(db, TIMETABLE_TABLES, student_id=user_id)
+        not_modified = check_not_modified(request, response, stamps, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         data = StudentCourseCrud.get_courses_by_month(db, student_id=user_id, month=month, year = year)
     except Exception as e:
         traceback.print_exc()
@@ -1,17 +1,19 @@
 from datetime import datetime
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from crud.TeacherCrud import TeacherCrud
 from schema.course.table.CourseDayTableSchema import CourseDayTableSchema
 from utils.auth_token import validate_teacher_token
 from utils.get_db import get_db
+from utils.conditional import version_stamps, check_not_modified
+from utils.catalog_cache import TIMETABLE_TABLES
 import traceback
 
 day_table_router = APIRouter()
 
 @day_table_router.get("/dayTable")
-async def _(body: CourseDayTableSchema = Depends(), token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
+async def _(request: Request, response: Response, body: CourseDayTableSchema = Depends(), token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
     user_id = token_payload.get("user_id")
     time_str = body.time  
 
@@ -22,6 +24,11 @@ async def _(body: CourseDayTableSchema = Depends(), token_payload: dict = Depend
         return JSONResponse(status_code=400, content={"status": 1, "message": "Invalid time format, expected YYYY-MM"})
 
     try:
+        stamps, last_modified = version_stamps(db, TIMETABLE_TABLES)
+        not_modified = check_not_modified(request, response, stamps + (("teacher", user_id),), last_modified)
+        if not_modified is not None:
+            return not_modified
+
         data = TeacherCrud.get_courses_by_day(db, 
                                                     teacher_id=user_id,
                                                     specific_date=time_obj)
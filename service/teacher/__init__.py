@@ -2,8 +2,10 @@ from fastapi import APIRouter
 from .update_info import update_info_router
 from .get_info import get_info_router
 from .list_info import list_info_router
+from .batch_info import batch_info_router
 
 teacher_router = APIRouter()
 teacher_router.include_router(update_info_router)
 teacher_router.include_router(get_info_router)
-teacher_router.include_router(list_info_router)
\ No newline at end of file
+teacher_router.include_router(list_info_router)
+teacher_router.include_router(batch_info_router)
\ No newline at end of file
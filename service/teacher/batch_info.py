@@ -0,0 +1,33 @@
+import traceback
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from config import config
+from schema.teacher.TeacherBatchInfoSchema import TeacherBatchInfoSchema
+from crud.TeacherCrud import TeacherCrud
+from utils.auth_token import validate_teacher_token
+from utils.get_db import get_db
+batch_info_router = APIRouter()
+
+@batch_info_router.post("/batchInfo")
+async def _(body: TeacherBatchInfoSchema, token_payload: dict = Depends(validate_teacher_token), db: Session = Depends(get_db)):
+    # 去重并保持请求中的顺序
+    ids = list(dict.fromkeys(body.ids))
+    if len(ids) > config.batch_lookup_max:
+        return JSONResponse(status_code=400, content={"status": 1, "message": f"Too many ids, at most {config.batch_lookup_max}"})
+
+    try:
+        teachers = TeacherCrud.get_infos(db, ids)
+    except Exception as e:
+        traceback.print_exc()
+        return JSONResponse(status_code=500, content={"status": 1, "message": f"Database Error: {e}"})
+
+    return {
+        "status": 0,
+        "message": "OK",
+        "data": {
+            "items": [dict(teachers[teacher_id], id=teacher_id) for teacher_id in ids if teacher_id in teachers],
+            "missing": [teacher_id for teacher_id in ids if teacher_id not in teachers]
+        }
+    }
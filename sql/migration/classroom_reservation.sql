@@ -0,0 +1,31 @@
+-- 为已有的课程安排补齐教室预约, 部署 classroom_reservation 表之后执行一次
+use database_exp;
+
+CREATE TABLE IF NOT EXISTS classroom_reservation (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,      -- 预约ID
+    classroom_id INTEGER NOT NULL,              -- Foreign key referencing classroom(id)
+    reserve_date DATE NOT NULL,                 -- 预约日期
+    slot INTEGER NOT NULL,                      -- 时间段下标 0-4 (8:00, 10:00, 14:00, 16:00, 19:00)
+    class_schedule_id INTEGER,                  -- Foreign key referencing class_schedule(id)
+    created_time DATETIME NOT NULL,             -- 创建时间
+    UNIQUE KEY uq_classroom_reservation (classroom_id, reserve_date, slot),
+    FOREIGN KEY (classroom_id) REFERENCES classroom(id),
+    FOREIGN KEY (class_schedule_id) REFERENCES class_schedule(id) ON DELETE CASCADE
+);
+
+-- 已存在的重复占用 (同一教室同一时间段多条课程安排), 需要人工处理, 补齐时只保留 id 最小的一条
+SELECT classroom_id, DATE(start_time) AS reserve_date, HOUR(start_time) AS start_hour, GROUP_CONCAT(id ORDER BY id) AS class_schedule_ids
+FROM class_schedule
+GROUP BY classroom_id, DATE(start_time), HOUR(start_time)
+HAVING COUNT(*) > 1;
+
+INSERT IGNORE INTO classroom_reservation (classroom_id, reserve_date, slot, class_schedule_id, created_time)
+SELECT
+    classroom_id,
+    DATE(start_time),
+    CASE HOUR(start_time) WHEN 8 THEN 0 WHEN 10 THEN 1 WHEN 14 THEN 2 WHEN 16 THEN 3 WHEN 19 THEN 4 END,
+    id,
+    NOW()
+FROM class_schedule
+WHERE HOUR(start_time) IN (8, 10, 14, 16, 19)
+ORDER BY id;
@@ -0,0 +1,18 @@
+-- 各 web 进程通过 data_version 中的版本号校验本地的课程目录缓存, 并生成条件请求的 ETag
+use database_exp;
+
+CREATE TABLE IF NOT EXISTS data_version (
+    name VARCHAR(50) PRIMARY KEY,               -- 数据集名称, 如 catalog:<表名>, enrollment:<学生ID>
+    version INTEGER NOT NULL DEFAULT 0,         -- 版本号, 数据集中的表每次提交写入后加一
+    updated_time DATETIME                       -- 最近一次更新版本号的时间
+);
+
+-- 课程目录的每个表有独立的版本号, 写入课程安排不会使课程计划的缓存失效
+INSERT IGNORE INTO data_version (name, version) VALUES
+    ('catalog:class_plan', 0), ('catalog:classroom', 0), ('catalog:class_schedule', 0), ('catalog:class', 0), ('catalog:teacher', 0);
+
+-- 已按之前的定义创建了 data_version 表时删除不再使用的全局版本号
+-- DELETE FROM data_version WHERE name = 'catalog';
+
+-- 已按之前的定义创建了 data_version 表时补充更新时间列
+-- ALTER TABLE data_version ADD COLUMN updated_time DATETIME;
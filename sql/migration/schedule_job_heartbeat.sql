@@ -0,0 +1,5 @@
+-- 排课任务记录执行进程和心跳时间, 只有心跳超时 (进程已退出) 的 Running 任务才会重新排队
+use database_exp;
+
+ALTER TABLE schedule_job ADD COLUMN worker_id VARCHAR(64);
+ALTER TABLE schedule_job ADD COLUMN heartbeat_time DATETIME;
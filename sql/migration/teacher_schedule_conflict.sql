@@ -0,0 +1,22 @@
+-- 将 teacher_schedule.conflict_student_ids 中的 JSON 列表迁移到 teacher_schedule_conflict 表 (MySQL 8.0+)
+use database_exp;
+
+CREATE TABLE IF NOT EXISTS teacher_schedule_conflict (
+    teacher_schedule_id INTEGER NOT NULL,       -- Foreign key referencing teacher_schedule(id)
+    student_id INTEGER NOT NULL,                -- Foreign key referencing student(id), 冲突的学生
+    PRIMARY KEY (teacher_schedule_id, student_id),
+    KEY (student_id),
+    FOREIGN KEY (teacher_schedule_id) REFERENCES teacher_schedule(id) ON DELETE CASCADE,
+    FOREIGN KEY (student_id) REFERENCES student(id)
+);
+
+-- 已删除的学生不再迁移
+INSERT IGNORE INTO teacher_schedule_conflict (teacher_schedule_id, student_id)
+SELECT ts.id, conflict.student_id
+FROM teacher_schedule ts
+JOIN JSON_TABLE(ts.conflict_student_ids, '$[*]' COLUMNS (student_id INTEGER PATH '$')) AS conflict
+JOIN student s ON s.id = conflict.student_id
+WHERE ts.conflict_student_ids IS NOT NULL AND JSON_VALID(ts.conflict_student_ids);
+
+-- 核对迁移结果后再删除旧列
+-- ALTER TABLE teacher_schedule DROP COLUMN conflict_student_ids;
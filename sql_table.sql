@@ -97,7 +97,55 @@ CREATE TABLE teacher_schedule (
     class_schedule_id INTEGER NOT NULL,         -- Foreign key referencing class_schedule(id)
     conflict_rate FLOAT NOT NULL DEFAULT 0,     -- 冲突率
     preference_satisfaction FLOAT NOT NULL DEFAULT 0, -- 偏好满意度
-    conflict_student_ids TEXT,                  -- 冲突的学生 ID 列表，JSON 格式存储
     FOREIGN KEY (teacher_id) REFERENCES teacher(id), 
     FOREIGN KEY (class_schedule_id) REFERENCES class_schedule(id)
 );
+
+CREATE TABLE teacher_schedule_conflict (
+    teacher_schedule_id INTEGER NOT NULL,       -- Foreign key referencing teacher_schedule(id)
+    student_id INTEGER NOT NULL,                -- Foreign key referencing student(id), 冲突的学生
+    PRIMARY KEY (teacher_schedule_id, student_id),
+    KEY (student_id),
+    FOREIGN KEY (teacher_schedule_id) REFERENCES teacher_schedule(id) ON DELETE CASCADE,
+    FOREIGN KEY (student_id) REFERENCES student(id)
+);
+
+CREATE TABLE schedule_job (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,      -- 排课任务ID
+    teacher_id INTEGER NOT NULL,                -- Foreign key referencing teacher(id)
+    class_id INTEGER NOT NULL,                  -- Foreign key referencing class(id)
+    status ENUM('Pending', 'Running', 'Success', 'Failed') NOT NULL DEFAULT 'Pending', -- 任务状态
+    params TEXT NOT NULL,                       -- 排课参数，JSON 格式存储
+    result TEXT,                                -- 排课结果，JSON 格式存储
+    message VARCHAR(255),                       -- 失败原因
+    teacher_schedule_id INTEGER,                -- 排课成功后生成的教师排课ID
+    created_time DATETIME NOT NULL,             -- 创建时间
+    start_time DATETIME,                        -- 开始执行时间
+    end_time DATETIME,                          -- 结束时间
+    worker_id VARCHAR(64),                      -- 执行该任务的进程
+    heartbeat_time DATETIME,                    -- 执行进程最近一次心跳的时间
+    KEY (status),
+    FOREIGN KEY (teacher_id) REFERENCES teacher(id),
+    FOREIGN KEY (class_id) REFERENCES class(id)
+);
+
+CREATE TABLE classroom_reservation (
+    id INTEGER PRIMARY KEY AUTO_INCREMENT,      -- 预约ID
+    classroom_id INTEGER NOT NULL,              -- Foreign key referencing classroom(id)
+    reserve_date DATE NOT NULL,                 -- 预约日期
+    slot INTEGER NOT NULL,                      -- 时间段下标 0-4 (8:00, 10:00, 14:00, 16:00, 19:00)
+    class_schedule_id INTEGER,                  -- Foreign key referencing class_schedule(id)
+    created_time DATETIME NOT NULL,             -- 创建时间
+    UNIQUE KEY uq_classroom_reservation (classroom_id, reserve_date, slot),
+    FOREIGN KEY (classroom_id) REFERENCES classroom(id),
+    FOREIGN KEY (class_schedule_id) REFERENCES class_schedule(id) ON DELETE CASCADE
+);
+
+CREATE TABLE data_version (
+    name VARCHAR(50) PRIMARY KEY,               -- 数据集名称, 如 catalog:<表名>, enrollment:<学生ID>
+    version INTEGER NOT NULL DEFAULT 0,         -- 版本号, 数据集中的表每次提交写入后加一
+    updated_time DATETIME                       -- 最近一次更新版本号的时间
+);
+
+INSERT INTO data_version (name, version) VALUES
+    ('catalog:class_plan', 0), ('catalog:classroom', 0), ('catalog:class_schedule', 0), ('catalog:class', 0), ('catalog:teacher', 0);
@@ -0,0 +1,120 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+# 测试中遗漏的延迟加载 (N+1 查询) 直接报错, 须在导入 config 之前设置
+os.environ.setdefault("orm_lazy_load", "raise_on_sql")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+import database
+from utils.query_stats import install, QueryStatsMiddleware
+
+# 测试使用内存中的 SQLite, 替换 database 模块中的 MySQL 连接
+engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+install(engine)
+database.engine = engine
+database.SessionLocal.configure(bind=engine)
+
+import model
+from model.StudentModel import Student
+from model.TeacherModel import Teacher
+from model.ClassPlanModel import ClassPlan
+from model.ClassModel import Class
+from model.ClassroomModel import Classroom
+from model.ClassScheduleModel import ClassSchedule
+from model.SCModel import StudentCourse
+from service.user import user_router
+from service.teacher import teacher_router
+from service.student import student_router
+from service.course import course_router
+from service.admin import admin_router
+from utils.auth_token import create_token
+
+# 课程安排所在的日期, 用于日课表
+SCHEDULE_DAY = datetime(2025, 3, 10)
+
+
+def seed(db):
+    """
+    3 名教师、12 名学生、4 间教室、3 个课程计划、6 个班级, 每个班级在 SCHEDULE_DAY 和之后一周各上一次课
+    每名学生选 3 个班级并有成绩
+    """
+    for t in range(3):
+        db.add(Teacher(name=f"teacher{t}", password="x", sex="M", email=f"teacher{t}@test"))
+    for s in range(12):
+        db.add(Student(name=f"student{s}", idcard=None, sex="F", password="x", email=f"student{s}@test"))
+    for r in range(4):
+        db.add(Classroom(name=f"room{r}", capacity=40, type="S" if r % 2 else "C", location="A"))
+    for p, name in enumerate(["数据库原理", "操作系统", "计算机网络"]):
+        plan = ClassPlan(name=name, credit=2 + p, profession="计算机", college="计算机学院")
+        plan.type = "BXG"[p]
+        db.add(plan)
+    db.commit()
+
+    for c in range(6):
+        db.add(Class(num=0, max_num=40, class_plan_id=c % 3 + 1, teacher_id=c // 2 + 1))
+    db.commit()
+
+    for c in range(1, 7):
+        for week in range(2):
+            start_time = SCHEDULE_DAY + timedelta(days=7 * week, hours=8 + 2 * (c % 4))
+            db.add(ClassSchedule(start_time, start_time + timedelta(hours=2), c % 4 + 1, c))
+    db.commit()
+
+    for s in range(1, 13):
+        for c in ((s - 1) % 6 + 1, s % 6 + 1, (s + 1) % 6 + 1):
+            enrollment = StudentCourse(s, c, datetime(2025, 1, 1))
+            enrollment.grade = 60 + (s * c) % 40
+            db.add(enrollment)
+            db.get(Class, c).num += 1
+    db.commit()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    database.Base.metadata.create_all(bind=engine)
+    db = database.SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+    yield
+    database.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, headers=True)
+    app.include_router(user_router, prefix="/user")
+    app.include_router(teacher_router, prefix="/teacher")
+    app.include_router(student_router, prefix="/student")
+    app.include_router(course_router, prefix="/course")
+    app.include_router(admin_router, prefix="/admin")
+    return app
+
+
+@pytest.fixture
+def db():
+    db = database.SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def client(app):
+    """
+    client(usertype, user_id) 返回带有该用户 token 的 TestClient
+    """
+    def make(usertype: str = "student", user_id: int = 1) -> TestClient:
+        token = create_token({"user_id": user_id, "usertype": usertype})
+        return TestClient(app, headers={"Authorization": "Bearer " + token})
+    return make
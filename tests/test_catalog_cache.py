@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from crud.ClassCrud import ClassCrud
+from crud.ClassPlanCrud import ClassPlanCrud
+from crud.ClassScheduleCrud import ClassScheduleCrud
+from model.ClassPlanModel import ClassPlan
+from model.ClassScheduleModel import ClassSchedule
+from model.DataVersionModel import DataVersion
+from utils import data_version
+from utils.catalog_cache import catalog_cache, version_name
+
+
+def versions(db) -> dict:
+    names = [version_name(table) for table in ("class_plan", "class_schedule")]
+    return {name: version for name, (version, _) in data_version.read(db, names).items()}
+
+
+def test_schedule_write_keeps_plan_index(db):
+    index = ClassPlanCrud.get_index(db)
+    ClassCrud.get_by_id(db, 1)
+    assert ("class", 1) in catalog_cache.data
+    before = versions(db)
+
+    schedule = ClassScheduleCrud.create(db, datetime(2025, 5, 5, 8), datetime(2025, 5, 5, 10), 1, 1)
+    try:
+        after = versions(db)
+        assert after[version_name("class_schedule")] == before[version_name("class_schedule")] + 1
+        assert after[version_name("class_plan")] == before[version_name("class_plan")]
+        # 课程安排变化只清除班级详情, 课程计划的检索索引不重建
+        assert ("class", 1) not in catalog_cache.data
+        assert ClassPlanCrud.get_index(db) is index
+        assert len(ClassCrud.get_by_id(db, 1)["schedules"]) == 3
+    finally:
+        db.query(ClassSchedule).filter(ClassSchedule.id == schedule.id).delete(synchronize_session=False)
+        db.commit()
+
+
+def test_plan_write_rebuilds_plan_index(db):
+    index = ClassPlanCrud.get_index(db)
+    plan = db.get(ClassPlan, 1)
+    introduction = plan.introduction
+    plan.introduction = "更新的简介"
+    db.commit()
+    try:
+        assert ClassPlanCrud.get_index(db) is not index
+    finally:
+        plan.introduction = introduction
+        db.commit()
+
+
+def test_version_change_in_other_process_evicts_dependent_entries(db):
+    index = ClassPlanCrud.get_index(db)
+    ClassCrud.get_by_id(db, 1)
+
+    # 其他进程提交的写入只更新 data_version, 本进程在下次校验时发现
+    db.execute(update(DataVersion).where(DataVersion.name == version_name("teacher")).values(version=DataVersion.version + 1))
+    db.commit()
+    catalog_cache.checked_at = 0.0
+    catalog_cache.validate(db)
+
+    assert ("class", 1) not in catalog_cache.data
+    assert ClassPlanCrud.get_index(db) is index
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+import pytest
+
+from crud.ClassScheduleCrud import ClassScheduleCrud
+from crud.EnrollCrud import EnrollCrud
+from model.ClassPlanModel import ClassPlan
+from model.ClassScheduleModel import ClassSchedule
+
+PLAN_LIST = ("/course/plan/list", {
+    "name": "", "college": "", "profession": "", "credit": -1, "is_selected": -1, "type": "", "pagesize": 10
+})
+PLAN_DETAIL = ("/course/plan/detail", {"id": 1})
+DAY_TABLE = ("/course/table/student/dayTable", {"time": "2025-03-10"})
+
+
+def get(client, endpoint, **headers):
+    url, params = endpoint
+    return client.get(url, params=params, headers=headers)
+
+
+@pytest.mark.parametrize("endpoint", [PLAN_LIST, PLAN_DETAIL, DAY_TABLE])
+def test_matching_etag_returns_304(client, endpoint):
+    student = client("student", 1)
+    response = get(student, endpoint)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Last-Modified"]
+
+    cached = get(student, endpoint, **{"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # 弱比较忽略 W/ 前缀, 多个 ETag 中任一匹配即可
+    assert get(student, endpoint, **{"If-None-Match": f'"other", {etag.removeprefix("W/")}'}).status_code == 304
+    assert get(student, endpoint, **{"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_depends_on_student(client):
+    first = get(client("student", 1), PLAN_LIST).headers["ETag"]
+    second = get(client("student", 2), PLAN_LIST).headers["ETag"]
+    assert first != second
+    # 课程计划详情与学生无关
+    assert get(client("student", 1), PLAN_DETAIL).headers["ETag"] == get(client("student", 2), PLAN_DETAIL).headers["ETag"]
+
+
+def test_plan_write_changes_etag(client, db):
+    student = client("student", 1)
+    list_etag = get(student, PLAN_LIST).headers["ETag"]
+    detail_etag = get(student, PLAN_DETAIL).headers["ETag"]
+
+    plan = db.get(ClassPlan, 1)
+    introduction = plan.introduction
+    plan.introduction = "新的简介"
+    db.commit()
+    try:
+        response = get(student, PLAN_DETAIL, **{"If-None-Match": detail_etag})
+        assert response.status_code == 200
+        assert response.json()["data"]["introduction"] == "新的简介"
+        assert get(student, PLAN_LIST, **{"If-None-Match": list_etag}).status_code == 200
+    finally:
+        plan.introduction = introduction
+        db.commit()
+
+
+def test_schedule_write_changes_only_dependent_etags(client, db):
+    student = client("student", 1)
+    detail_etag = get(student, PLAN_DETAIL).headers["ETag"]
+    table_etag = get(student, DAY_TABLE).headers["ETag"]
+
+    schedule = ClassScheduleCrud.create(db, datetime(2025, 5, 5, 8), datetime(2025, 5, 5, 10), 1, 1)
+    try:
+        # 课程安排不影响课程计划详情, 课表的 ETag 变化
+        assert get(student, PLAN_DETAIL, **{"If-None-Match": detail_etag}).status_code == 304
+        assert get(student, DAY_TABLE, **{"If-None-Match": table_etag}).status_code == 200
+    finally:
+        db.query(ClassSchedule).filter(ClassSchedule.id == schedule.id).delete(synchronize_session=False)
+        db.commit()
+
+
+def test_enrollment_changes_etag_of_that_student(client, db):
+    student, other = client("student", 1), client("student", 2)
+    etag = get(student, PLAN_LIST).headers["ETag"]
+    table_etag = get(student, DAY_TABLE).headers["ETag"]
+    other_etag = get(other, PLAN_LIST).headers["ETag"]
+
+    EnrollCrud.drop_course(db, 1, 1, datetime.now())
+    try:
+        response = get(student, PLAN_LIST, **{"If-None-Match": etag})
+        assert response.status_code == 200
+        dropped_etag = response.headers["ETag"]
+        assert dropped_etag != etag
+        assert get(student, DAY_TABLE, **{"If-None-Match": table_etag}).status_code == 200
+        # 其他学生的选课版本号不变
+        assert get(other, PLAN_LIST, **{"If-None-Match": other_etag}).status_code == 304
+    finally:
+        EnrollCrud.enroll_course(db, 1, 1, datetime.now())
+
+    # 重新选课后版本号继续增加, 不会回到之前的 ETag
+    restored_etag = get(student, PLAN_LIST).headers["ETag"]
+    assert restored_etag not in (etag, dropped_etag)
+
+
+def test_if_modified_since(client):
+    student = client("student", 1)
+    response = get(student, PLAN_DETAIL)
+    last_modified = response.headers["Last-Modified"]
+    earlier = format_datetime(parsedate_to_datetime(last_modified) - timedelta(seconds=1), usegmt=True)
+
+    assert get(student, PLAN_DETAIL, **{"If-Modified-Since": last_modified}).status_code == 304
+    assert get(student, PLAN_DETAIL, **{"If-Modified-Since": earlier}).status_code == 200
+    assert get(student, PLAN_DETAIL, **{"If-Modified-Since": "not a date"}).status_code == 200
+    # 同时带有 If-None-Match 时只比较 ETag
+    assert get(student, PLAN_DETAIL, **{"If-Modified-Since": last_modified, "If-None-Match": '"other"'}).status_code == 200
@@ -0,0 +1,33 @@
+from pymysql.converters import escape_item
+from sqlalchemy.dialects.mysql import pymysql
+from sqlalchemy.orm import Query
+
+import model
+import model.TeacherModel  # noqa: F401 班级关系引用教师, 导入后才能完成映射配置
+from model.ClassPlanModel import ClassPlan
+from model.SCModel import StudentCourse
+from utils.count_cache import explain_statement
+
+
+def render(sql: str, params) -> str:
+    # 与 pymysql 的 cursor.mogrify 相同: 位置参数逐个转义后按 %s 替换
+    return sql % tuple(escape_item(param, "utf8mb4") for param in params)
+
+
+def test_explain_statement_uses_pymysql_positional_params():
+    query = Query(StudentCourse).filter(StudentCourse.student_id == 5, StudentCourse.class_id.in_([1, 2]))
+    sql, params = explain_statement(query, pymysql.dialect())
+
+    assert sql.startswith("EXPLAIN SELECT")
+    assert params == (5, 1, 2)
+    rendered = render(sql, params)
+    assert "student_course.student_id = 5" in rendered
+    assert "student_course.class_id IN (1, 2)" in rendered
+
+
+def test_explain_statement_escapes_literal_percent():
+    query = Query(ClassPlan).filter(ClassPlan.name.like("%数据%"))
+    sql, params = explain_statement(query, pymysql.dialect())
+
+    assert params == ("%数据%",)
+    assert "class_plan.name LIKE '%数据%'" in render(sql, params)
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import exc
+
+from config import config
+from crud.ClassroomCrud import ClassroomCrud
+from model.ClassModel import Class
+
+# conftest.SCHEDULE_DAY
+DAY = "2025-03-10"
+
+
+def test_lazy_loads_raise_in_tests(db):
+    assert config.orm_lazy_load == "raise_on_sql"
+    classer = db.get(Class, 1)
+    with pytest.raises(exc.InvalidRequestError):
+        classer.teacher
+
+
+@pytest.mark.parametrize("usertype, url, params", [
+    ("student", "/course/classer/list", {"id": 1, "page": 1, "pagesize": 10}),
+    ("student", "/course/grade/student", {"page": 1, "pagesize": 10}),
+    ("student", "/course/classer/detail", {"id": 1}),
+    ("student", "/course/table/student/dayTable", {"time": DAY}),
+    ("teacher", "/course/table/teacher/dayTable", {"time": DAY}),
+    ("teacher", "/course/schedule/scheduleList", {"class_id": 1}),
+])
+def test_list_paths_do_not_lazy_load(client, usertype, url, params):
+    response = client(usertype, 1).get(url, params=params)
+    assert response.status_code == 200, response.text
+    assert response.json()["status"] == 0
+    assert response.json()["data"]
+
+
+def test_select_candidates_does_not_lazy_load(db):
+    classer = db.get(Class, 1)
+    candidates = ClassroomCrud.select_candidates(db, classer, "2025-03-01 00:00:00", "2025-03-31 00:00:00", 3)
+    assert candidates
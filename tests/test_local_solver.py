@@ -0,0 +1,56 @@
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schedule_server")
+sys.path.insert(0, SERVER_DIR)
+
+import opt_pb2
+from utils.opt_client.local import solve_local
+from utils.opt_client.opt import parse_response
+
+spec = importlib.util.spec_from_file_location("schedule_server_main", os.path.join(SERVER_DIR, "main.py"))
+server = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(server)
+
+
+def random_request(M: int, I: int, J: int, class_num: int, classroom_num: int, top_k: int, seed: int):
+    rng = np.random.default_rng(seed)
+    student_w = (rng.random((I, M, 5)) < 0.3).astype(int)
+    classroom_w = (rng.random((J, M, 5)) < 0.4).astype(int)
+    # 偏好取少数几个值, 制造目标值相同的格子, 检查两边的并列规则一致
+    day_w = rng.integers(1, 3, M).astype(float).tolist()
+    day_5 = rng.integers(0, 2, 5).astype(float).tolist()
+    request = opt_pb2.OptimizationRequest(
+        day_num=M, student_num=I, classroom_num=J, schedule_classroom_num=classroom_num, schedule_class_num=class_num,
+        day_w=day_w, day_5=day_5, top_k=top_k, solver="numpy"
+    )
+    return request, student_w, classroom_w
+
+
+@pytest.mark.parametrize("M, I, J, class_num, classroom_num, top_k", [
+    (7, 6, 3, 1, 1, 5),
+    (14, 10, 4, 1, 1, 0),
+    (14, 10, 5, 3, 2, 0),
+    (21, 8, 6, 4, 3, 0),
+    (5, 4, 2, 3, 2, 3),
+])
+@pytest.mark.parametrize("seed", range(5))
+def test_local_matches_server(M, I, J, class_num, classroom_num, top_k, seed):
+    request, student_w, classroom_w = random_request(M, I, J, class_num, classroom_num, top_k, seed)
+
+    expected = parse_response(server.ScheduleOptimizationService().solve_matrices(request, student_w.flatten(), classroom_w.flatten()))
+    result = solve_local(M, I, J, classroom_num, class_num, student_w.flatten(), classroom_w.flatten(), request.day_w, request.day_5, top_k=top_k)
+
+    assert result["state"] == expected["state"]
+    assert result["X"] == expected["X"]
+    assert result["Y"] == expected["Y"]
+    assert result["value"] == pytest.approx(expected["value"])
+    assert [(c["day"], c["slot"], c["classroom"]) for c in result["candidates"]] == \
+        [(c["day"], c["slot"], c["classroom"]) for c in expected["candidates"]]
+    for local, remote in zip(result["candidates"], expected["candidates"]):
+        for field in ("value", "conflict_rate", "pref"):
+            assert local[field] == pytest.approx(remote[field], rel=1e-6)
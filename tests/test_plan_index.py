@@ -0,0 +1,140 @@
+import pytest
+
+import database
+from crud.ClassPlanCrud import ClassPlanCrud
+from model.ClassPlanModel import ClassPlan
+
+# 在种子数据的 3 个课程计划之外补充的课程计划: (名称, 学分, 专业, 学院, 类型)
+PLANS = [
+    ("数据库系统概论", 3, "软件工程", "计算机学院", "B"),
+    ("分布式数据库", 2, "软件工程", "计算机学院", "X"),
+    ("数据结构", 4, "计算机", "计算机学院", "B"),
+    ("操作系统原理与实践", 3, "计算机", "计算机学院", "S"),
+    ("Python程序设计", 2, "数据科学", "数学与统计学院", "G"),
+    ("python数据分析", 3, "数据科学", "数学与统计学院", "X"),
+    ("高等数学", 5, None, "数学与统计学院", "B"),
+    ("概率论与数理统计", 4, "统计学", None, "B"),
+    ("数", 1, "数学", "数学与统计学院", "G"),
+]
+
+# (name, credit, profession, type, college); 与接口一致, 空字符串和学分 -1 表示不筛选
+QUERIES = [
+    ("", -1, "", "", ""),
+    ("数据", -1, "", "", ""),
+    ("数据库", -1, "", "", ""),
+    ("据库原", -1, "", "", ""),
+    ("数据库原理", -1, "", "", ""),
+    ("统", -1, "", "", ""),
+    ("系统", -1, "", "", ""),
+    ("数", -1, "", "", ""),
+    ("python", -1, "", "", ""),
+    ("PYTHON程序", -1, "", "", ""),
+    ("不存在的课程", -1, "", "", ""),
+    ("数据", 3, "", "", ""),
+    ("数据", -1, "软件", "", ""),
+    ("", -1, "计算机", "B", ""),
+    ("", -1, "", "", "统计学院"),
+    ("", 4, "", "B", ""),
+    ("数", -1, "数据科学", "X", "数学"),
+    ("数据", 3, "软件工程", "B", "计算机学院"),
+    ("", 2, "", "S", ""),
+]
+
+
+@pytest.fixture(scope="module")
+def plan_ids():
+    db = database.SessionLocal()
+    plans = []
+    for name, credit, profession, college, type in PLANS:
+        plan = ClassPlan(name=name, credit=credit, profession=profession, college=college)
+        plan.type = type
+        db.add(plan)
+        plans.append(plan)
+    db.commit()
+    ids = [plan.id for plan in plans]
+    try:
+        yield ids
+    finally:
+        db.query(ClassPlan).filter(ClassPlan.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+def like_ids(db, name: str, credit: int, profession: str, type: str, college: str) -> set:
+    """
+    改用索引之前 get_by_filters 的 LIKE 筛选
+    """
+    query = db.query(ClassPlan.id)
+    if name != "":
+        query = query.filter(ClassPlan.name.like(f"%{name}%"))
+    if credit and credit != -1:
+        query = query.filter(ClassPlan.credit == credit)
+    if profession != "":
+        query = query.filter(ClassPlan.profession.like(f"%{profession}%"))
+    if college != "":
+        query = query.filter(ClassPlan.college.like(f"%{college}%"))
+    if type != "":
+        query = query.filter(ClassPlan.type == type)
+    return {plan_id for plan_id, in query.all()}
+
+
+@pytest.mark.parametrize("name, credit, profession, type, college", QUERIES)
+def test_search_matches_like(db, plan_ids, name, credit, profession, type, college):
+    index = ClassPlanCrud.get_index(db)
+    ids = index.search(name=name, credit=credit, profession=profession, type=type, college=college)
+
+    assert len(ids) == len(set(ids))
+    assert set(ids) == like_ids(db, name, credit, profession, type, college)
+
+
+def test_empty_query_returns_all_by_id(db, plan_ids):
+    ids = ClassPlanCrud.get_index(db).search(name="", credit=-1, profession="", type="", college="")
+    assert ids == sorted(ids)
+    assert ids[-len(plan_ids):] == plan_ids
+
+
+def test_name_ranking(db, plan_ids):
+    index = ClassPlanCrud.get_index(db)
+    names = [index.rows[plan_id]["name"] for plan_id in index.search(name="数据库")]
+    # 完全匹配, 前缀匹配 (按名称长度), 其余按匹配位置
+    assert names == ["数据库原理", "数据库系统概论", "分布式数据库"]
+
+    names = [index.rows[plan_id]["name"] for plan_id in index.search(name="数")]
+    assert names[0] == "数"
+    # 前缀匹配中名称短的在前
+    assert names[1:3] == ["数据结构", "数据库原理"]
+
+
+def test_facets_match_search(db, plan_ids):
+    index = ClassPlanCrud.get_index(db)
+    facets = index.facets(name="数据", credit=-1, profession="", type="", college="")
+
+    ids = index.search(name="数据")
+    assert facets["total"] == len(ids)
+    # 类型分面不受类型条件影响, 各取值的数量与单独筛选该取值一致
+    for item in facets["type"]:
+        assert item["count"] == len(index.search(name="数据", type=item["value"]))
+
+
+def test_cursor_pages_follow_ranking(db, plan_ids):
+    filters = {"name": "数", "credit": -1, "profession": "", "type": "", "college": ""}
+    expected = ClassPlanCrud.get_by_filters(db, 1, page=1, page_size=100, is_selected=-1, **filters)["data"]
+
+    pages = []
+    cursor = ""
+    while cursor is not None:
+        page = ClassPlanCrud.get_by_filters(db, 1, page_size=2, is_selected=-1, cursor=cursor, **filters)
+        assert len(page["data"]) <= 2
+        pages.extend(page["data"])
+        cursor = page["next_cursor"]
+
+    assert [plan["id"] for plan in pages] == [plan["id"] for plan in expected]
+    assert {plan["id"] for plan in pages} == like_ids(db, **filters)
+
+
+def test_cursor_from_other_query_is_rejected(db, plan_ids):
+    page = ClassPlanCrud.get_by_filters(db, 1, page_size=1, is_selected=-1, cursor="", name="", credit=-1, profession="", type="", college="")
+    with pytest.raises(ValueError):
+        # 无名称查询的游标只有ID, 不能用于有名称查询的排序键
+        ClassPlanCrud.get_by_filters(db, 1, page_size=1, is_selected=-1, cursor=page["next_cursor"], name="数", credit=-1, profession="",
+                                     type="", college="")
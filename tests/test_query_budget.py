@@ -0,0 +1,52 @@
+import pytest
+
+import database
+from crud.ClassCrud import ClassCrud
+from crud.SCCrud import StudentCourseCrud
+from utils.query_stats import assert_query_budget, count_queries
+
+# 列表接口的查询数上限, 与每页条数无关; 逐行延迟加载 (N+1) 时会超出
+LIST_BUDGET = 5
+
+
+@pytest.mark.parametrize("usertype, url, params", [
+    ("student", "/course/classer/list", {"id": 1, "page": 1, "pagesize": 10}),
+    ("student", "/course/grade/student", {"page": 1, "pagesize": 10}),
+    ("student", "/course/table/student/dayTable", {"time": "2025-03-10"}),
+    ("teacher", "/course/table/teacher/dayTable", {"time": "2025-03-10"}),
+    ("teacher", "/course/schedule/scheduleList", {"class_id": 1}),
+])
+def test_list_endpoints_stay_within_budget(client, usertype, url, params):
+    response = assert_query_budget(client(usertype, 1), "GET", url, LIST_BUDGET, params=params)
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]
+
+
+def test_slowest_header_has_no_sql(client):
+    response = client("student", 1).get("/course/grade/student", params={"page": 1, "pagesize": 10})
+    assert float(response.headers["X-DB-Slowest"]) >= 0
+
+
+@pytest.mark.parametrize("page_sizes, query", [
+    ((1, 2), lambda db, page_size: ClassCrud.get_by_id_paginated(db, 1, 1, 1, page_size)),
+    ((1, 3), lambda db, page_size: StudentCourseCrud.get_student_grade_page(db, 1, 1, page_size)),
+])
+def test_list_queries_do_not_grow_with_page_size(page_sizes, query):
+    def run(page_size):
+        # 每次使用新的会话, 关联对象不会从上一次查询的 identity map 中取得
+        db = database.SessionLocal()
+        try:
+            with count_queries() as stats:
+                data = query(db, page_size)
+            return data, stats.count
+        finally:
+            db.close()
+
+    # 先执行一次, 使分页总数进入缓存
+    run(page_sizes[0])
+    counts = []
+    for page_size in page_sizes:
+        data, count = run(page_size)
+        assert len(data["data"]) == page_size
+        counts.append(count)
+    assert counts[0] == counts[1]
@@ -0,0 +1,154 @@
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schedule_server")
+sys.path.insert(0, SERVER_DIR)
+
+import opt_pb2
+from solvers import Problem, Solver, NumpySolver, RollingHorizonSolver
+
+# 排课服务的 main 与 web 服务的 main 同名, 按路径单独加载
+spec = importlib.util.spec_from_file_location("schedule_server_main", os.path.join(SERVER_DIR, "main.py"))
+server = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(server)
+
+
+class RecordingSolver(Solver):
+    """
+    用 NumpySolver 精确求解每个窗口, 记录窗口子问题和解
+    """
+    name = "recording"
+
+    def __init__(self):
+        self.calls = []
+
+    def solve(self, problem: Problem, threads: int = 0, time_limit: float = 0):
+        solution = NumpySolver().solve(problem)
+        self.calls.append((problem, solution))
+        return solution
+
+
+def make_problem(M: int, class_num: int, J: int = 2, classroom_num: int = 1, seed: int = 0) -> Problem:
+    rng = np.random.default_rng(seed)
+    student_w = (rng.random((6, M, 5)) < 0.3).astype(int)
+    classroom_w = (rng.random((J, M, 5)) < 0.2).astype(int)
+    pref_matrix = rng.random((M, 1)) @ rng.random((1, 5))
+    return Problem(student_w, classroom_w, pref_matrix, class_num, classroom_num)
+
+
+@pytest.mark.parametrize("window, overlap, M, expected", [
+    (7, 0, 14, [(0, 7, 7), (7, 14, 14)]),
+    (7, 0, 10, [(0, 7, 7), (7, 10, 10)]),
+    (7, 2, 20, [(0, 7, 5), (5, 12, 10), (10, 17, 15), (15, 20, 20)]),
+    (5, 4, 7, [(0, 5, 1), (1, 6, 2), (2, 7, 7)]),
+    (10, 0, 10, [(0, 10, 10)]),
+])
+def test_windows(window, overlap, M, expected):
+    windows = RollingHorizonSolver(NumpySolver(), window, overlap).windows(M)
+    assert windows == expected
+    # 保留的部分首尾相接, 覆盖全部天数
+    assert [keep for _, _, keep in windows[:-1]] == [start for start, _, _ in windows[1:]]
+    assert windows[-1][1] == windows[-1][2] == M
+
+
+def test_invalid_window():
+    with pytest.raises(ValueError):
+        RollingHorizonSolver(NumpySolver(), 3, 3)
+
+
+def test_share_split_across_windows():
+    recording = RecordingSolver()
+    problem = make_problem(20, 6)
+    solution = RollingHorizonSolver(recording, 5, 0, workers=1).solve(problem)
+
+    assert solution.success
+    # 累计份额 round(6 * end / 20) 在窗口末尾 5, 10, 15, 20 处为 2, 3, 5, 6
+    assert [window.class_num for window, _ in recording.calls] == [2, 1, 2, 1]
+    assert [window.M for window, _ in recording.calls] == [5, 5, 5, 5]
+    assert solution.x.sum() == 6
+    for start in range(0, 20, 5):
+        assert solution.x[start:start + 5].sum() == [2, 1, 2, 1][start // 5]
+    # 第一个窗口确定教室, 之后的窗口只在该教室中排课
+    assert solution.y.sum() == 1
+    assert all(window.J == 1 for window, _ in recording.calls[1:])
+
+
+def test_overlap_redecided_by_next_window():
+    recording = RecordingSolver()
+    problem = make_problem(12, 4)
+    # 第一个窗口 [0, 6) 中代价最小的格子都在重叠的第 4、5 天
+    problem.pref_matrix[:] = 1.0
+    problem.pref_matrix[4:6] = 0.0
+    problem.student_w[:] = 0
+    solution = RollingHorizonSolver(recording, 6, 2, workers=1).solve(problem)
+
+    assert solution.success
+    (first, first_solution), (second, _), (third, _) = recording.calls
+    # 累计份额 round(4 * end / 12): 第 6、10、12 天末为 2、3、4
+    assert first.class_num == 2
+    assert first_solution.x[4:6].sum() == 2
+    # 第一个窗口只保留 [0, 4) 的决策 (没有课), 重叠部分的两次课由第二个窗口重新决定
+    assert solution.x[0:4].sum() == 0
+    assert second.class_num == 3
+    assert third.class_num == 4 - solution.x[0:8].sum()
+    assert solution.x.sum() == 4
+
+
+def test_single_class_is_exact():
+    problem = make_problem(21, 1, J=3, seed=3)
+    exact = NumpySolver().solve(problem)
+    solution = RollingHorizonSolver(NumpySolver(), 5, 1).solve(problem)
+
+    assert solution.success
+    assert solution.objective == pytest.approx(float((exact.x * problem.cost()).sum()))
+
+
+def test_multiple_classes_use_rolling_windows():
+    recording = RecordingSolver()
+    problem = make_problem(30, 2)
+    solution = RollingHorizonSolver(recording, 5, 0, workers=1).solve(problem)
+
+    # 排课次数大于 1 时不再每个窗口独立排全部课, 只求解分到份额的窗口
+    assert solution.success
+    assert solution.x.sum() == 2
+    assert all(window.class_num == 1 for window, _ in recording.calls)
+    assert len(recording.calls) == 2
+
+
+def rolling_infeasible_request():
+    """
+    第一个窗口选中教室 0, 教室 0 在第二个窗口全部被占用, 分解无解; 完整问题可以把两次课都排在前两天
+    """
+    M = 4
+    classroom_w = np.zeros((2, M, 5), dtype=int)
+    classroom_w[0, 2:] = 1
+    classroom_w[1] = 1
+    classroom_w[1, 0, 4] = 0
+    classroom_w[1, 2, 0] = 0
+    student_w = np.zeros((3, M, 5), dtype=int)
+    request = opt_pb2.OptimizationRequest(
+        day_num=M, student_num=3, classroom_num=2, schedule_classroom_num=1, schedule_class_num=2,
+        day_w=[1.0] * M, day_5=[1.0] * 5, solver="numpy", horizon_window=2, horizon_overlap=0
+    )
+    return request, student_w, classroom_w
+
+
+def test_rolling_failure_is_reported(monkeypatch):
+    monkeypatch.setattr(server, "HORIZON_FALLBACK", False)
+    response = server.ScheduleOptimizationService().solve_matrices(*rolling_infeasible_request())
+
+    assert not response.success
+    assert response.solver == "rolling:numpy"
+
+
+def test_rolling_fallback_is_opt_in(monkeypatch):
+    monkeypatch.setattr(server, "HORIZON_FALLBACK", True)
+    response = server.ScheduleOptimizationService().solve_matrices(*rolling_infeasible_request())
+
+    assert response.success
+    assert response.solver == "rolling:numpy>fallback"
+    assert sum(response.x) == 2 and sum(response.y) == 1
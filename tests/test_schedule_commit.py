@@ -0,0 +1,188 @@
+import json
+import threading
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+import database
+from crud.ScheduleJobCrud import ScheduleJobCrud
+from crud.TeacherScheduleCrud import TeacherScheduleCrud
+from model.ClassroomReservationModel import ClassroomReservation
+from model.ClassScheduleModel import ClassSchedule
+from model.ScheduleJobModel import ScheduleJob
+from model.TeacherScheduleModel import TeacherSchedule
+from utils.schedule_job import commit_candidate, commit_sessions
+
+# 测试写入的课程安排都在该日期之后, 不影响种子数据
+COMMIT_DAY = datetime(2025, 4, 7)
+SESSIONS = [(datetime(2025, 4, 7, 8), 0.0, []), (datetime(2025, 4, 14, 8), 0.25, [1])]
+
+
+def written(db) -> tuple:
+    """
+    测试日期之后的 (教室预约数, 课程安排数, 教师排课数)
+    """
+    schedule_ids = [i for i, in db.query(ClassSchedule.id).filter(ClassSchedule.start_time >= COMMIT_DAY).all()]
+    return (
+        db.query(ClassroomReservation).filter(ClassroomReservation.reserve_date >= COMMIT_DAY.date()).count(),
+        len(schedule_ids),
+        db.query(TeacherSchedule).filter(TeacherSchedule.class_schedule_id.in_(schedule_ids)).count()
+    )
+
+
+@pytest.fixture
+def cleanup(db):
+    yield
+    db.rollback()
+    schedule_ids = [i for i, in db.query(ClassSchedule.id).filter(ClassSchedule.start_time >= COMMIT_DAY).all()]
+    for teacher_schedule in db.query(TeacherSchedule).filter(TeacherSchedule.class_schedule_id.in_(schedule_ids)).all():
+        db.delete(teacher_schedule)
+    db.query(ClassroomReservation).filter(ClassroomReservation.reserve_date >= COMMIT_DAY.date()).delete(synchronize_session=False)
+    db.query(ClassSchedule).filter(ClassSchedule.id.in_(schedule_ids)).delete(synchronize_session=False)
+    db.query(ScheduleJob).delete(synchronize_session=False)
+    db.commit()
+
+
+def test_failed_later_session_writes_nothing(db, monkeypatch, cleanup):
+    create = TeacherScheduleCrud.create
+    calls = []
+
+    def fail_second(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2:
+            raise RuntimeError("写入第二次课失败")
+        return create(*args, **kwargs)
+
+    monkeypatch.setattr(TeacherScheduleCrud, "create", staticmethod(fail_second))
+    with pytest.raises(RuntimeError):
+        commit_sessions(db, 1, 1, 1, SESSIONS, 0.5)
+    assert written(db) == (0, 0, 0)
+
+    # 失败后没有遗留的预约, 重新提交可以成功
+    monkeypatch.undo()
+    data, teacher_schedule_id = commit_sessions(db, 1, 1, 1, SESSIONS, 0.5)
+    assert written(db) == (2, 2, 2)
+    assert teacher_schedule_id is not None
+    assert len(data["sessions"]) == 2
+
+
+@pytest.fixture
+def file_sessions(tmp_path):
+    """
+    文件数据库的会话工厂, 每个会话独立连接; BEGIN IMMEDIATE 使并发写入串行执行, 与 MySQL 的行锁一致
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}", connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    database.Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def race(Session, target, args: list) -> list:
+    """
+    每个参数在独立线程和会话中同时执行 target(db, arg), 返回各线程的结果或异常
+    """
+    barrier = threading.Barrier(len(args))
+    results = []
+
+    def run(arg):
+        db = Session()
+        try:
+            barrier.wait()
+            results.append(target(db, arg))
+        except Exception as e:
+            results.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=run, args=(arg,)) for arg in args]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def create_job(db, candidates: list) -> ScheduleJob:
+    job = ScheduleJobCrud.create(db, 1, 1, {})
+    job.status = "Success"
+    job.result = json.dumps({"candidates": candidates})
+    db.commit()
+    return job
+
+
+def candidate(start_time: datetime, classroom_id: int = 1) -> dict:
+    return {"start_time": start_time.strftime("%Y-%m-%d %H:%M:%S"), "classroom_id": classroom_id, "w": 0.0, "perf": 0.5, "conflict_students": []}
+
+
+def test_concurrent_commits_for_same_slot(file_sessions):
+    results = race(file_sessions, lambda db, class_id: commit_sessions(db, 1, class_id, 1, SESSIONS, 0.5), [1, 2])
+
+    assert sorted(type(result).__name__ for result in results) == ["IntegrityError", "tuple"]
+    db = file_sessions()
+    try:
+        assert written(db) == (2, 2, 2)
+        assert len({class_id for class_id, in db.query(ClassSchedule.class_id).all()}) == 1
+    finally:
+        db.close()
+
+
+def test_commit_candidate_once(db, cleanup):
+    job = create_job(db, [candidate(datetime(2025, 4, 7, 8)), candidate(datetime(2025, 4, 7, 10))])
+
+    data = commit_candidate(db, job, 0)
+    assert data["schedule"]["start_time"] == "2025-04-07 08:00:00"
+    db.refresh(job)
+    assert job.teacher_schedule_id is not None
+    assert ScheduleJobCrud.to_dict(job)["teacher_schedule_id"] == job.teacher_schedule_id
+
+    with pytest.raises(ValueError):
+        commit_candidate(db, job, 1)
+    assert written(db) == (1, 1, 1)
+
+
+def test_commit_candidate_conflict_can_retry(db, cleanup):
+    commit_sessions(db, 2, 3, 1, [(datetime(2025, 4, 7, 8), 0.0, [])], 0.5)
+    job = create_job(db, [candidate(datetime(2025, 4, 7, 8)), candidate(datetime(2025, 4, 7, 10))])
+
+    with pytest.raises(ValueError):
+        commit_candidate(db, job, 0)
+    db.refresh(job)
+    assert job.teacher_schedule_id is None
+
+    # 冲突的候选没有写入任何记录, 也没有遗留提交标记, 可以提交其他候选
+    commit_candidate(db, job, 1)
+    db.refresh(job)
+    assert job.teacher_schedule_id is not None
+    assert written(db) == (2, 2, 2)
+
+
+def test_concurrent_commits_for_same_job(file_sessions):
+    db = file_sessions()
+    try:
+        job_id = create_job(db, [candidate(datetime(2025, 4, 7, 8)), candidate(datetime(2025, 4, 7, 10))]).id
+    finally:
+        db.close()
+
+    def commit(db, index):
+        return commit_candidate(db, db.get(ScheduleJob, job_id), index)
+
+    results = race(file_sessions, commit, [0, 1])
+
+    assert sorted(type(result).__name__ for result in results) == ["ValueError", "dict"]
+    db = file_sessions()
+    try:
+        assert written(db) == (1, 1, 1)
+        assert db.get(ScheduleJob, job_id).teacher_schedule_id is not None
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+import time
+from concurrent import futures
+
+import grpc
+import pytest
+
+import utils.opt_client.opt_pb2 as opt_pb2
+import utils.opt_client.opt_pb2_grpc as opt_pb2_grpc
+from utils.opt_client.pool import SolverPool, StreamSource, StreamIdleTimeout
+
+
+class EchoServicer(opt_pb2_grpc.ScheduleOptimizationServicer):
+    """
+    收到请求后立即返回; hang 为 True 时读取请求但不返回任何结果
+    """
+
+    def __init__(self, hang: bool = False):
+        self.hang = hang
+
+    def schedule_stream(self, request_iterator, context):
+        for item in request_iterator:
+            if self.hang:
+                continue
+            yield opt_pb2.BatchResponse(request_id=item.request_id, response=opt_pb2.OptimizationResponse(success=True))
+        while self.hang and context.is_active():
+            time.sleep(0.05)
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(servicer) -> str:
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        opt_pb2_grpc.add_ScheduleOptimizationServicer_to_server(servicer, server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        server.start()
+        servers.append(server)
+        return f"127.0.0.1:{port}"
+
+    yield start
+    for server in servers:
+        server.stop(0)
+
+
+def requests(count: int, events: list, delay: float = 0.0):
+    for index in range(count):
+        time.sleep(delay)
+        events.append(("build", index))
+        yield str(index), opt_pb2.OptimizationRequest(day_num=1)
+
+
+def test_requests_are_built_while_solving(serve):
+    pool = SolverPool([serve(EchoServicer())])
+    events = []
+    source = StreamSource(requests(5, events, delay=0.1), 5)
+
+    for request_id, _, _ in pool.stream(source, timeout=5):
+        events.append(("result", int(request_id)))
+
+    assert sorted(index for kind, index in events if kind == "result") == list(range(5))
+    # 第一个结果在最后一个请求构建之前返回
+    assert events.index(("result", 0)) < events.index(("build", 4))
+
+
+def test_idle_stream_is_cancelled_and_retried(serve):
+    pool = SolverPool([serve(EchoServicer(hang=True)), serve(EchoServicer())])
+    # 固定先选中无响应的服务端
+    pool.endpoints[1].outstanding = 100
+    source = StreamSource(requests(3, []), 3)
+
+    started = time.monotonic()
+    results = [request_id for request_id, _, _ in pool.stream(source, timeout=0.5)]
+
+    assert sorted(results) == ["0", "1", "2"]
+    assert time.monotonic() - started < 5
+    assert pool.endpoints[0].failures == 1
+
+
+def test_idle_timeout_when_all_servers_hang(serve):
+    pool = SolverPool([serve(EchoServicer(hang=True))])
+    source = StreamSource(requests(3, []), 3)
+
+    with pytest.raises(StreamIdleTimeout) as error:
+        list(pool.stream(source, timeout=0.5))
+    assert error.value.code() == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert [request_id for request_id, _ in source.remaining()] == ["0", "1", "2"]
+
+
+def test_slow_build_does_not_time_out(serve):
+    pool = SolverPool([serve(EchoServicer())])
+    # 构建每个请求比 timeout 更久, 但所有已发送的请求都已返回, 不计入空闲时间
+    source = StreamSource(requests(3, [], delay=0.4), 3)
+
+    results = [request_id for request_id, _, _ in pool.stream(source, timeout=0.3)]
+
+    assert sorted(results) == ["0", "1", "2"]
+    assert pool.endpoints[0].failures == 0
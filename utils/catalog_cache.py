@@ -0,0 +1,274 @@
+import sys
+import time
+import threading
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from config import config
+from utils import data_version
+
+# 课程目录包含的表 -> 影响缓存内容的列, None 表示所有列; 每个表有独立的版本号
+# 班级人数 (class.num) 是实时数据, 不缓存, 选课和退课不使缓存失效
+CATALOG_COLUMNS = {
+    "class_plan": None,
+    "classroom": None,
+    "class_schedule": None,
+    "class": {"max_num", "class_plan_id", "teacher_id"},
+    "teacher": {"name"}
+}
+
+# 各类数据依赖的表, 其中任一表的版本号变化时该类缓存条目和 ETag 失效
+PLAN_TABLES = ("class_plan",)
+# 已选的课程计划由学生的选课记录和班级所属的课程计划决定
+PLAN_SELECTION_TABLES = ("class_plan", "class")
+CLASSROOM_TABLES = ("classroom",)
+CLASS_TABLES = ("class", "class_schedule", "classroom", "teacher")
+TIMETABLE_TABLES = ("class_plan",) + CLASS_TABLES
+
+# 缓存键的第一项 -> 依赖的表
+CATALOG_KEYS = {
+    "plan_index": PLAN_TABLES,
+    "plan_facets": PLAN_TABLES,
+    "classrooms": CLASSROOM_TABLES,
+    "class": CLASS_TABLES
+}
+
+
+def version_name(table: str) -> str:
+    return f"catalog:{table}"
+
+
+def changed_tables(session: Session) -> set:
+    """
+    本次 flush 修改了的课程目录表: 插入、删除了行, 或修改了会被缓存的列
+    """
+    tables = set()
+    for instance in session.new | session.deleted:
+        if instance.__table__.name in CATALOG_COLUMNS:
+            tables.add(instance.__table__.name)
+    for instance in session.dirty:
+        table = instance.__table__.name
+        if table not in CATALOG_COLUMNS or table in tables:
+            continue
+        state = instance._sa_instance_state
+        columns = CATALOG_COLUMNS[table]
+        for column in instance.__table__.columns:
+            if columns is not None and column.key not in columns:
+                continue
+            if column.key in state.attrs and state.attrs[column.key].history.has_changes():
+                tables.add(table)
+                break
+    return tables
+
+
+def bump_versions(session: Session, tables: set):
+    """
+    在当前事务中将这些表的版本号加一, 与写入一起提交
+    """
+    for table in sorted(tables):
+        data_version.bump(session, version_name(table))
+    session.info.setdefault("catalog_bumped", set()).update(tables)
+
+
+def read_versions(db: Session) -> dict:
+    """
+    课程目录各表的 表名 -> (版本号, 更新时间)
+    """
+    versions = data_version.read(db, [version_name(table) for table in CATALOG_COLUMNS])
+    return {table: versions[version_name(table)] for table in CATALOG_COLUMNS}
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    tables = changed_tables(session)
+    if tables:
+        bump_versions(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    # query.delete() / query.update() 不经过 flush, 提交前再更新版本号
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_delete or orm_execute_state.is_update) and mapper is not None:
+        tables = {table.name for table in mapper.tables if table.name in CATALOG_COLUMNS}
+        if tables:
+            orm_execute_state.session.info.setdefault("catalog_bulk", set()).update(tables)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    tables = session.info.pop("catalog_bulk", None)
+    if tables:
+        bump_versions(session, tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    tables = session.info.pop("catalog_bumped", None)
+    if tables:
+        catalog_cache.expire(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("catalog_bulk", None)
+    session.info.pop("catalog_bumped", None)
+
+
+def deep_sizeof(value, seen: set = None) -> int:
+    """
+    估算对象占用的内存 (字节), 递归计算容器和对象属性, 共享的对象只计算一次
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += deep_sizeof(vars(value), seen)
+    return size
+
+
+class CatalogCache:
+    """
+    课程目录 (课程计划、班级、教室) 的进程内 LRU 读缓存
+    每个表有独立的版本号 (data_version 表), 条目按键的第一项依赖若干表 (CATALOG_KEYS),
+    每隔 check_interval 秒校验一次, 只清除依赖了版本变化的表的条目;
+    本进程内提交课程目录的写入后立即清除, 其他进程中的写入在 check_interval 秒内可见
+    """
+
+    def __init__(self, max_size: int, check_interval: float):
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.versions = {}
+        self.checked_at = 0.0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def evict(self, tables: set):
+        """
+        删除依赖这些表的条目, 调用方持有锁
+        """
+        for key in [key for key in self.data if tables.intersection(CATALOG_KEYS[key[0]])]:
+            _, size = self.data.pop(key)
+            self.bytes -= size
+
+    def validate(self, db: Session):
+        now = time.monotonic()
+        if self.versions and now - self.checked_at < self.check_interval:
+            return
+        versions = read_versions(db)
+        with self.lock:
+            changed = {table for table, (version, _) in versions.items() if self.versions.get(table, (None,))[0] != version}
+            if changed:
+                if self.versions:
+                    self.invalidations += 1
+                self.evict(changed)
+                self.versions = versions
+            self.checked_at = now
+
+    def stamp(self, key) -> tuple:
+        """
+        条目依赖的表当前的版本号, 读取期间版本号变化时不写入缓存
+        """
+        return tuple(self.versions[table][0] for table in CATALOG_KEYS[key[0]])
+
+    def get_or_set(self, db: Session, key, factory):
+        """
+        命中则返回缓存值, 否则调用 factory 从数据库读取并写入缓存; factory 返回 None 时不缓存
+        缓存值由多个请求共享, 调用方不能修改
+        """
+        self.validate(db)
+        with self.lock:
+            item = self.data.get(key)
+            if item is not None:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+            stamp = self.stamp(key)
+
+        value = factory()
+        if value is None:
+            return None
+        size = deep_sizeof(value)
+        with self.lock:
+            # 读取期间版本已变化时不写入
+            if self.stamp(key) == stamp:
+                if key in self.data:
+                    self.bytes -= self.data[key][1]
+                self.data[key] = (value, size)
+                self.bytes += size
+                while len(self.data) > self.max_size:
+                    _, (_, evicted) = self.data.popitem(last=False)
+                    self.bytes -= evicted
+        return value
+
+    def get_many(self, db: Session, keys: list, factory) -> dict:
+        """
+        批量读取: 返回 key -> 缓存值, 未命中的 key 一次性传给 factory 读取, factory 返回 key -> 值, 缺少的 key 不缓存
+        """
+        self.validate(db)
+        result = {}
+        with self.lock:
+            for key in keys:
+                item = self.data.get(key)
+                if item is not None:
+                    self.data.move_to_end(key)
+                    self.hits += 1
+                    result[key] = item[0]
+            missing = [key for key in keys if key not in result]
+            self.misses += len(missing)
+            stamps = {key: self.stamp(key) for key in missing}
+
+        if not missing:
+            return result
+        values = factory(missing)
+        sizes = {key: deep_sizeof(value) for key, value in values.items()}
+        with self.lock:
+            for key, value in values.items():
+                if self.stamp(key) == stamps[key]:
+                    if key in self.data:
+                        self.bytes -= self.data[key][1]
+                    self.data[key] = (value, sizes[key])
+                    self.bytes += sizes[key]
+            while len(self.data) > self.max_size:
+                _, (_, evicted) = self.data.popitem(last=False)
+                self.bytes -= evicted
+        result.update(values)
+        return result
+
+    def expire(self, tables: set):
+        """
+        清除依赖这些表的条目, 下次读取时重新校验版本号
+        """
+        with self.lock:
+            self.evict(tables)
+            self.checked_at = 0.0
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "versions": {table: version for table, (version, _) in self.versions.items()},
+                "size": len(self.data),
+                "max_size": self.max_size,
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations
+            }
+
+
+catalog_cache = CatalogCache(max_size=config.catalog_cache_size, check_interval=config.catalog_version_interval)
@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+from utils import data_version
+from utils.catalog_cache import catalog_cache, version_name
+
+
+def version_stamps(db: Session, tables: tuple, student_id: int = None) -> tuple[tuple, datetime]:
+    """
+    响应所依赖数据的版本号和最近更新时间: 所依赖的课程目录表 (见 utils.catalog_cache) 的版本号, 以及指定学生的选课版本号
+    课程目录的版本号与课程目录缓存一致, 不额外查询数据库
+    """
+    catalog_cache.validate(db)
+    versions = catalog_cache.versions
+    stamps = [(version_name(table), versions[table][0]) for table in tables]
+    updated = [versions[table][1] for table in tables]
+    if student_id is not None:
+        name = data_version.enrollment_name(student_id)
+        version, updated_time = data_version.read(db, [name])[name]
+        stamps.append((name, version))
+        updated.append(updated_time)
+
+    updated = [updated_time for updated_time in updated if updated_time is not None]
+    return tuple(stamps), max(updated) if updated else None
+
+
+def http_date(value: datetime) -> str:
+    # 数据库中的时间为本地时间
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+    If-None-Match 使用弱比较, 忽略 W/ 前缀
+    """
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def check_not_modified(request: Request, response: Response, stamps: tuple, last_modified: datetime = None) -> Response | None:
+    """
+    由版本号生成 ETag 并设置到响应头; 客户端缓存的版本仍是最新时返回 304 响应, 调用方直接返回, 不再查询数据
+    有 If-None-Match 时只比较 ETag, 否则比较 If-Modified-Since 与 last_modified
+    stamps 中应包含决定响应内容的所有版本号和请求者身份, 相同 URL 在 stamps 不变时响应内容不变
+    """
+    etag = 'W/"' + hashlib.sha1(repr(stamps).encode()).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        fresh = etag_matches(if_none_match, etag)
+    elif if_modified_since is not None and last_modified is not None:
+        try:
+            fresh = last_modified.astimezone(timezone.utc) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            fresh = False
+    else:
+        fresh = False
+
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,124 @@
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session, Query
+from config import config
+from utils.cache import TTLCache
+
+# 表名 -> 版本号, 本进程内提交对该表的写入后加一, 缓存键中带上相关表的版本号, 写入后旧的总数自然失效
+table_versions = {}
+versions_lock = threading.Lock()
+
+
+def bump(tables):
+    with versions_lock:
+        for table in tables:
+            table_versions[table] = table_versions.get(table, 0) + 1
+
+
+def changed_tables(session: Session) -> set:
+    """
+    本次 flush 中会影响行数的表: 插入、删除的行, 以及修改了外键列 (筛选和连接条件) 的行
+    普通列 (如班级人数、成绩) 的修改不影响总数, 不使缓存失效
+    """
+    tables = {instance.__table__.name for instance in session.new}
+    tables |= {instance.__table__.name for instance in session.deleted}
+    for instance in session.dirty:
+        state = instance._sa_instance_state
+        for column in instance.__table__.columns:
+            if column.foreign_keys and column.key in state.attrs and state.attrs[column.key].history.has_changes():
+                tables.add(instance.__table__.name)
+                break
+    return tables
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    session.info.setdefault("count_tables", set()).update(changed_tables(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    # query.delete() / query.update() 不经过 flush
+    if (orm_execute_state.is_delete or orm_execute_state.is_update) and orm_execute_state.bind_mapper is not None:
+        tables = {table.name for table in orm_execute_state.bind_mapper.tables}
+        orm_execute_state.session.info.setdefault("count_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    bump(session.info.pop("count_tables", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("count_tables", None)
+
+
+def explain_statement(query: Query, dialect) -> tuple:
+    """
+    查询的 EXPLAIN 语句和驱动参数; 按驱动的参数风格生成, pymysql 为位置参数 (%s), 参数按出现顺序排列
+    IN 列表展开为单独的参数
+    """
+    compiled = query.statement.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        params = compiled.params
+    return "EXPLAIN " + compiled.string, params
+
+
+def explain_rows(db: Session, query: Query):
+    """
+    由 MySQL 执行计划 (表统计信息) 估算查询的行数: 各表 rows * filtered% 之积, 与优化器估算连接结果的方式一致
+    非 MySQL 数据库返回 None
+    """
+    dialect = db.get_bind().dialect
+    if dialect.name != "mysql":
+        return None
+    sql, params = explain_statement(query, dialect)
+    plan = db.connection().exec_driver_sql(sql, params).mappings().all()
+    estimate = 1.0
+    for row in plan:
+        if row.get("rows") is None:
+            continue
+        estimate *= row["rows"] * float(row.get("filtered") or 100) / 100
+    return int(round(estimate)) if plan else 0
+
+
+class CountCache:
+    """
+    分页总数的缓存, 键为 (查询名, 规范化后的筛选条件, 相关表的版本号)
+    本进程内的写入提交后立即失效; 其他进程中的写入在 ttl 秒后可见
+    """
+
+    def __init__(self, ttl: float, max_size: int = 4096):
+        self.cache = TTLCache(ttl=ttl, max_size=max_size)
+
+    @staticmethod
+    def key(name: str, filters: dict, tables: tuple) -> tuple:
+        with versions_lock:
+            versions = tuple(table_versions.get(table, 0) for table in tables)
+        return (name, tuple(sorted(filters.items())), versions)
+
+    def count(self, db: Session, name: str, filters: dict, tables: tuple, query: Query, estimate: bool = False) -> tuple[int, bool]:
+        """
+        返回 (总数, 是否为估算值)
+        estimate 为 True 且缓存未命中时返回执行计划估算的行数, 不执行 COUNT(*); 不支持估算时仍精确统计
+        """
+        key = self.key(name, filters, tables)
+        total = self.cache.get(key)
+        if total is not None:
+            return total, False
+        if estimate:
+            total = explain_rows(db, query)
+            if total is not None:
+                return total, True
+        total = query.count()
+        self.cache.set(key, total)
+        return total, False
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+count_cache = CountCache(ttl=config.count_cache_ttl)
@@ -0,0 +1,39 @@
+import base64
+import json
+
+
+def encode_cursor(key) -> str:
+    """
+    将上一页最后一条记录的排序键编码为不透明的游标
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(key), separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int = None) -> tuple:
+    """
+    解析游标为排序键 (整数元组), 空字符串表示第一页返回 None; 格式错误时抛出 ValueError
+    """
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or (length is not None and len(key) != length) \
+            or not all(isinstance(value, int) and not isinstance(value, bool) for value in key):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def keyset_page(rows: list, page_size: int, key, format) -> dict:
+    """
+    rows 为按排序键查询的 page_size + 1 条记录, 多出的一条表示还有下一页
+    key 取记录的排序键, format 将记录转换为返回的数据
+    """
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    return {
+        "page_size": page_size,
+        "next_cursor": encode_cursor(key(rows[-1])) if has_next and rows else None,
+        "data": [format(row) for row in rows]
+    }
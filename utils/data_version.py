@@ -0,0 +1,73 @@
+from datetime import datetime
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+from model.DataVersionModel import DataVersion
+
+
+def upsert(dialect_name: str, name: str, now: datetime):
+    """
+    版本号加一的语句, 不存在时插入; MySQL 和 SQLite 用单条语句, 并发写入同一版本号时不会主键冲突
+    """
+    values = {"version": DataVersion.version + 1, "updated_time": now}
+    if dialect_name == "mysql":
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        return mysql_insert(DataVersion).values(name=name, version=1, updated_time=now).on_duplicate_key_update(**values)
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(DataVersion).values(name=name, version=1, updated_time=now).on_conflict_do_update(
+            index_elements=[DataVersion.name], set_=values
+        )
+    return None
+
+
+def bump(session: Session, name: str):
+    """
+    在当前事务中将版本号加一, 与写入一起提交; 同一事务中只更新一次
+    """
+    bumped = session.info.setdefault("versions_bumped", set())
+    if name in bumped:
+        return
+    connection = session.connection()
+    now = datetime.now().replace(microsecond=0)
+    statement = upsert(connection.dialect.name, name, now)
+    if statement is not None:
+        connection.execute(statement)
+    else:
+        updated = connection.execute(
+            update(DataVersion).where(DataVersion.name == name).values(version=DataVersion.version + 1, updated_time=now)
+        ).rowcount
+        if not updated:
+            connection.execute(insert(DataVersion).values(name=name, version=1, updated_time=now))
+    bumped.add(name)
+
+
+def read(db: Session, names: list) -> dict:
+    """
+    名称 -> (版本号, 更新时间), 不存在的版本号为 (0, None)
+    """
+    rows = db.query(DataVersion.name, DataVersion.version, DataVersion.updated_time).filter(DataVersion.name.in_(names)).all()
+    versions = {name: (0, None) for name in names}
+    versions.update({name: (version, updated_time) for name, version, updated_time in rows})
+    return versions
+
+
+def enrollment_name(student_id: int) -> str:
+    return f"enrollment:{student_id}"
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    # 学生的选课记录增删后更新该学生的选课版本号
+    for instance in session.new | session.deleted:
+        if instance.__table__.name == "student_course":
+            bump(session, enrollment_name(instance.student_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    session.info.pop("versions_bumped", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("versions_bumped", None)
@@ -0,0 +1,49 @@
+import numpy as np
+from schedule_server.enumeration import CANDIDATE_FIELDS, Problem, search, rank
+
+
+def solve_local(day_num, student_num, classroom_num, schedule_classroom_num, schedule_class_num, student_w, classroom_w, day_w, day_5,
+                top_k=0, max_combinations=1000):
+    """
+    排课服务都不可用时在本地求解, 返回与 run_opt_client 相同格式的结果
+    与排课服务的 NumpySolver 使用同一个 enumeration 模块;
+    教室组合数超过 max_combinations 时只枚举空闲格子最多的前若干组合, 不保证最优
+    """
+    M, N, I, J = day_num, 5, student_num, classroom_num
+    student_w = np.asarray(student_w).reshape(I, M, N)
+    classroom_w = np.asarray(classroom_w).reshape(J, M, N)
+    pref_matrix = np.outer(np.asarray(day_w, dtype=float), np.asarray(day_5, dtype=float))
+    problem = Problem(student_w, classroom_w, pref_matrix, schedule_class_num, schedule_classroom_num)
+
+    x = np.zeros(M * N)
+    y = np.zeros(J)
+    candidates = []
+    if top_k > 0 and schedule_class_num == 1 and schedule_classroom_num == 1:
+        # 与排课服务一致: 只排序候选, 第一个候选即为解
+        candidates = [dict(zip(CANDIDATE_FIELDS, candidate)) for candidate in rank(problem, top_k)]
+        state = len(candidates) > 0
+        if state:
+            x[candidates[0]["day"] * N + candidates[0]["slot"]] = 1
+            y[candidates[0]["classroom"]] = 1
+    else:
+        best = search(problem, max_combinations)
+        state = best is not None
+        if state:
+            _, rooms, chosen = best
+            x[chosen] = 1
+            y[list(rooms)] = 1
+    x = x.reshape(M, N)
+
+    obj_pref = float((x * pref_matrix).sum() / M / N)
+    obj_w = float((x * student_w).sum() / I) if I else 0.0
+
+    return {
+        "value": obj_pref + obj_w,
+        "pref": obj_pref,
+        "w": obj_w,
+        "X": x.tolist(),
+        "Y": y.tolist(),
+        "state": state,
+        "solver": "local",
+        "candidates": candidates
+    }
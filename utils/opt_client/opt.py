@@ -1,22 +1,41 @@
 import grpc
 import numpy as np
 import utils.opt_client.opt_pb2 as opt_pb2
-import utils.opt_client.opt_pb2_grpc as opt_pb2_grpc
+from config import config
+from utils.opt_client.local import solve_local
+from utils.opt_client.pool import get_pool, StreamSource, RETRY_CODES
+from utils.opt_client.shm import SharedMatrices
 
-def run_opt_client(server_address, day_num, student_num, classroom_num, schedule_classroom_num, schedule_class_num, student_w=None, classroom_w=None, day_w=None, day_5=None):
-    channel = grpc.insecure_channel(server_address)
-    stub = opt_pb2_grpc.ScheduleOptimizationStub(channel)
 
+def get_solver_pool(server_address):
+    return get_pool(server_address,
+                    timeout=config.schedule_timeout,
+                    failure_threshold=config.schedule_breaker_failures,
+                    reset_timeout=config.schedule_breaker_reset)
+
+
+def flatten(matrix) -> list:
+    """
+    占用矩阵 (ndarray 或已展开的列表) 转换为请求中的 int32 列表
+    """
+    if isinstance(matrix, np.ndarray):
+        return matrix.astype(int).ravel().tolist()
+    return matrix
+
+
+def build_request(day_num, student_num, classroom_num, schedule_classroom_num, schedule_class_num, student_w=None, classroom_w=None, day_w=None, day_5=None, top_k=0, solver="", threads=0, time_limit=0, horizon_window=0, horizon_overlap=0, shm_name=""):
     if student_w is None:
         student_w = np.zeros((student_num, day_num, 5)).astype(int).flatten().tolist()
     if classroom_w is None:
         classroom_w = np.zeros((classroom_num, day_num, 5)).astype(int).flatten().tolist()
+    student_w = flatten(student_w)
+    classroom_w = flatten(classroom_w)
     if day_w is None:
         day_w = np.zeros(day_num)
     if day_5 is None:
         day_5 = np.zeros(5)
 
-    request = opt_pb2.OptimizationRequest(
+    return opt_pb2.OptimizationRequest(
         day_num=day_num,
         student_num=student_num,
         classroom_num=classroom_num,
@@ -25,24 +44,117 @@ def run_opt_client(server_address, day_num, student_num, classroom_num, schedule
         student_w=student_w,
         classroom_w=classroom_w,
         day_w=day_w,
-        day_5=day_5
+        day_5=day_5,
+        top_k=top_k,
+        solver=solver,
+        threads=threads,
+        time_limit=time_limit,
+        horizon_window=horizon_window,
+        horizon_overlap=horizon_overlap,
+        shm_name=shm_name
     )
 
+
+def parse_response(response):
+    return {
+        "value": response.obj_value,
+        "pref": response.obj_pref,
+        "w": response.obj_w,
+        "X": np.array(response.x).reshape(-1, 5).tolist(),
+        "Y": np.array(response.y).tolist(),
+        "state": response.success,
+        "solver": response.solver,
+        "candidates": [
+            {
+                "day": c.day,
+                "slot": c.slot,
+                "classroom": c.classroom,
+                "value": c.value,
+                "conflict_rate": c.conflict_rate,
+                "pref": c.pref
+            }
+            for c in response.candidates
+        ]
+    }
+
+
+def run_local(request):
+    return solve_local(request.day_num, request.student_num, request.classroom_num, request.schedule_classroom_num, request.schedule_class_num,
+                       request.student_w, request.classroom_w, request.day_w, request.day_5, top_k=request.top_k)
+
+
+def call_shared(pool, params: dict, timeout: float):
+    """
+    通过共享内存传递占用矩阵, 请求中只有段名, 矩阵不转换为列表; 服务端打不开该段 (不在同一主机) 时返回 None, 改为在请求中传递
+    """
+    with SharedMatrices(params["student_w"], params["classroom_w"]) as shm:
+        request = build_request(**dict(params, student_w=[], classroom_w=[], shm_name=shm.name))
+        try:
+            return pool.call(request, timeout=timeout)
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.FAILED_PRECONDITION:
+                raise
+            return None
+
+
+def run_opt_client(server_address, day_num, student_num, classroom_num, schedule_classroom_num, schedule_class_num, student_w=None, classroom_w=None, day_w=None, day_5=None, top_k=0, solver="", threads=0, time_limit=0, horizon_window=0, horizon_overlap=0):
+    """
+    server_address 可以是逗号分隔的多个排课服务端 (可以是 unix:///path 形式的 Unix 域套接字), 按进行中请求数负载均衡, 失败时换下一个;
+    全部不可用且开启 schedule_local_fallback 时在本地求解
+    开启 schedule_shm 时占用矩阵通过共享内存传递, 排课服务端须在同一主机
+    """
+    pool = get_solver_pool(server_address)
+    params = dict(day_num=day_num, student_num=student_num, classroom_num=classroom_num, schedule_classroom_num=schedule_classroom_num,
+                  schedule_class_num=schedule_class_num, student_w=student_w, classroom_w=classroom_w, day_w=day_w, day_5=day_5,
+                  top_k=top_k, solver=solver, threads=threads, time_limit=time_limit,
+                  horizon_window=horizon_window, horizon_overlap=horizon_overlap)
+    # 截止时间至少比求解时限多留出传输时间
+    timeout = max(config.schedule_timeout, time_limit + 5)
+
     try:
-        response = stub.schedule_opt(request)
+        response = None
+        if config.schedule_shm and student_w is not None and classroom_w is not None:
+            response = call_shared(pool, params, timeout)
+        if response is None:
+            response = pool.call(build_request(**params), timeout=timeout)
+    except grpc.RpcError as e:
+        if not config.schedule_local_fallback or e.code() not in RETRY_CODES:
+            return {
+                "Error": f"RPC Error: {e.code()} - {e.details()}"
+            }
+        response = None
 
-        result = {
-            "value": response.obj_value,
-            "pref": response.obj_pref,
-            "w": response.obj_w,
-            "X": np.array(response.x).reshape(-1, 5).tolist(),
-            "Y": np.array(response.y).tolist(),
-            "state": response.success
-        }
+    if response is None:
+        if not config.schedule_local_fallback:
+            return {
+                "Error": "RPC Error: no schedule server available"
+            }
+        return run_local(build_request(**params))
 
+    return parse_response(response)
+
+
+def run_opt_client_batch(server_address, requests, size: int = 0):
+    """
+    通过 schedule_stream 在一个流中提交多个求解请求, 服务端并发求解, 按完成顺序产出 (下标, 结果)
+    requests 为可迭代对象, 每一项是 run_opt_client 除 server_address 外的参数, 流发送到该项时才取出, 可以是生成器,
+    在流的发送线程中执行; size 为预计的请求数. 服务端 config.schedule_timeout (至少为求解时间限制加 5 秒) 内
+    没有返回任何结果时视为无响应; 流中断时未完成的请求换服务端重发, 全部不可用时按 schedule_local_fallback 在本地求解或返回错误
+    """
+    pool = get_solver_pool(server_address)
+    source = StreamSource(((str(index), build_request(**params)) for index, params in enumerate(requests)), size)
+    timeout = max(config.schedule_timeout, config.schedule_solver_time_limit + 5)
+
+    error = "RPC Error: no schedule server available"
+    try:
+        for request_id, response, message in pool.stream(source, timeout=timeout):
+            yield int(request_id), {"Error": message} if message else parse_response(response)
     except grpc.RpcError as e:
-        result = {
-            "Error": f"RPC Error: {e.code()} - {e.details()}"
-        }
+        error = f"RPC Error: {e.code()} - {e.details()}"
+        if e.code() not in RETRY_CODES:
+            for request_id, _ in source.remaining():
+                yield int(request_id), {"Error": error}
+            return
 
-    return result
\ No newline at end of file
+    for request_id, request in source.remaining():
+        yield int(request_id), run_local(request) if config.schedule_local_fallback else {"Error": error}
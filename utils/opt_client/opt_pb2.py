@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\topt.proto\"\xd4\x01\n\x13OptimizationRequest\x12\x11\n\tstudent_w\x18\x01 \x03(\x05\x12\x13\n\x0b\x63lassroom_w\x18\x02 \x03(\x05\x12\r\n\x05\x64\x61y_w\x18\x03 \x03(\x02\x12\r\n\x05\x64\x61y_5\x18\x04 \x03(\x02\x12\x13\n\x0bstudent_num\x18\x05 \x01(\x05\x12\x15\n\rclassroom_num\x18\x06 \x01(\x05\x12\x0f\n\x07\x64\x61y_num\x18\x07 \x01(\x05\x12\x1e\n\x16schedule_classroom_num\x18\x08 \x01(\x05\x12\x1a\n\x12schedule_class_num\x18\t \x01(\x05\"q\n\x14OptimizationResponse\x12\x11\n\tobj_value\x18\x01 \x01(\x02\x12\x10\n\x08obj_pref\x18\x02 \x01(\x02\x12\r\n\x05obj_w\x18\x03 \x01(\x02\x12\t\n\x01x\x18\x04 \x03(\x02\x12\t\n\x01y\x18\x05 \x03(\x02\x12\x0f\n\x07success\x18\x06 \x01(\x08\x32S\n\x14ScheduleOptimization\x12;\n\x0cschedule_opt\x12\x14.OptimizationRequest\x1a\x15.OptimizationResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\topt.proto\"\xdb\x02\n\x13OptimizationRequest\x12\x11\n\tstudent_w\x18\x01 \x03(\x05\x12\x13\n\x0b\x63lassroom_w\x18\x02 \x03(\x05\x12\r\n\x05\x64\x61y_w\x18\x03 \x03(\x02\x12\r\n\x05\x64\x61y_5\x18\x04 \x03(\x02\x12\x13\n\x0bstudent_num\x18\x05 \x01(\x05\x12\x15\n\rclassroom_num\x18\x06 \x01(\x05\x12\x0f\n\x07\x64\x61y_num\x18\x07 \x01(\x05\x12\x1e\n\x16schedule_classroom_num\x18\x08 \x01(\x05\x12\x1a\n\x12schedule_class_num\x18\t \x01(\x05\x12\r\n\x05top_k\x18\n \x01(\x05\x12\x0e\n\x06solver\x18\x0b \x01(\t\x12\x0f\n\x07threads\x18\x0c \x01(\x05\x12\x12\n\ntime_limit\x18\r \x01(\x02\x12\x16\n\x0ehorizon_window\x18\x0e \x01(\x05\x12\x17\n\x0fhorizon_overlap\x18\x0f \x01(\x05\x12\x10\n\x08shm_name\x18\x10 \x01(\t\"m\n\tCandidate\x12\x0b\n\x03\x64\x61y\x18\x01 \x01(\x05\x12\x0c\n\x04slot\x18\x02 \x01(\x05\x12\x11\n\tclassroom\x18\x03 \x01(\x05\x12\r\n\x05value\x18\x04 \x01(\x02\x12\x15\n\rconflict_rate\x18\x05 \x01(\x02\x12\x0c\n\x04pref\x18\x06 \x01(\x02\"\xa1\x01\n\x14OptimizationResponse\x12\x11\n\tobj_value\x18\x01 \x01(\x02\x12\x10\n\x08obj_pref\x18\x02 \x01(\x02\x12\r\n\x05obj_w\x18\x03 \x01(\x02\x12\t\n\x01x\x18\x04 \x03(\x02\x12\t\n\x01y\x18\x05 \x03(\x02\x12\x0f\n\x07success\x18\x06 \x01(\x08\x12\x1e\n\ncandidates\x18\x07 \x03(\x0b\x32\n.Candidate\x12\x0e\n\x06solver\x18\x08 \x01(\t\"I\n\x0c\x42\x61tchRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12%\n\x07request\x18\x02 \x01(\x0b\x32\x14.OptimizationRequest\"[\n\rBatchResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\'\n\x08response\x18\x02 \x01(\x0b\x32\x15.OptimizationResponse\x12\r\n\x05\x65rror\x18\x03 \x01(\t2\x89\x01\n\x14ScheduleOptimization\x12;\n\x0cschedule_opt\x12\x14.OptimizationRequest\x1a\x15.OptimizationResponse\x12\x34\n\x0fschedule_stream\x12\r.BatchRequest\x1a\x0e.BatchResponse(\x01\x30\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,9 +32,15 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'opt_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_OPTIMIZATIONREQUEST']._serialized_start=14
-  _globals['_OPTIMIZATIONREQUEST']._serialized_end=226
-  _globals['_OPTIMIZATIONRESPONSE']._serialized_start=228
-  _globals['_OPTIMIZATIONRESPONSE']._serialized_end=341
-  _globals['_SCHEDULEOPTIMIZATION']._serialized_start=343
-  _globals['_SCHEDULEOPTIMIZATION']._serialized_end=426
+  _globals['_OPTIMIZATIONREQUEST']._serialized_end=361
+  _globals['_CANDIDATE']._serialized_start=363
+  _globals['_CANDIDATE']._serialized_end=472
+  _globals['_OPTIMIZATIONRESPONSE']._serialized_start=475
+  _globals['_OPTIMIZATIONRESPONSE']._serialized_end=636
+  _globals['_BATCHREQUEST']._serialized_start=638
+  _globals['_BATCHREQUEST']._serialized_end=711
+  _globals['_BATCHRESPONSE']._serialized_start=713
+  _globals['_BATCHRESPONSE']._serialized_end=804
+  _globals['_SCHEDULEOPTIMIZATION']._serialized_start=807
+  _globals['_SCHEDULEOPTIMIZATION']._serialized_end=944
 # @@protoc_insertion_point(module_scope)
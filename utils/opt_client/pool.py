@@ -0,0 +1,292 @@
+import random
+import threading
+import time
+import grpc
+import utils.opt_client.opt_pb2 as opt_pb2
+import utils.opt_client.opt_pb2_grpc as opt_pb2_grpc
+
+# 这些错误说明服务端不可用, 计入熔断并换下一个服务端重试; 其他错误 (如参数错误) 直接抛出
+RETRY_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED, grpc.StatusCode.RESOURCE_EXHAUSTED)
+
+
+class Endpoint:
+    """
+    一个排课服务端: 长连接 channel, 进行中的请求数, 熔断状态
+    连续失败 failure_threshold 次后熔断, reset_timeout 秒后放行一个探测请求, 成功则恢复
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self.channel = grpc.insecure_channel(address)
+        self.stub = opt_pb2_grpc.ScheduleOptimizationStub(self.channel)
+        self.outstanding = 0
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def available(self, reset_timeout: float, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        return not self.probing and now - self.opened_at >= reset_timeout
+
+
+class StreamSource:
+    """
+    流式求解的请求来源: 已发送未完成的请求 (pending), 以及按需从 source 迭代器中取出的新请求
+    流发送下一个请求时才从 source 中取出, 请求的构建与服务端的求解同时进行; 重试的流和调用方共用同一个来源
+    size 为预计的请求总数, 用于负载均衡时的计数
+    """
+
+    def __init__(self, source, size: int = 0):
+        self.source = iter(source)
+        self.size = size
+        self.pending = {}
+        self.completed = 0
+        self.exhausted = False
+        self.lock = threading.Lock()
+        self.source_lock = threading.Lock()
+
+    def take(self, sent: set):
+        """
+        下一个还没有在本次流中发送的 (request_id, request), 没有时返回 None
+        """
+        with self.lock:
+            for request_id, request in self.pending.items():
+                if request_id not in sent:
+                    sent.add(request_id)
+                    return request_id, request
+        # 构建请求时不持有 lock, 不阻塞结果的处理
+        with self.source_lock:
+            if self.exhausted:
+                return None
+            item = next(self.source, None)
+            if item is None:
+                self.exhausted = True
+                return None
+            with self.lock:
+                self.pending[item[0]] = item[1]
+            sent.add(item[0])
+            return item
+
+    def complete(self, request_id: str) -> bool:
+        """
+        标记请求已完成, 重复的结果返回 False
+        """
+        with self.lock:
+            if self.pending.pop(request_id, None) is None:
+                return False
+            self.completed += 1
+            return True
+
+    def remaining(self) -> list:
+        """
+        取出所有未完成的请求, 包括 source 中还没有取出的
+        """
+        with self.source_lock, self.lock:
+            items = list(self.pending.items())
+            self.pending.clear()
+            if not self.exhausted:
+                items.extend(self.source)
+                self.exhausted = True
+            return items
+
+    def done(self) -> bool:
+        with self.lock:
+            return self.exhausted and not self.pending
+
+
+class StreamIdleTimeout(grpc.RpcError):
+    """
+    流中有未返回的请求, 且 timeout 秒内没有收到任何结果, 按截止时间超时处理
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+
+    def code(self):
+        return grpc.StatusCode.DEADLINE_EXCEEDED
+
+    def details(self):
+        return f"No schedule result within {self.timeout}s"
+
+
+class StreamWatchdog:
+    """
+    流式求解的空闲超时: 以最近一次收到结果或最早一个未返回的请求的发送时间为起点, 超过 timeout 秒时取消流
+    所有已发送的请求都已返回时 (如调用方仍在构建下一个请求) 不计时; 流的总时长不设上限
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.sent = {}
+        self.progress = time.monotonic()
+        self.expired = False
+        self.call = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def on_sent(self, request_id: str):
+        with self.lock:
+            self.sent[request_id] = time.monotonic()
+
+    def on_result(self, request_id: str):
+        with self.lock:
+            self.sent.pop(request_id, None)
+            self.progress = time.monotonic()
+
+    def start(self, call):
+        self.call = call
+        threading.Thread(target=self.run, name="schedule-stream-watchdog", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.wait(min(self.timeout / 4, 1.0)):
+            with self.lock:
+                if not self.sent:
+                    continue
+                since = max(self.progress, min(self.sent.values()))
+            if time.monotonic() - since > self.timeout:
+                self.expired = True
+                self.call.cancel()
+                return
+
+
+class SolverPool:
+    """
+    多个排课服务端的客户端负载均衡, 选择进行中请求最少且未熔断的服务端
+    """
+
+    def __init__(self, addresses: list, timeout: float = 30, failure_threshold: int = 3, reset_timeout: float = 30):
+        self.endpoints = [Endpoint(address) for address in addresses]
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+
+    def acquire(self, tried: set, weight: int = 1):
+        with self.lock:
+            now = time.monotonic()
+            endpoints = [e for e in self.endpoints if e not in tried and e.available(self.reset_timeout, now)]
+            if not endpoints:
+                return None
+            least = min(e.outstanding for e in endpoints)
+            endpoint = random.choice([e for e in endpoints if e.outstanding == least])
+            endpoint.outstanding += weight
+            if endpoint.opened_at is not None:
+                endpoint.probing = True
+            return endpoint
+
+    def release(self, endpoint: Endpoint, success: bool, weight: int = 1):
+        with self.lock:
+            endpoint.outstanding -= weight
+            endpoint.probing = False
+            if success:
+                endpoint.failures = 0
+                endpoint.opened_at = None
+                return
+            endpoint.failures += 1
+            if endpoint.opened_at is not None or endpoint.failures >= self.failure_threshold:
+                endpoint.opened_at = time.monotonic()
+
+    def call(self, request, timeout: float = None):
+        """
+        依次尝试可用的服务端, 全部不可用时抛出最后一个 grpc.RpcError, 没有可用服务端时返回 None
+        """
+        tried = set()
+        error = None
+        while True:
+            endpoint = self.acquire(tried)
+            if endpoint is None:
+                if error is not None:
+                    raise error
+                return None
+            tried.add(endpoint)
+
+            try:
+                response = endpoint.stub.schedule_opt(request, timeout=timeout or self.timeout)
+            except grpc.RpcError as e:
+                retry = e.code() in RETRY_CODES
+                self.release(endpoint, success=not retry)
+                if not retry:
+                    raise
+                error = e
+                continue
+
+            self.release(endpoint, success=True)
+            return response
+
+    def stream(self, source: StreamSource, timeout: float = None):
+        """
+        通过 schedule_stream 批量求解 source 中的请求, 按完成顺序产出 (request_id, response, error)
+        流中断时未完成的请求和 source 中剩余的请求换下一个服务端发送, 全部不可用时留在 source 中 (见 StreamSource.remaining)
+        有请求未返回且 timeout 秒内没有收到任何结果时视为服务端无响应, 取消该流 (见 StreamWatchdog)
+        """
+        tried = set()
+        error = None
+        while not source.done():
+            weight = max(source.size - source.completed, 1)
+            endpoint = self.acquire(tried, weight)
+            if endpoint is None:
+                if error is not None:
+                    raise error
+                return
+            tried.add(endpoint)
+
+            watchdog = StreamWatchdog(timeout or self.timeout)
+
+            def requests(sent: set):
+                while True:
+                    item = source.take(sent)
+                    if item is None:
+                        return
+                    watchdog.on_sent(item[0])
+                    yield opt_pb2.BatchRequest(request_id=item[0], request=item[1])
+
+            failed = False
+            try:
+                call = endpoint.stub.schedule_stream(requests(set()))
+                watchdog.start(call)
+                for item in call:
+                    watchdog.on_result(item.request_id)
+                    if source.complete(item.request_id):
+                        yield item.request_id, item.response, item.error
+            except grpc.RpcError as e:
+                if watchdog.expired:
+                    e = StreamIdleTimeout(watchdog.timeout)
+                if e.code() not in RETRY_CODES:
+                    raise
+                failed = True
+                error = e
+            finally:
+                watchdog.stop()
+                self.release(endpoint, success=not failed, weight=weight)
+
+    def stats(self) -> list:
+        with self.lock:
+            return [
+                {
+                    "address": e.address,
+                    "outstanding": e.outstanding,
+                    "failures": e.failures,
+                    "open": e.opened_at is not None
+                }
+                for e in self.endpoints
+            ]
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(server_address: str, **kwargs) -> SolverPool:
+    """
+    按逗号分隔的地址列表复用 SolverPool, 保持长连接
+    """
+    with pools_lock:
+        pool = pools.get(server_address)
+        if pool is None:
+            addresses = [address.strip() for address in server_address.split(",") if address.strip()]
+            pool = pools[server_address] = SolverPool(addresses, **kwargs)
+        return pool
@@ -0,0 +1,36 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+# 共享内存中的矩阵类型, 与排课服务端一致
+SHM_DTYPE = np.int32
+
+
+class SharedMatrices:
+    """
+    将学生占用 (I, M, 5) 和教室占用 (J, M, 5) 依次写入一个 POSIX 共享内存段, 请求中只传段名
+    排课服务端与 web 服务在同一主机 (或共享 IPC 命名空间) 时使用, 退出时关闭并删除该段
+    """
+
+    def __init__(self, student_w: np.ndarray, classroom_w: np.ndarray):
+        # 写入共享内存时按 SHM_DTYPE 转换, 不另外复制
+        student_w = np.asarray(student_w)
+        classroom_w = np.asarray(classroom_w)
+        size = student_w.size + classroom_w.size
+
+        # 长度为 0 的共享内存段不能创建, 至少分配一个元素
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1) * np.dtype(SHM_DTYPE).itemsize)
+        buffer = np.ndarray((size,), dtype=SHM_DTYPE, buffer=self.shm.buf)
+        buffer[:student_w.size] = student_w.ravel()
+        buffer[student_w.size:] = classroom_w.ravel()
+        del buffer
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,130 @@
+
+# 参与全文检索的字段
+TEXT_FIELDS = ("name", "profession", "college")
+# 精确匹配的字段
+EXACT_FIELDS = ("credit", "type")
+# 返回分面统计的字段
+FACET_FIELDS = ("college", "profession", "type", "credit")
+
+
+def normalize(text) -> str:
+    return (text or "").lower()
+
+
+def ngrams(text: str) -> set:
+    """
+    单字和相邻两字, 中文按字切分, 不依赖分词
+    """
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class PlanIndex:
+    """
+    课程计划的 n-gram 倒排索引快照, 构建后只读
+    文本字段按 (字段, n-gram) 建立倒排表, 查询取查询串所有 n-gram 倒排表的交集, 再校验子串, 与 LIKE '%x%' 结果一致;
+    学分和类型按值建立倒排表, 各筛选条件的结果按集合求交, 从最小的集合开始
+    """
+
+    def __init__(self, plans: list):
+        self.rows = {}
+        self.texts = {}
+        self.postings = {}
+        for plan in plans:
+            self.rows[plan.id] = {
+                "id": plan.id,
+                "name": plan.name,
+                "introduction": plan.introduction,
+                "profession": plan.profession,
+                "college": plan.college,
+                "credit": plan.credit,
+                "type": plan.type
+            }
+            for field in TEXT_FIELDS:
+                text = normalize(getattr(plan, field))
+                self.texts[(field, plan.id)] = text
+                for gram in ngrams(text):
+                    self.postings.setdefault((field, gram), set()).add(plan.id)
+            for field in EXACT_FIELDS:
+                self.postings.setdefault((field, getattr(plan, field)), set()).add(plan.id)
+
+    def match(self, field: str, query: str) -> set:
+        """
+        字段中包含 query 的课程计划ID
+        """
+        query = normalize(query)
+        grams = {query} if len(query) == 1 else {query[i:i + 2] for i in range(len(query) - 1)}
+        grams = sorted(grams, key=lambda gram: len(self.postings.get((field, gram), ())))
+        ids = set(self.postings.get((field, grams[0]), ()))
+        for gram in grams[1:]:
+            if not ids:
+                break
+            ids &= self.postings.get((field, gram), set())
+        if len(query) > 2:
+            ids = {plan_id for plan_id in ids if query in self.texts[(field, plan_id)]}
+        return ids
+
+    def rank_key(self, name: str):
+        """
+        有名称查询时按 (完全匹配, 前缀匹配, 匹配位置, 名称长度) 排序, 否则按ID
+        """
+        name = normalize(name)
+        if not name:
+            return lambda plan_id: (plan_id,)
+
+        def key(plan_id):
+            text = self.texts[("name", plan_id)]
+            return (int(text != name), int(not text.startswith(name)), text.find(name), len(text), plan_id)
+        return key
+
+    def filter_sets(self, name: str = "", credit: int = None, profession: str = "", type: str = "", college: str = "") -> dict:
+        """
+        各筛选条件匹配的课程计划ID集合, 字段 -> 集合; 参数为空字符串、None 或学分为 -1 时不筛选
+        """
+        sets = {}
+        for field, query in (("name", name), ("profession", profession), ("college", college)):
+            if query:
+                sets[field] = self.match(field, query)
+        if credit and credit != -1:
+            sets["credit"] = self.postings.get(("credit", credit), set())
+        if type:
+            sets["type"] = self.postings.get(("type", type), set())
+        return sets
+
+    def intersect(self, sets: list) -> set:
+        if not sets:
+            return set(self.rows.keys())
+        sets = sorted(sets, key=len)
+        ids = set(sets[0])
+        for other in sets[1:]:
+            ids &= other
+        return ids
+
+    def search(self, name: str = "", credit: int = None, profession: str = "", type: str = "", college: str = "") -> list:
+        """
+        按筛选条件查询, 返回排好序的课程计划ID; 参数为空字符串、None 或学分为 -1 时不筛选
+        """
+        sets = self.filter_sets(name=name, credit=credit, profession=profession, type=type, college=college)
+        ids = self.intersect(list(sets.values()))
+        return sorted(ids, key=self.rank_key(name))
+
+    def facets(self, name: str = "", credit: int = None, profession: str = "", type: str = "", college: str = "", restrict: set = None) -> dict:
+        """
+        各分面字段的取值及课程计划数量: 每个字段在除自身以外的筛选条件下统计, 选择该字段的其他取值时数量不变
+        restrict 不为 None 时只统计其中的课程计划; 返回 {"total": 结果总数, 字段: [{"value", "count"}, ...]}
+        """
+        sets = self.filter_sets(name=name, credit=credit, profession=profession, type=type, college=college)
+        if restrict is not None:
+            sets["restrict"] = restrict
+
+        result = {"total": len(self.intersect(list(sets.values())))}
+        for field in FACET_FIELDS:
+            counts = {}
+            for plan_id in self.intersect([ids for other, ids in sets.items() if other != field]):
+                value = self.rows[plan_id][field]
+                if value is not None:
+                    counts[value] = counts.get(value, 0) + 1
+            result[field] = [
+                {"value": value, "count": count}
+                for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+            ]
+        return result
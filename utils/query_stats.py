@@ -0,0 +1,159 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.middleware.base import BaseHTTPMiddleware
+
+# 记录的最慢语句的最大长度
+STATEMENT_MAX = 200
+
+
+class QueryStats:
+    """
+    一次请求 (或一段代码) 执行的 SQL 语句数、总耗时和最慢的语句
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = ""
+
+    def add(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+# 当前请求的统计, 在中间件中设置; 同步依赖和接口在线程池中执行时复制上下文, 共享同一个对象
+current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def install(engine):
+    """
+    在 engine 上注册语句执行前后的事件, 将耗时计入当前上下文的统计
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = current_stats.get()
+        if stats is not None:
+            stats.add(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+class RouteStats:
+    """
+    按 (方法, 路由) 累计的数据库查询统计
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.lock = threading.Lock()
+
+    def add(self, method: str, path: str, stats: QueryStats):
+        with self.lock:
+            route = self.routes.setdefault((method, path), {
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_time": 0.0,
+                "slowest_time": 0.0,
+                "slowest_statement": ""
+            })
+            route["requests"] += 1
+            route["queries"] += stats.count
+            route["max_queries"] = max(route["max_queries"], stats.count)
+            route["db_time"] += stats.total_time
+            if stats.slowest_time > route["slowest_time"]:
+                route["slowest_time"] = stats.slowest_time
+                route["slowest_statement"] = stats.slowest_statement[:STATEMENT_MAX]
+
+    def snapshot(self) -> list[dict]:
+        with self.lock:
+            return [
+                dict(
+                    route,
+                    method=method,
+                    path=path,
+                    avg_queries=route["queries"] / route["requests"],
+                    avg_db_time=route["db_time"] / route["requests"]
+                )
+                for (method, path), route in sorted(self.routes.items(), key=lambda item: -item[1]["db_time"])
+            ]
+
+    def clear(self):
+        with self.lock:
+            self.routes.clear()
+
+
+route_stats = RouteStats()
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    统计每个请求的数据库查询, 按路由累计到 route_stats; headers 为 True 时在响应头中返回:
+    X-DB-Queries 语句数, X-DB-Time 总耗时(毫秒), X-DB-Slowest 最慢语句的耗时(毫秒)
+    响应头可以被浏览器读取, 不包含 SQL 语句; 语句只在管理员接口 /admin/db/stats 中返回
+    """
+
+    def __init__(self, app, headers: bool = False):
+        super().__init__(app)
+        self.headers = headers
+
+    async def dispatch(self, request, call_next):
+        stats = QueryStats()
+        token = current_stats.set(stats)
+        try:
+            response = await call_next(request)
+        finally:
+            current_stats.reset(token)
+
+        # 只统计匹配到路由的请求; 接口都没有路径参数, 按请求路径累计
+        if request.scope.get("route") is not None:
+            route_stats.add(request.method, request.url.path, stats)
+        if self.headers:
+            response.headers["X-DB-Queries"] = str(stats.count)
+            response.headers["X-DB-Time"] = f"{stats.total_time * 1000:.3f}"
+            if stats.count:
+                response.headers["X-DB-Slowest"] = f"{stats.slowest_time * 1000:.3f}"
+        return response
+
+
+@contextmanager
+def count_queries():
+    """
+    统计 with 块中执行的数据库查询, 用于直接调用 CRUD 方法的测试
+    """
+    stats = QueryStats()
+    token = current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_stats.reset(token)
+
+
+def assert_query_budget(client, method: str, url: str, max_queries: int, **kwargs):
+    """
+    测试辅助: 用 TestClient 请求接口, 断言查询数不超过 max_queries, 返回响应
+    依赖 X-DB-Queries 响应头, 需要以 headers=True 注册 QueryStatsMiddleware
+    """
+    response = client.request(method, url, **kwargs)
+    queries = response.headers.get("X-DB-Queries")
+    assert queries is not None, "X-DB-Queries header missing, QueryStatsMiddleware must run with headers=True"
+    assert int(queries) <= max_queries, (
+        f"{method} {url} ran {queries} queries, budget is {max_queries}; slowest: {response.headers.get('X-DB-Slowest')}ms"
+    )
+    return response
@@ -0,0 +1,482 @@
+import os
+import socket
+import threading
+import time
+import traceback
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import config
+from database import SessionLocal
+from crud.ScheduleCrud import ScheduleCrud, TIME_SLOTS
+from crud.ClassScheduleCrud import ClassScheduleCrud
+from crud.ClassroomReservationCrud import ClassroomReservationCrud
+from crud.TeacherScheduleCrud import TeacherScheduleCrud
+from crud.ScheduleJobCrud import ScheduleJobCrud
+from model.ClassScheduleModel import ClassSchedule
+from model.ScheduleJobModel import ScheduleJob
+from utils.opt_client.opt import run_opt_client, run_opt_client_batch
+
+
+TIME_MAPPING = [timedelta(hours=hour) for hour in TIME_SLOTS]
+
+
+SCHEDULE_MODES = ("once", "weekly")
+
+# 本进程的标识, 记录在领取的任务上, 心跳只更新本进程的任务
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def commit_sessions(db: Session, teacher_id: int, course_id: int, classroom_id: int, sessions: list, pref: float, commit: bool = True):
+    """
+    预约教室时间段并写入 ClassSchedule 和 TeacherSchedule, sessions 为 [(开始时间, 冲突率, 冲突学生ID)]
+    所有记录只 flush, 最后在同一事务中提交; 任一时间段已被其他排课占用或写入失败时回滚, 不写入任何记录,
+    时间段被占用时抛出 IntegrityError. commit 为 False 时不提交也不回滚, 由调用方处理
+    返回排课结果和第一次课的 TeacherSchedule ID
+    """
+    try:
+        reservations = [ClassroomReservationCrud.reserve(db, classroom_id, start_time) for start_time, _, _ in sessions]
+
+        schedules = []
+        teacher_schedule_id = None
+        for reservation, (start_time, conflict_rate, conflict_student_ids) in zip(reservations, sessions):
+            end_time = start_time + timedelta(hours=2)
+            classScheduler: ClassSchedule = ClassScheduleCrud.create(db,
+                                                                     start_time=start_time,
+                                                                     end_time=end_time,
+                                                                     classroom=classroom_id,
+                                                                     class_id=course_id,
+                                                                     commit=False)
+            reservation.class_schedule_id = classScheduler.id
+
+            teacher_schedule = TeacherScheduleCrud.create(db, teacher_id, classScheduler.id, conflict_rate, pref,
+                                                          conflict_student_ids, commit=False)
+            if teacher_schedule_id is None:
+                teacher_schedule_id = teacher_schedule.id
+
+            schedules.append({
+                "start_time": start_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "end_time": end_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "classroom_id": classroom_id,
+                "w": conflict_rate,
+                "conflict_students": conflict_student_ids
+            })
+        if commit:
+            db.commit()
+    except Exception:
+        if commit:
+            db.rollback()
+        raise
+
+    schedule_data = {
+        "perf": pref,
+        "w": max(schedule["w"] for schedule in schedules),
+        "schedule": {key: schedules[0][key] for key in ("start_time", "end_time", "classroom_id")},
+        "conflict_students": sorted({i for schedule in schedules for i in schedule["conflict_students"]})
+    }
+    if len(schedules) > 1:
+        schedule_data["sessions"] = schedules
+
+    return schedule_data, teacher_schedule_id
+
+
+def build_opt_params(student_schedule_matrix: np.ndarray, classroom_schedule_matrix: np.ndarray, prefer: list,
+                     top_k: int = 1, solver: str = "") -> dict:
+    """
+    构建 run_opt_client 的参数 (除服务端地址外)
+    占用矩阵保持为 ndarray, 通过共享内存传递时直接写入, 只有在请求中传递时才转换为列表
+    """
+    student_num, day_num, _ = student_schedule_matrix.shape
+    classroom_num, _, _ = classroom_schedule_matrix.shape
+
+    return {
+        "day_num": day_num,
+        "student_num": student_num,
+        "classroom_num": classroom_num,
+        "schedule_classroom_num": 1,
+        "schedule_class_num": 1,
+        "student_w": student_schedule_matrix,
+        "classroom_w": classroom_schedule_matrix,
+        "day_w": np.ones(day_num).tolist(),
+        "day_5": np.array(prefer).tolist(),
+        "top_k": top_k if top_k > 1 else 0,
+        "solver": solver or config.schedule_solver,
+        "threads": config.schedule_solver_threads,
+        "time_limit": config.schedule_solver_time_limit,
+        "horizon_window": config.schedule_horizon_window,
+        "horizon_overlap": config.schedule_horizon_overlap
+    }
+
+
+def check_result(result: dict) -> dict:
+    """
+    排课失败时抛出 ValueError
+    """
+    if "Error" in result:
+        raise ValueError(result["Error"])
+
+    if not result['state']:
+        # 滚动时域分解无解时排课服务不再求解完整问题, 需缩小日期范围或关闭分解
+        if result.get("solver", "").startswith("rolling"):
+            raise ValueError("按滚动时域分解求解无解，排课失败")
+        raise ValueError("教室冲突，排课失败")
+
+    return result
+
+
+def solve_schedule(student_schedule_matrix: np.ndarray, classroom_schedule_matrix: np.ndarray, prefer: list,
+                   top_k: int = 1, solver: str = ""):
+    """
+    调用排课服务求解, 排课失败时抛出 ValueError
+    """
+    params = build_opt_params(student_schedule_matrix, classroom_schedule_matrix, prefer, top_k, solver)
+    return check_result(run_opt_client(config.schedule_address, **params))
+
+
+class SchedulePlan:
+    """
+    一次排课的学生/教室占用矩阵
+    mode 为 once 时每个日历日一列, 选中一个 (日期, 时间段);
+    mode 为 weekly 时将日期范围按星期折叠为 weekdays x 5 的周模板求解, 学生占用为各周冲突次数之和,
+    教室任一周被占用即不可用, 选中的 (星期, 时间段) 展开为范围内每周对应日期的课程安排, holidays 中的日期跳过
+    """
+
+    def __init__(self, db: Session, course_id: int, start_date: str, end_date: str, classroom: list,
+                 mode: str = "once", holidays: list = None, weekdays: int = 7):
+        if mode not in SCHEDULE_MODES:
+            raise ValueError(f"不支持的排课模式 {mode}")
+        if mode == "weekly" and weekdays not in (5, 7):
+            raise ValueError("weekdays 只能为 5 或 7")
+
+        self.start_date = start_date
+        self.end_date = end_date
+        self.classroom = classroom
+        self.mode = mode
+        self.holidays = holidays or []
+        self.weekdays = weekdays
+
+        self.student_matrix, student_id = ScheduleCrud.get_student_schedule_matrix(db, course_id, start_date, end_date)
+        self.student_id = np.array(student_id, dtype=int)
+        self.start_day = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S").replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # 求解用的学生占用, weekly 模式下为 (学生, 星期, 时间段) 的冲突次数, day_index 为每个星期对应的日期下标
+        self.student_w = self.student_matrix
+        self.day_index = None
+        if mode == "weekly":
+            self.student_w, self.day_index = ScheduleCrud.fold_week(self.student_matrix, start_date, self.holidays, weekdays)
+
+        self.classroom_w = self.load_classroom(db)
+
+    def load_classroom(self, db: Session) -> np.ndarray:
+        """
+        读取教室占用, weekly 模式下按星期折叠, 范围内没有对应日期的星期不可选
+        """
+        classroom_matrix = ScheduleCrud.get_classroom_schedule_matrix(db, self.classroom, self.start_date, self.end_date)
+        if self.mode == "weekly":
+            classroom_matrix, _ = ScheduleCrud.fold_week(classroom_matrix, self.start_date, self.holidays, self.weekdays, reduce="max")
+            classroom_matrix[:, [w for w, days in enumerate(self.day_index) if not days], :] = 1
+        return classroom_matrix
+
+    def reload(self, db: Session, cell: tuple):
+        """
+        所选教室时间段被并发的排课抢先预约后, 重新读取教室占用并屏蔽该时间段
+        """
+        room, day, slot = cell
+        self.classroom_w = self.load_classroom(db)
+        self.classroom_w[room, day, slot] = 1
+
+    def opt_params(self, prefer: list, top_k: int = 1, solver: str = "") -> dict:
+        return build_opt_params(self.student_w, self.classroom_w, prefer, top_k, solver)
+
+    def sessions(self, day: int, slot: int) -> list:
+        """
+        求解结果中的 (天, 时间段) 对应的每次课 [(开始时间, 冲突率, 冲突学生ID)], weekly 模式下 day 为星期
+        """
+        days = self.day_index[day] if self.mode == "weekly" else [day]
+        student_num = max(len(self.student_id), 1)
+
+        sessions = []
+        for d in days:
+            conflict = self.student_matrix[:, d, slot] != 0
+            start_time = self.start_day + timedelta(days=d) + TIME_MAPPING[slot]
+            sessions.append((start_time, float(conflict.sum() / student_num), self.student_id[conflict].tolist()))
+        return sessions
+
+    def candidates(self, result: dict) -> dict:
+        """
+        将求解返回的候选 (天, 时间段, 教室下标) 转换为时间和教室ID, weekly 模式下附带每周的课程时间,
+        冲突率取各次课中的最大值
+        """
+        candidates = []
+        for c in result["candidates"]:
+            sessions = self.sessions(c["day"], c["slot"])
+            candidate = {
+                "start_time": sessions[0][0].strftime("%Y-%m-%d %H:%M:%S"),
+                "classroom_id": self.classroom[c["classroom"]],
+                "w": max(rate for _, rate, _ in sessions),
+                "perf": c["pref"],
+                "conflict_students": sorted({i for _, _, ids in sessions for i in ids})
+            }
+            if self.mode == "weekly":
+                candidate["sessions"] = [
+                    {"start_time": start_time.strftime("%Y-%m-%d %H:%M:%S"), "w": rate, "conflict_students": ids}
+                    for start_time, rate, ids in sessions
+                ]
+            candidates.append(candidate)
+        return {"candidates": candidates}
+
+
+def pick_cell(result: dict):
+    """
+    求解结果中选中的 (教室下标, 天, 时间段)
+    """
+    day, slot = [int(index[0]) for index in np.where(np.array(result['X']).reshape(-1, 5) == 1)]
+    room = int(np.where(np.array(result['Y']) == 1)[0][0])
+    return room, day, slot
+
+
+def check_rate(sessions: list):
+    """
+    任一次课的学生冲突率过高时抛出 ValueError
+    """
+    rate = max(rate for _, rate, _ in sessions)
+    if rate >= 0.5:
+        raise ValueError(f"学生冲突率{rate * 100}%过高, 排课失败")
+
+
+def commit_plan(db: Session, teacher_id: int, course_id: int, plan: SchedulePlan, result: dict, cell: tuple):
+    """
+    写入选中的 (教室下标, 天, 时间段), 返回排课结果和 TeacherSchedule ID, 教室时间段已被预约时抛出 IntegrityError
+    """
+    room, day, slot = cell
+    sessions = plan.sessions(day, slot)
+    check_rate(sessions)
+    return commit_sessions(db, teacher_id, course_id, plan.classroom[room], sessions, result['pref'])
+
+
+def schedule_course(db: Session, teacher_id: int, course_id: int, start_date: str, end_date: str, classroom: list, prefer: list,
+                    top_k: int = 1, solver: str = "", mode: str = "once", holidays: list = None, weekdays: int = 7):
+    """
+    构建学生/教室占用矩阵, 调用排课服务求解, mode 为 weekly 时按周模板求解并展开到每周 (见 SchedulePlan)
+    top_k 为 1 时直接写入 ClassSchedule 和 TeacherSchedule, 所选教室时间段被并发的排课抢先预约时,
+    重新读取教室占用并屏蔽该时间段后再次求解, 最多 config.schedule_reserve_retry 次;
+    大于 1 时只返回前 top_k 个候选 (日期, 时间段, 教室), 由教师选择后再提交
+    排课失败时抛出 ValueError
+    """
+    plan = SchedulePlan(db, course_id, start_date, end_date, classroom, mode, holidays, weekdays)
+
+    if top_k > 1:
+        result = solve_schedule(plan.student_w, plan.classroom_w, prefer, top_k, solver)
+        return plan.candidates(result), None
+
+    for _ in range(config.schedule_reserve_retry + 1):
+        result = solve_schedule(plan.student_w, plan.classroom_w, prefer, top_k, solver)
+        cell = pick_cell(result)
+
+        try:
+            return commit_plan(db, teacher_id, course_id, plan, result, cell)
+        except IntegrityError:
+            db.rollback()
+            plan.reload(db, cell)
+
+    raise ValueError("教室时间段被其他排课占用, 排课失败")
+
+
+def commit_candidate(db: Session, job: ScheduleJob, index: int):
+    """
+    提交排课任务中的某个候选, 无需重新求解, weekly 模式的候选写入其中每周的课程安排
+    """
+    result = json.loads(job.result) if job.result else {}
+    candidates = result.get("candidates", [])
+    if not 0 <= index < len(candidates):
+        raise ValueError("候选不存在")
+
+    candidate = candidates[index]
+    sessions = [
+        (datetime.strptime(session["start_time"], "%Y-%m-%d %H:%M:%S"), session["w"], session["conflict_students"])
+        for session in candidate.get("sessions", [candidate])
+    ]
+    check_rate(sessions)
+
+    # 锁定任务行, 课程安排和任务的 teacher_schedule_id 在同一事务中提交,
+    # 并发提交同一任务 (包括不同候选) 时只有一个请求能写入课程安排, 进程中断时事务回滚, 不遗留任何标记
+    try:
+        if ScheduleJobCrud.lock_uncommitted(db, job.id) is None:
+            raise ValueError("该排课任务没有可提交的候选")
+        data, teacher_schedule_id = commit_sessions(db, job.teacher_id, job.class_id, candidate["classroom_id"], sessions,
+                                                    candidate["perf"], commit=False)
+        ScheduleJobCrud.set_teacher_schedule(db, job.id, teacher_schedule_id)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise ValueError("该候选的教室时间段已被其他排课占用, 请选择其他候选")
+    except Exception:
+        db.rollback()
+        raise
+    return data
+
+
+def run_schedule_job(job_id: int):
+    """
+    在后台线程中执行一个排课任务, 使用独立的数据库会话
+    """
+    db = SessionLocal()
+    try:
+        if not ScheduleJobCrud.claim(db, job_id, WORKER_ID):
+            return
+
+        job = ScheduleJobCrud.get_by_id(db, ScheduleJob, job_id)
+        params = json.loads(job.params)
+
+        try:
+            data, teacher_schedule_id = schedule_course(db, job.teacher_id, job.class_id, **params)
+        except Exception as e:
+            traceback.print_exc()
+            db.rollback()
+            ScheduleJobCrud.finish(db, job_id, "Failed", message=f"{e}")
+            return
+
+        ScheduleJobCrud.finish(db, job_id, "Success", result=data, teacher_schedule_id=teacher_schedule_id)
+    except Exception:
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+def run_schedule_batch(job_ids: list):
+    """
+    批量执行排课任务: 在一个 schedule_stream 流中提交, 排课服务并发求解, 按完成顺序写入结果
+    每个任务在流发送到它时才领取并构建占用矩阵, 构建与已发送任务的求解同时进行; 构建在流的发送线程中使用单独的数据库会话
+    同一批的班级求解时看不到彼此的排课, 教室时间段冲突由预约表发现, 冲突的任务重新排队按单个任务重试
+    每个任务单独处理异常; 批量求解中断时, 已领取但未写入结果的任务标记为失败, 不会停留在 Running 状态,
+    还没有领取的任务仍为 Pending, 按单个任务重新提交
+    """
+    db = SessionLocal()
+    build_db = SessionLocal()
+    claimed = []
+    finished = set()
+    jobs = []
+
+    def fail(session: Session, job_id: int, message: str):
+        session.rollback()
+        ScheduleJobCrud.finish(session, job_id, "Failed", message=message)
+        finished.add(job_id)
+
+    def requests():
+        for job_id in job_ids:
+            if not ScheduleJobCrud.claim(build_db, job_id, WORKER_ID):
+                continue
+            claimed.append(job_id)
+
+            try:
+                job = ScheduleJobCrud.get_by_id(build_db, ScheduleJob, job_id)
+                params = json.loads(job.params)
+                plan = SchedulePlan(build_db, job.class_id, params["start_date"], params["end_date"], params["classroom"],
+                                    params.get("mode", "once"), params.get("holidays"), params.get("weekdays", 7))
+                request = plan.opt_params(params["prefer"], params.get("top_k", 1), params.get("solver", ""))
+            except Exception as e:
+                traceback.print_exc()
+                fail(build_db, job_id, f"{e}")
+                continue
+
+            # 结果在另一个线程中处理, 只传递普通值, 不共享会话中的对象
+            jobs.append((job_id, job.teacher_id, job.class_id, params, plan))
+            yield request
+
+    try:
+        for index, result in run_opt_client_batch(config.schedule_address, requests(), len(job_ids)):
+            job_id, teacher_id, class_id, params, plan = jobs[index]
+            teacher_schedule_id = None
+            try:
+                check_result(result)
+                if params.get("top_k", 1) > 1:
+                    data = plan.candidates(result)
+                else:
+                    data, teacher_schedule_id = commit_plan(db, teacher_id, class_id, plan, result, pick_cell(result))
+                ScheduleJobCrud.finish(db, job_id, "Success", result=data, teacher_schedule_id=teacher_schedule_id)
+                finished.add(job_id)
+            except IntegrityError:
+                db.rollback()
+                ScheduleJobCrud.requeue(db, job_id)
+                schedule_worker.submit(job_id)
+                finished.add(job_id)
+            except Exception as e:
+                traceback.print_exc()
+                fail(db, job_id, f"{e}")
+    except Exception as e:
+        traceback.print_exc()
+        for job_id in list(claimed):
+            if job_id in finished:
+                continue
+            try:
+                fail(db, job_id, f"批量排课中断: {e}")
+            except Exception:
+                traceback.print_exc()
+        for job_id in job_ids:
+            if job_id not in claimed:
+                schedule_worker.submit(job_id)
+    finally:
+        db.close()
+        build_db.close()
+
+
+class ScheduleWorker:
+    """
+    排课任务后台执行器, 求解和 gRPC 调用都在线程池中进行, 不占用 web worker
+    心跳线程每 heartbeat_interval 秒更新本进程正在执行的任务, 并回收其他进程退出后遗留的任务
+    """
+
+    def __init__(self, max_workers: int, heartbeat_interval: float, timeout: int):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="schedule-job")
+        self.heartbeat_interval = heartbeat_interval
+        self.timeout = timeout
+        self.heartbeat_thread = None
+        self.lock = threading.Lock()
+
+    def start_heartbeat(self):
+        with self.lock:
+            if self.heartbeat_thread is None:
+                self.heartbeat_thread = threading.Thread(target=self.run_heartbeat, name="schedule-heartbeat", daemon=True)
+                self.heartbeat_thread.start()
+
+    def run_heartbeat(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            db = SessionLocal()
+            try:
+                ScheduleJobCrud.heartbeat(db, WORKER_ID)
+                for job_id in ScheduleJobCrud.reclaim_stale(db, self.timeout):
+                    self.submit(job_id)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                db.close()
+
+    def submit(self, job_id: int):
+        self.start_heartbeat()
+        self.executor.submit(run_schedule_job, job_id)
+
+    def submit_batch(self, job_ids: list):
+        self.start_heartbeat()
+        self.executor.submit(run_schedule_batch, job_ids)
+
+    def recover(self):
+        """
+        服务启动时重新提交未完成的任务; 其他进程仍在执行 (心跳未超时) 的任务不重新提交
+        """
+        self.start_heartbeat()
+        db = SessionLocal()
+        try:
+            for job_id in ScheduleJobCrud.get_unfinished_ids(db, self.timeout):
+                self.submit(job_id)
+        finally:
+            db.close()
+
+
+schedule_worker = ScheduleWorker(config.schedule_worker_num, config.schedule_job_heartbeat, config.schedule_job_timeout)
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from config import config
+
+
+class SeatSubscriber:
+    """
+    一个推送连接订阅的班级; changes 中是尚未发送的 班级ID -> (人数, 最大人数), 发送前多次变化只保留最新的
+    """
+
+    def __init__(self, class_ids: set):
+        self.class_ids = class_ids
+        self.changes = {}
+        self.ready = asyncio.Event()
+
+    def take(self) -> dict:
+        self.ready.clear()
+        changes, self.changes = self.changes, {}
+        return changes
+
+
+class SeatBroadcaster:
+    """
+    进程内的班级人数变化广播: 提交后的变化先合并到 pending, 每 interval 秒分发一次,
+    每个班级在一个周期内最多推送一次; 其他进程中的变化由订阅方定期从数据库重新读取
+    publish 可以在任意线程调用, 分发在事件循环中进行
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.task = None
+
+    def publish(self, changes: dict):
+        with self.lock:
+            self.pending.update(changes)
+
+    def subscribe(self, class_ids: set) -> SeatSubscriber:
+        subscriber = SeatSubscriber(set(class_ids))
+        self.subscribers.add(subscriber)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: SeatSubscriber):
+        self.subscribers.discard(subscriber)
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        for subscriber in list(self.subscribers):
+            changes = {class_id: seats for class_id, seats in pending.items() if class_id in subscriber.class_ids}
+            if changes:
+                subscriber.changes.update(changes)
+                subscriber.ready.set()
+
+    async def run(self):
+        while self.subscribers:
+            await asyncio.sleep(self.interval)
+            self.flush()
+        with self.lock:
+            self.pending.clear()
+
+
+seat_broadcaster = SeatBroadcaster(interval=config.seat_stream_interval)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    # 记录本事务中班级人数的变化, 提交后广播
+    for instance in session.dirty | session.new:
+        if instance.__table__.name != "class":
+            continue
+        state = instance._sa_instance_state
+        if instance in session.new or state.attrs["num"].history.has_changes() or state.attrs["max_num"].history.has_changes():
+            session.info.setdefault("seat_changes", {})[instance.id] = (instance.num, instance.max_num)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    changes = session.info.pop("seat_changes", None)
+    if changes and seat_broadcaster.subscribers:
+        seat_broadcaster.publish(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("seat_changes", None)